@@ -33,15 +33,15 @@ class BoundedLStarLearner(LStarLearner):
             raise NumberOfStatesExceededException
         return super()._perform_equivalence_query(model)
 
-    def _fill_hole_for(self, sequence: Sequence):
+    def _fill_holes_for(self, sequences: list[Sequence]):
         suffix = self._observation_table.exp[-1]
-        if len(sequence) + len(suffix) > self._max_mq_length:
+        if any(len(sequence) + len(suffix) > self._max_mq_length for sequence in sequences):
             raise QueryLengthExceededException
-        super()._fill_hole_for(sequence)
+        super()._fill_holes_for(sequences)
 
-    def _get_filled_row_for(self, sequence: Sequence) -> list:
+    def _get_filled_rows_for(self, sequences: list[Sequence]) -> list[list]:
         largestSuffixLength = max((len(sequence.value)
                                    for sequence in self._observation_table.exp))
-        if len(sequence) + largestSuffixLength > self._max_mq_length:
+        if any(len(sequence) + largestSuffixLength > self._max_mq_length for sequence in sequences):
             raise QueryLengthExceededException
-        return super()._get_filled_row_for(sequence)
+        return super()._get_filled_rows_for(sequences)
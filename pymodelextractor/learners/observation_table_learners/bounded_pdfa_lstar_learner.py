@@ -60,11 +60,11 @@ class BoundedPDFALStarLearner(PDFALStarLearner):
         return super()._get_filled_row_for(sequence)
 
     
-    def _fill_hole_for(self, sequence: Sequence, suffix):
+    def _get_hole_value_for(self, sequence: Sequence, suffix) -> float:
         suffix = self.observation_table.get_suffixes()[-1]
         if len(sequence) + len(suffix) > self._max_query_length:
             raise QueryLengthExceededException
-        super()._fill_hole_for(sequence, suffix)
+        return super()._get_hole_value_for(sequence, suffix)
 
 
     def perform_equivalence_query(self, model):
@@ -0,0 +1,255 @@
+from collections.abc import MutableMapping
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+from pythautomata.base_types.sequence import Sequence
+
+_MODULUS = (1 << 61) - 1
+_BASES = (0x1F3D5B79A1C3E5F7 % _MODULUS, 0x2B7E151628AED2A6 % _MODULUS)
+
+
+class ColumnarObservations(MutableMapping):
+    """Observation rows of a table stored column by column in numpy arrays.
+
+    With `boolean=True` every column is a packed bit array holding one bit per row;
+    otherwise values are mapped to integer codes and every column is an array of codes,
+    widened when the number of distinct values outgrows its dtype. Rows are read and
+    extended through `ObservationRow` views, so code written against lists of values
+    (`table[sequence].append(value)`, `tuple(row)`, `row == other`) keeps working.
+
+    Every row also carries a fixed-width digest, its width and two polynomial hashes
+    modulo 2^61 - 1, updated in O(1) per appended value. Different rows tell apart by
+    their digests without materializing them; rows whose digests match are still compared
+    column by column, so a hash collision never makes two different rows equal.
+    """
+
+    def __init__(self, boolean: bool = True, initial_capacity: int = 64):
+        self._boolean = boolean
+        self._capacity = max(8, initial_capacity)
+        self._row_ids = {}
+        self._free_ids = []
+        self._widths = np.zeros(self._capacity, dtype=np.int32)
+        self._hashes = np.zeros((self._capacity, 2), dtype=np.uint64)
+        self._columns = []
+        self._dtype = np.uint8
+        self._codes = {}
+        self._values = []
+
+    @property
+    def boolean(self) -> bool:
+        return self._boolean
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes taken by the stored values, not counting widths and digests."""
+        return sum(column.nbytes for column in self._columns)
+
+    def __getitem__(self, sequence: Sequence) -> 'ObservationRow':
+        return ObservationRow(self, self._row_ids[sequence])
+
+    def __setitem__(self, sequence: Sequence, values: Iterable):
+        # Read the values first: they may be a view of the row being replaced.
+        values = list(values)
+        row_id = self._row_ids.get(sequence)
+        if row_id is None:
+            row_id = self._new_row_id()
+            self._row_ids[sequence] = row_id
+        self._widths[row_id] = 0
+        self._hashes[row_id] = 0
+        for value in values:
+            self._append(row_id, value)
+
+    def __delitem__(self, sequence: Sequence):
+        self._free_ids.append(self._row_ids.pop(sequence))
+
+    def __contains__(self, sequence) -> bool:
+        return sequence in self._row_ids
+
+    def __iter__(self) -> Iterator[Sequence]:
+        return iter(self._row_ids)
+
+    def __len__(self) -> int:
+        return len(self._row_ids)
+
+    def __repr__(self) -> str:
+        return repr({sequence: self[sequence].tolist() for sequence in self._row_ids})
+
+    def column(self, index: int) -> dict[Sequence, Any]:
+        """Values of column `index` for every row that has one."""
+        return {sequence: self._value(row_id, index) for sequence, row_id in self._row_ids.items()
+                if self._widths[row_id] > index}
+
+    def _new_row_id(self) -> int:
+        if self._free_ids:
+            return self._free_ids.pop()
+        row_id = len(self._row_ids) + len(self._free_ids)
+        if row_id == self._capacity:
+            self._grow_rows()
+        return row_id
+
+    def _grow_rows(self):
+        capacity = 2 * self._capacity
+        self._widths = np.concatenate([self._widths, np.zeros(capacity - self._capacity, dtype=np.int32)])
+        self._hashes = np.concatenate([self._hashes, np.zeros((capacity - self._capacity, 2), dtype=np.uint64)])
+        self._columns = [self._grown(column, capacity) for column in self._columns]
+        self._capacity = capacity
+
+    def _grown(self, column: np.ndarray, capacity: int) -> np.ndarray:
+        grown = self._empty_column(capacity)
+        grown[:len(column)] = column
+        return grown
+
+    def _empty_column(self, capacity: int) -> np.ndarray:
+        if self._boolean:
+            return np.zeros((capacity + 7) // 8, dtype=np.uint8)
+        return np.zeros(capacity, dtype=self._dtype)
+
+    def _code_of(self, value) -> int:
+        if self._boolean:
+            if value is True or value is False or value in (0, 1):
+                return int(bool(value))
+            raise ValueError(f"A boolean observation store cannot hold {value!r}")
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+            if code > np.iinfo(self._dtype).max:
+                self._dtype = np.uint16 if self._dtype == np.uint8 else np.uint32
+                self._columns = [column.astype(self._dtype) for column in self._columns]
+        return code
+
+    def _append(self, row_id: int, value):
+        code = self._code_of(value)
+        index = int(self._widths[row_id])
+        while len(self._columns) <= index:
+            self._columns.append(self._empty_column(self._capacity))
+        column = self._columns[index]
+        if self._boolean:
+            mask = 1 << (row_id & 7)
+            if code:
+                column[row_id >> 3] |= mask
+            else:
+                column[row_id >> 3] &= ~mask & 0xFF
+        else:
+            column[row_id] = code
+        self._widths[row_id] = index + 1
+        hashes = self._hashes[row_id]
+        hashes[0] = (int(hashes[0]) * _BASES[0] + code + 1) % _MODULUS
+        hashes[1] = (int(hashes[1]) * _BASES[1] + code + 1) % _MODULUS
+
+    def _value(self, row_id: int, index: int):
+        column = self._columns[index]
+        if self._boolean:
+            return bool((column[row_id >> 3] >> (row_id & 7)) & 1)
+        return self._values[column[row_id]]
+
+    def _width(self, row_id: int) -> int:
+        return int(self._widths[row_id])
+
+    def _digest(self, row_id: int) -> tuple[int, int, int]:
+        hashes = self._hashes[row_id]
+        return int(self._widths[row_id]), int(hashes[0]), int(hashes[1])
+
+    def _rows_equal(self, row_id: int, other_row_id: int, width: int) -> bool:
+        """Whether the first `width` values of two rows are equal, comparing their bits or codes."""
+        for column in self._columns[:width]:
+            if self._boolean:
+                if ((column[row_id >> 3] >> (row_id & 7)) ^ (column[other_row_id >> 3] >> (other_row_id & 7))) & 1:
+                    return False
+            elif column[row_id] != column[other_row_id]:
+                return False
+        return True
+
+
+class ObservationRow:
+    """List-like view of one row of a `ColumnarObservations`."""
+    __slots__ = ('_store', '_row_id')
+
+    def __init__(self, store: ColumnarObservations, row_id: int):
+        self._store = store
+        self._row_id = row_id
+
+    @property
+    def digest(self) -> tuple[int, int, int]:
+        return self._store._digest(self._row_id)
+
+    @property
+    def key(self) -> 'RowKey':
+        return RowKey(self._store, self._row_id, self.digest)
+
+    def append(self, value):
+        self._store._append(self._row_id, value)
+
+    def tolist(self) -> list:
+        return [self._store._value(self._row_id, index) for index in range(len(self))]
+
+    def __len__(self) -> int:
+        return self._store._width(self._row_id)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store._value(self._row_id, i) for i in range(*index.indices(len(self)))]
+        width = len(self)
+        if index < 0:
+            index += width
+        if not 0 <= index < width:
+            raise IndexError("observation row index out of range")
+        return self._store._value(self._row_id, index)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.tolist())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ObservationRow):
+            if other._store is self._store:
+                digest = self.digest
+                return digest == other.digest and self._store._rows_equal(self._row_id, other._row_id, digest[0])
+            return self.tolist() == other.tolist()
+        if isinstance(other, (list, tuple)):
+            return self.tolist() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
+
+
+class RowKey:
+    """Hashable key of a stored row as it was when the key was taken.
+
+    Hashed by the row's digest and compared by its values only when digests match, so
+    dicts and sets keyed by rows never merge two different rows. Rows only grow while
+    they are keyed, so the key compares the first values of the row, up to its width then.
+    """
+    __slots__ = ('_store', '_row_id', '_digest')
+
+    def __init__(self, store: ColumnarObservations, row_id: int, digest: tuple[int, int, int]):
+        self._store = store
+        self._row_id = row_id
+        self._digest = digest
+
+    def __hash__(self) -> int:
+        return hash(self._digest)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RowKey):
+            return NotImplemented
+        if self._digest != other._digest:
+            return False
+        if self._store is other._store:
+            return self._row_id == other._row_id or \
+                self._store._rows_equal(self._row_id, other._row_id, self._digest[0])
+        width = self._digest[0]
+        return ObservationRow(self._store, self._row_id)[:width] == ObservationRow(other._store, other._row_id)[:width]
+
+    def __repr__(self) -> str:
+        return f"RowKey({ObservationRow(self._store, self._row_id)[:self._digest[0]]!r})"
+
+
+def row_signature(row: Iterable):
+    """Hashable signature of an observation row: a `RowKey` for stored rows, its values otherwise."""
+    if isinstance(row, ObservationRow):
+        return row.key
+    return tuple(row)
@@ -5,6 +5,7 @@ from pymodelextractor.learners.learning_result import LearningResult
 from pymodelextractor.teachers.general_teacher import GeneralTeacher
 import time
 from pymodelextractor.utils.time_bound_utilities import timeout
+from pymodelextractor.utils.sequence_store import SequenceStore
 from pymodelextractor.learners.observation_table_learners.translators.partial_dfa_translator \
     import PartialDFATranslator
 
@@ -16,30 +17,41 @@ debug_log = 2
 trace_log = 3
 
 class GeneralLStarLearner:
-    def __init__(self, model_translator, max_states = -1, max_query_lenght = -1, max_time = -1):
+    def __init__(self, model_translator, max_states = -1, max_query_lenght = -1, max_time = -1,
+                 compact_observations: bool = False):
         self._model_translator = model_translator
+        self._compact_observations = compact_observations
         self._max_states = max_states
         self._max_query_length = max_query_lenght
         self._max_time = max_time
         self._history = []
 
+    @property
+    def _sequences(self) -> SequenceStore:
+        return self._observation_table.sequences
+
     def _build_observation_table(self):
-        self._observation_table = GeneralObservationTable()
+        self._observation_table = GeneralObservationTable(self._compact_observations)
     
     def _initialize_observation_table(self):
         self._observation_table.exp = [lamda]
         self._add_to_red(lamda)
-        for symbol in self._symbols:
-            self._add_to_blue(Sequence((symbol,)))
+        self._add_all_to_blue(self._sequences.extensions(lamda, self._symbols))
 
     def _add_to_blue(self, sequence: Sequence) -> bool:
-        if not sequence in self._observation_table.blue:
-            self._observation_table.blue.add(sequence)
-            self._observation_table[sequence], surpassed_max_query_len = self._get_filled_row_for(
-                sequence)
-            
-            return surpassed_max_query_len
-        return False
+        return self._add_all_to_blue([sequence])
+
+    def _add_all_to_blue(self, sequences: list[Sequence]) -> bool:
+        new_sequences = [sequence for sequence in dict.fromkeys(sequences)
+                         if sequence not in self._observation_table.blue]
+        surpassed_len = False
+        for sequence, (row, surpassed_max_query_len) in zip(new_sequences,
+                                                            self._get_filled_rows_for(new_sequences)):
+            self._observation_table.add_to_blue(sequence)
+            self._observation_table[sequence] = row
+            if surpassed_max_query_len:
+                surpassed_len = True
+        return surpassed_len
             
     def _add_to_red(self, sequence: Sequence) -> bool:
         surpassed_len = False
@@ -53,14 +65,16 @@ class GeneralLStarLearner:
         return surpassed_len
     
     def _get_filled_row_for(self, sequence: Sequence):
+        return self._get_filled_rows_for([sequence])[0]
+
+    def _get_filled_rows_for(self, sequences: list[Sequence]) -> list[tuple[list, bool]]:
         required_suffixes = self._observation_table.exp
-        row = []
-        
-        for suffix in required_suffixes:
-            result = self._teacher.membership_query(sequence + suffix)
-            row.append(result)
+        width = len(required_suffixes)
+        results = self._teacher.membership_queries_batch(
+            [sequence + suffix for sequence in sequences for suffix in required_suffixes])
 
-        return row, self._surpassed_max_query_len(sequence, required_suffixes)
+        return [(results[i * width:(i + 1) * width], self._surpassed_max_query_len(sequence, required_suffixes))
+                for i, sequence in enumerate(sequences)]
     
     def _surpassed_max_query_len(self, sequence, required_suffixes):
         return (self._max_query_length != -1) and \
@@ -167,17 +181,21 @@ class GeneralLStarLearner:
         return False, result
 
     def _update_observation_table_with(self, counterexample) -> bool:
-        prefixes = counterexample.get_prefixes()
+        prefixes = self._sequences.prefixes(counterexample)
         surpassed_max_query_len = False
-        for sequence in prefixes:
-            surpassed_max_query_len = self._add_to_red(sequence)
-            
-            for symbol in self._symbols:
-                suffixedSequence = sequence + symbol
-                if suffixedSequence not in prefixes:
-                    if self._add_to_blue(suffixedSequence):
-                        surpassed_max_query_len = True
-        
+        new_red = [sequence for sequence in prefixes if sequence not in self._observation_table.red]
+        for sequence, (row, surpassed_len) in zip(new_red, self._get_filled_rows_for(new_red)):
+            self._observation_table[sequence] = row
+            self._observation_table.add_to_red(sequence, row)
+            if surpassed_len:
+                surpassed_max_query_len = True
+
+        known_prefixes = set(prefixes)
+        if self._add_all_to_blue([extension for sequence in prefixes
+                                  for extension in self._sequences.extensions(sequence, self._symbols)
+                                  if extension not in known_prefixes]):
+            surpassed_max_query_len = True
+
         return surpassed_max_query_len
     
     def _learning_results_for(self, history, duration):
@@ -188,7 +206,9 @@ class GeneralLStarLearner:
             'membership_queries_count': self._teacher.membership_queries_count,
             'observation_table': self._observation_table,
             'duration': duration,
-            'history': history
+            'history': history,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info
         }
         return LearningResult(last_model, number_of_states, info)
 
@@ -209,12 +229,7 @@ class GeneralLStarLearner:
     
 
     def _add_suffixes_to_blue(self, sequence: Sequence) -> bool:
-        surpassed_max_query_len = False
-        for symbol in self._symbols:
-            if self._add_to_blue(sequence + symbol):
-                surpassed_max_query_len = True
-            
-        return surpassed_max_query_len
+        return self._add_all_to_blue(self._sequences.extensions(sequence, self._symbols))
 
     def _make_consistent(self) -> bool:
         while True:
@@ -242,21 +257,25 @@ class GeneralLStarLearner:
                 return surpassed_max_query_len
     
     def _resolve_inconsistency(self, inconsistency):
-        symbol = inconsistency.symbol + inconsistency.differenceSequence
-        surpassed_max_query_len = False
-        self._observation_table.exp.append(symbol)
-        for sequence in self._observation_table.observations:
-            if self._fill_hole_for(sequence, symbol):
-                surpassed_max_query_len = True
-            
-        self._observation_table.update_red_values()
-        return surpassed_max_query_len
+        symbol = self._sequences.canonical(inconsistency.symbol + inconsistency.differenceSequence)
+        sequences = list(self._observation_table.observations)
+        results = self._teacher.membership_queries_batch([sequence + symbol for sequence in sequences])
+        self._observation_table.add_column(symbol, sequences, results)
+        return any(self._surpassed_max_query_len(sequence, [symbol]) for sequence in sequences)
         
 
     def _fill_hole_for(self, sequence: Sequence, suffix: Sequence):
-        self._observation_table[sequence].append(
-            self._teacher.membership_query(sequence + suffix))
-        
-        return self._surpassed_max_query_len(sequence, [suffix])
+        return self._fill_holes_for([sequence], suffix)
+
+    def _fill_holes_for(self, sequences: list[Sequence], suffix: Sequence) -> bool:
+        results = self._teacher.membership_queries_batch([sequence + suffix for sequence in sequences])
+        surpassed_max_query_len = False
+        for sequence, result in zip(sequences, results):
+            self._observation_table[sequence].append(result)
+            if self._surpassed_max_query_len(sequence, [suffix]):
+                surpassed_max_query_len = True
+        self._observation_table.invalidate()
+
+        return surpassed_max_query_len
     
     
\ No newline at end of file
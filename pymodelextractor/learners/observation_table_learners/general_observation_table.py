@@ -1,67 +1,143 @@
 from typing import Union
 from symtable import Symbol
-from typing import Sequence
 from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
 
+from pymodelextractor.learners.observation_table_learners.columnar_observations import ColumnarObservations
 from pymodelextractor.learners.observation_table_learners.observation_table import TableInconsistency
+from pymodelextractor.learners.observation_table_learners.row_signature_index import RowSignatureIndex
 from pymodelextractor.teachers.general_teacher import GeneralTeacher
+from pymodelextractor.utils.sequence_store import SequenceStore
 
 
 class GeneralObservationTable:
+    """Observation table that tracks which rows may break closedness or consistency.
+
+    Every row gets an integer class, equal for equal rows; appending a value to a row
+    extends its class in O(1), so adding a column never rehashes whole rows. Blue rows
+    that may have no equal red row and groups of equal red rows that may be inconsistent
+    are kept in worklists, fed by the rows and columns that change, so `is_closed` and
+    `find_inconsistency` only look at those. Assigning `red`, `blue`, `exp` or
+    `observations` makes the table rebuild its worklists before its next check; code
+    that edits them in place (e.g. `table.red.add(...)` or `table[sequence].append(...)`)
+    must call `invalidate` afterwards.
+    With `compact` set, rows are stored as integer-coded columns in a `ColumnarObservations`.
+    Row and column sequences built by the table and its learner come from `sequences`, a
+    `SequenceStore`; the queries built from them are not interned.
+    """
     red: set[Sequence]
     blue: set[Sequence]
     observations: dict[Sequence, Union[list[Symbol], list[bool]]]
     exp: list[Sequence]
 
-    def __init__(self):
-        self.red = set()
-        self.blue = set()
-        self.observations = {}
-        self.exp = []
+    def __init__(self, compact: bool = False):
+        self._red = set()
+        self._blue = set()
+        self._observations = ColumnarObservations(boolean=False) if compact else {}
+        self._exp = []
+        self.sequences = SequenceStore()
+
+        self._red_index = RowSignatureIndex()
+        self._row_classes = {}
+        self._class_ids = {}
+        self._unclosed = {}
+        self._unchecked = {}
+        self._red_values = None
+        self._stale = False
+
+    @property
+    def red(self) -> set[Sequence]:
+        return self._red
+
+    @red.setter
+    def red(self, red: set[Sequence]):
+        self._red = red
+        self.invalidate()
+
+    @property
+    def blue(self) -> set[Sequence]:
+        return self._blue
+
+    @blue.setter
+    def blue(self, blue: set[Sequence]):
+        self._blue = blue
+        self.invalidate()
+
+    @property
+    def exp(self) -> list[Sequence]:
+        return self._exp
+
+    @exp.setter
+    def exp(self, exp: list[Sequence]):
+        self._exp = exp
+        self.invalidate()
+
+    @property
+    def observations(self) -> dict[Sequence, Union[list[Symbol], list[bool]]]:
+        return self._observations
+
+    @observations.setter
+    def observations(self, observations: dict[Sequence, Union[list[Symbol], list[bool]]]):
+        self._observations = observations
+        self.invalidate()
 
-        self.redValues = set()
+    def invalidate(self):
+        """Makes the table rebuild its worklists before its next check, after it was edited in place."""
+        self._stale = True
+        self._red_values = None
 
     def __getitem__(self, sequence: Sequence) -> Union[list[Symbol], list[bool]]:
-        return self.observations[sequence]
+        return self._observations[sequence]
 
     def __setitem__(self, sequence: Sequence, observationsRow: Union[list[Symbol], list[bool]]):
-        self.observations[sequence] = observationsRow
+        self._observations[sequence] = observationsRow
+        if not self._stale:
+            self._track_row(sequence)
+
+    @property
+    def red_index(self) -> RowSignatureIndex:
+        self._sync()
+        return self._red_index
+
+    @property
+    def redValues(self) -> set[tuple]:
+        self._sync()
+        if self._red_values is None:
+            self._red_values = {tuple(self._observations[sequence]) for sequence in self._red
+                                if sequence in self._observations}
+        return self._red_values
 
     def is_closed(self) -> Union[Sequence, None]:
-        for sequence in self.blue:
-            blue_symbol = self.observations[sequence]
-            if not(tuple(blue_symbol) in self.redValues):
+        self._sync()
+        for sequence in list(self._unclosed):
+            row_class = self._row_classes.get(sequence)
+            if sequence in self.blue and row_class is not None and not self._red_index.has_signature(row_class):
                 return sequence
+            del self._unclosed[sequence]
         return None
 
-    def update_red_values(self) -> set[Union[list[Symbol], list[bool]]]:
-        self.redValues = set()
-        for sequence in self.red: 
-            redSymbol = tuple(self.observations[sequence])
-            if not (self.redValues in redSymbol):
-                self.redValues.add(redSymbol)
+    def update_red_values(self) -> set[tuple]:
+        self._rebuild()
         return self.redValues
 
     def find_inconsistency(self, alphabet: Alphabet) -> Union[TableInconsistency, None]:
-        redValues: dict[tuple, Union[Sequence, bool]]
-        redValues = {}
-        for row in self.red:
-            rowSymbols = self.observations[row]
-            redValue = redValues.get(tuple(rowSymbols))
-            if not (redValue is None):
-                inconsistency = self._are_inconsistent(redValue, row, alphabet)
+        self._sync()
+        for row_class in list(self._unchecked):
+            # Equal rows are equal to the first of their group, so comparing against it finds any inconsistent pair.
+            sequences = self._red_index.rows_with_signature(row_class)
+            for sequence in sequences[1:]:
+                inconsistency = self._are_inconsistent(sequences[0], sequence, alphabet)
                 if not (inconsistency is None):
                     return inconsistency
-            else:
-                redValues[tuple(rowSymbols)] = row
+            del self._unchecked[row_class]
         return None
 
     def _are_inconsistent(self, sequence1, sequence2, alphabet: Alphabet)-> \
             Union[TableInconsistency, None]:
         for symbol in alphabet.symbols:
-            suffixedSequence1 = sequence1 + symbol
-            suffixedSequence2 = sequence2 + symbol
-            if self.observations[suffixedSequence1] != self.observations[suffixedSequence2]:
+            suffixedSequence1 = self.sequences.concatenation(sequence1, symbol)
+            suffixedSequence2 = self.sequences.concatenation(sequence2, symbol)
+            if self._row_classes[suffixedSequence1] != self._row_classes[suffixedSequence2]:
                 differenceSequence = self._observation_difference_between(
                     suffixedSequence1, suffixedSequence2)
                 return TableInconsistency(sequence1, sequence2, symbol, differenceSequence)
@@ -77,36 +153,100 @@ class GeneralObservationTable:
         return None
 
     def move_from_blue_to_red(self, sequence: Sequence):
-        self.blue.remove(sequence)
-        self.add_to_red(sequence, self.observations[sequence])
+        self._blue.remove(sequence)
+        self.add_to_red(sequence, self._observations[sequence])
 
     def add_to_red(self, sequence: Sequence, values: Union[list[Symbol], list[bool]]):
-        self.red.add(sequence)
-        self.redValues.add(tuple(values))
-    
+        self._red.add(sequence)
+        if not self._stale:
+            row_class = self._class_of(values)
+            self._row_classes.setdefault(sequence, row_class)
+            self._red_index.add_signature(sequence, row_class)
+            self._mark_group_of(sequence)
+            if self._red_values is not None:
+                self._red_values.add(tuple(values))
+
     def add_to_blue(self, sequence: Sequence):
-        self.blue.add(sequence)
+        self._blue.add(sequence)
+        if not self._stale:
+            self._unclosed[sequence] = None
+
+    def add_column(self, suffix: Sequence, sequences: list[Sequence], values: list):
+        """Appends `suffix` to `exp` and `values` to the rows of `sequences`, which should be every row."""
+        self._exp.append(suffix)
+        self._red_values = None
+        for sequence, value in zip(sequences, values):
+            self._observations[sequence].append(value)
+            if not self._stale:
+                self._row_classes[sequence] = self._extended_class(self._row_classes[sequence], value)
+        if self._stale:
+            return
+        if len(sequences) != len(self._observations):
+            # Rows left without the new column no longer match the width of the table.
+            self.invalidate()
+            return
+        # Every signature changed: regroup red rows by their new classes and recheck everything.
+        self._red_index.clear()
+        for sequence in self._red:
+            if sequence in self._row_classes:
+                self._red_index.add_signature(sequence, self._row_classes[sequence])
+        self._unclosed = dict.fromkeys(self._blue)
+        self._unchecked = dict.fromkeys(self._red_index.shared_signatures)
 
     def fill_observations(self, oracle: GeneralTeacher):
-        for red_seq in self.red:
-            if red_seq not in self.observations or \
-                len(self.observations[red_seq]) != len(self.exp):
-                sequences = []
-                for suffix in self.exp:
-                    sequence = red_seq + suffix
-                    sequences.append(oracle.membership_query(sequence))
-
-                self.observations[red_seq] = sequences
-
-        for blue_seq in self.blue:
-            if blue_seq not in self.observations or \
-                len(self.observations[blue_seq]) != len(self.exp):
-                sequences = []
-                for suffix in self.exp:
-                    sequence = blue_seq + suffix
-                    sequences.append(oracle.membership_query(sequence))
-
-                self.observations[blue_seq] = sequences
+        incomplete = [sequence for sequence in list(self.red) + list(self.blue)
+                      if sequence not in self.observations or len(self.observations[sequence]) != len(self.exp)]
+        incomplete = list(dict.fromkeys(incomplete))
+        width = len(self.exp)
+        results = oracle.membership_queries_batch(
+            [sequence + suffix for sequence in incomplete for suffix in self.exp])
+        for i, sequence in enumerate(incomplete):
+            self.observations[sequence] = results[i * width:(i + 1) * width]
+        self._rebuild()
+
+    def _sync(self):
+        if self._stale:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._class_ids = {}
+        self._row_classes = {sequence: self._class_of(row) for sequence, row in self._observations.items()}
+        self._red_index.clear()
+        for sequence in self._red:
+            if sequence in self._row_classes:
+                self._red_index.add_signature(sequence, self._row_classes[sequence])
+        self._unclosed = dict.fromkeys(self._blue)
+        self._unchecked = dict.fromkeys(self._red_index.shared_signatures)
+        self._red_values = None
+        self._stale = False
+
+    def _extended_class(self, row_class: int, value) -> int:
+        return self._class_ids.setdefault((row_class, value), len(self._class_ids) + 1)
+
+    def _class_of(self, row) -> int:
+        row_class = 0
+        for value in row:
+            row_class = self._extended_class(row_class, value)
+        return row_class
+
+    def _track_row(self, sequence: Sequence):
+        row_class = self._class_of(self._observations[sequence])
+        self._row_classes[sequence] = row_class
+        if sequence in self._red:
+            self._red_index.add_signature(sequence, row_class)
+            self._mark_group_of(sequence)
+            self._red_values = None
+        if sequence in self._blue:
+            self._unclosed[sequence] = None
+        if len(sequence) > 0:
+            # A changed successor row can make its red prefix inconsistent with the rows equal to it.
+            sequence_id = self.sequences.intern(sequence)
+            self._mark_group_of(self.sequences.sequence(self.sequences.parent(sequence_id)))
+
+    def _mark_group_of(self, sequence: Sequence):
+        row_class = self._red_index.signature_of(sequence)
+        if row_class is not None and self._red_index.count(row_class) > 1:
+            self._unchecked[row_class] = None
 
     def __str__(self):
         lines = ["\nObservation Table:",
@@ -115,4 +255,4 @@ class GeneralObservationTable:
                  "\nBLUE: " + repr(self.blue),
                  "\nEXP: " + repr(self.exp),
                  "\nOBSERVATIONS: " + repr(self.observations) + "\n"]
-        return ''.join(lines)
\ No newline at end of file
+        return ''.join(lines)
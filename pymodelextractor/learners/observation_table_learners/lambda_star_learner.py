@@ -58,7 +58,9 @@ class LambdaStarLearner(Learner):
         return LearningResult(model, len(model.states),
                               {'equivalence_queries_count': teacher.equivalence_queries_count,
                                'membership_queries_count': teacher.membership_queries_count,
-                               'duration': time.time() - start_time})
+                               'duration': time.time() - start_time,
+                               **teacher.equivalence_query_info,
+                               **teacher.query_cache_info})
 
     def _update_with_new_counterexample(self, observation_table: '_ObservationTable', teacher: Teacher,
                                         counter_example: Sequence) -> None:
@@ -79,17 +81,20 @@ class LambdaStarLearner(Learner):
             self._close_table(observation_table, teacher)
 
     def _fill_hole_for_sequence(self, observation_table: '_ObservationTable', sequence: Sequence, teacher: Teacher) -> None:
+        self._fill_holes_for_sequences(observation_table, [sequence], teacher)
+
+    def _fill_holes_for_sequences(self, observation_table: '_ObservationTable', sequences: list[Sequence],
+                                  teacher: Teacher) -> None:
         suffix = observation_table.exp[-1]
-        observation_table[sequence].append(
-            teacher.membership_query(sequence + suffix))
+        results = teacher.membership_queries_batch([sequence + suffix for sequence in sequences])
+        for sequence, result in zip(sequences, results):
+            observation_table[sequence].append(result)
 
     def _resolve_inconsistency(self, observation_table: '_ObservationTable', inconsistency: TableInconsistency, teacher: Teacher) -> None:
         symbol = inconsistency.symbol
         differenceSequence = inconsistency.differenceSequence
         observation_table.exp.append(symbol+differenceSequence)
-        for sequence in observation_table.observations:
-            self._fill_hole_for_sequence(observation_table, sequence, teacher)
-        pass
+        self._fill_holes_for_sequences(observation_table, list(observation_table.observations), teacher)
 
     def _build_model(self, observation_table: '_ObservationTable') -> SFA:
         # not truly a dfa as it might be missing transitions, but using a dfa with missing transitions is what we need
@@ -104,10 +109,8 @@ class LambdaStarLearner(Learner):
             if blue_sequence is None:
                 return
             observation_table.move_from_blue_to_red(blue_sequence)
-            for symbol in self._observed_symbols:
-                new_blue_sequence = blue_sequence + symbol
-                self._add_to_blue(observation_table,
-                                  teacher, new_blue_sequence)
+            self._add_all_to_blue(observation_table, teacher,
+                                  [blue_sequence + symbol for symbol in self._observed_symbols])
 
     def _get_closedness_violation_sequence(self, observation_table: '_ObservationTable') -> Optional[Sequence]:
         return next(filter(lambda x: not observation_table.same_row_exists_in_red(x), observation_table.blue), None)
@@ -118,22 +121,17 @@ class LambdaStarLearner(Learner):
         # save it inside a set, if sequence is long enough, this will optimize the algorithm
         prefixes = set(counter_example.get_prefixes())
 
-        for sequence in prefixes:
-            self._add_to_red(observation_table, teacher, sequence)
-            for symbol in self._observed_symbols:
-                suffixed_sequence = sequence + symbol
-                if suffixed_sequence not in prefixes:
-                    self._add_to_blue(observation_table,
-                                      teacher, suffixed_sequence)
+        self._add_all_to_red(observation_table, teacher, list(prefixes))
+        self._add_all_to_blue(observation_table, teacher,
+                              [sequence + symbol for sequence in prefixes for symbol in self._observed_symbols
+                               if sequence + symbol not in prefixes])
 
     def _update_observed_symbols(self, sequence: Sequence, observation_table: '_ObservationTable', teacher: Teacher) -> None:
         new_symbols = list(
             s for s in sequence if s not in self._observed_symbols)
         self._observed_symbols.update(new_symbols)
-        for symbol in new_symbols:
-            for red_seq in observation_table.red:
-                new_seq = red_seq + symbol
-                self._add_to_blue(observation_table, teacher, new_seq)
+        self._add_all_to_blue(observation_table, teacher,
+                              [red_seq + symbol for symbol in new_symbols for red_seq in observation_table.red])
         if len(new_symbols) > 0:
             self._close_table(observation_table, teacher)
             self._make_consistent(observation_table, teacher)
@@ -144,28 +142,43 @@ class LambdaStarLearner(Learner):
     def _initialize_observation_table(self, observation_table: '_ObservationTable', teacher: Teacher) -> None:
         observation_table.exp = [epsilon]
         self._add_to_red(observation_table, teacher, epsilon)
-        for symbol in self._observed_symbols:
-            self._add_to_blue(observation_table, teacher, Sequence((symbol,)))
+        self._add_all_to_blue(observation_table, teacher,
+                              [Sequence((symbol,)) for symbol in self._observed_symbols])
 
     def _add_to_red(self, observation_table: '_ObservationTable', teacher: Teacher, sequence: Sequence) -> None:
-        if sequence not in observation_table.red:
-            observation_table.red.add(sequence)
-            observation_table[sequence] = self._get_filled_row_for(
-                observation_table, teacher, sequence)
+        self._add_all_to_red(observation_table, teacher, [sequence])
 
     def _add_to_blue(self, observation_table: '_ObservationTable', teacher: Teacher, sequence: Sequence) -> None:
-        if not sequence in observation_table.blue:
-            observation_table.blue.add(sequence)
-            observation_table[sequence] = self._get_filled_row_for(
-                observation_table, teacher, sequence)
+        self._add_all_to_blue(observation_table, teacher, [sequence])
+
+    def _add_all_to_red(self, observation_table: '_ObservationTable', teacher: Teacher,
+                        sequences: list[Sequence]) -> None:
+        new_sequences = [sequence for sequence in dict.fromkeys(sequences)
+                         if sequence not in observation_table.red]
+        observation_table.red.update(new_sequences)
+        for sequence, row in zip(new_sequences,
+                                 self._get_filled_rows_for(observation_table, teacher, new_sequences)):
+            observation_table[sequence] = row
+
+    def _add_all_to_blue(self, observation_table: '_ObservationTable', teacher: Teacher,
+                         sequences: list[Sequence]) -> None:
+        new_sequences = [sequence for sequence in dict.fromkeys(sequences)
+                         if sequence not in observation_table.blue]
+        observation_table.blue.update(new_sequences)
+        for sequence, row in zip(new_sequences,
+                                 self._get_filled_rows_for(observation_table, teacher, new_sequences)):
+            observation_table[sequence] = row
 
     def _get_filled_row_for(self, observation_table: '_ObservationTable', teacher: Teacher, sequence: Sequence) -> list[bool]:
+        return self._get_filled_rows_for(observation_table, teacher, [sequence])[0]
+
+    def _get_filled_rows_for(self, observation_table: '_ObservationTable', teacher: Teacher,
+                             sequences: list[Sequence]) -> list[list[bool]]:
         suffixes = observation_table.exp
-        row: list[bool] = []
-        for suffix in suffixes:
-            result = teacher.membership_query(sequence + suffix)
-            row.append(result)
-        return row
+        width = len(suffixes)
+        results = teacher.membership_queries_batch(
+            [sequence + suffix for sequence in sequences for suffix in suffixes])
+        return [results[i * width:(i + 1) * width] for i in range(len(sequences))]
 
 
 class _ObservationTable(ObservationTable):
@@ -175,22 +188,5 @@ class _ObservationTable(ObservationTable):
     def is_closed(self) -> bool:
         return all(self.same_row_exists_in_red(s) for s in self.blue)
 
-    def same_row_exists_in_red(self, blueSequence: Sequence) -> bool:
-        # TODO check if this is what i need
-        return any(self.observations[sequence] == self.observations[blueSequence]
-                   for sequence in self.red)
-
     def find_inconsistency(self, alphabet: Alphabet) -> Optional[TableInconsistency]:
-        # TODO check if this is what i need
-        redList = list(self.red)
-        redListLength = len(redList)
-        for i in range(redListLength):
-            for j in range(i + 1, redListLength):
-                red1 = redList[i]
-                red2 = redList[j]
-                if red1 != red2 and self.observations[red1] == self.observations[red2]:
-                    inconsistency = self._inconsistency_between(
-                        red1, red2, alphabet)
-                    if inconsistency is not None:
-                        return inconsistency
-        return None
+        return self._find_inconsistency_among_red(alphabet)
@@ -15,8 +15,9 @@ import time
 
 class LStarLearner(Learner):
 
-    def __init__(self):
+    def __init__(self, compact_observations: bool = False):
         self._model_translator = FAObservationTableTranslator()
+        self._compact_observations = compact_observations
 
     def learn(self, teacher: Teacher) -> LearningResult:
         start_time = time.time()
@@ -43,18 +44,21 @@ class LStarLearner(Learner):
         return self._teacher.equivalence_query(model)
 
     def _build_observation_table(self):
-        self._observation_table = LStarObservationTable(self._alphabet)
+        self._observation_table = LStarObservationTable(self._alphabet, self._compact_observations)
 
     def _initialize_observation_table(self):
         self._observation_table.exp = [epsilon]
         self._add_to_red(epsilon)
-        for symbol in self._symbols:
-            self._add_to_blue(Sequence((symbol,)))
+        self._add_all_to_blue([Sequence((symbol,)) for symbol in self._symbols])
 
     def _fill_hole_for(self, sequence: Sequence):
+        self._fill_holes_for([sequence])
+
+    def _fill_holes_for(self, sequences: list[Sequence]):
         suffix = self._observation_table.exp[-1]
-        self._observation_table[sequence].append(
-            self._teacher.membership_query(sequence + suffix))
+        results = self._teacher.membership_queries_batch([sequence + suffix for sequence in sequences])
+        for sequence, result in zip(sequences, results):
+            self._observation_table[sequence].append(result)
 
     def _close(self):
         while True:
@@ -62,9 +66,7 @@ class LStarLearner(Learner):
             if blueSequence is None:
                 return
             self._move_from_blue_to_red(blueSequence)
-            for symbol in self._symbols:
-                newBlueSequence = blueSequence + symbol
-                self._add_to_blue(newBlueSequence)
+            self._add_all_to_blue([blueSequence + symbol for symbol in self._symbols])
 
     def _get_closedness_violation_sequence(self):
         for sequence in self._observation_table.blue:
@@ -84,37 +86,43 @@ class LStarLearner(Learner):
         symbol = inconsistency.symbol
         differenceSequence = inconsistency.differenceSequence
         self._observation_table.exp.append(symbol + differenceSequence)
-        for sequence in self._observation_table.observations:
-            self._fill_hole_for(sequence)
+        self._fill_holes_for(list(self._observation_table.observations))
 
     def _update_observation_table_with(self, counterexample):
         prefixes = counterexample.get_prefixes()
-        for sequence in prefixes:
-            self._add_to_red(sequence)
-            for symbol in self._symbols:
-                suffixedSequence = sequence + symbol
-                if suffixedSequence not in prefixes:
-                    self._add_to_blue(suffixedSequence)
+        self._add_all_to_red(prefixes)
+        self._add_all_to_blue([sequence + symbol for sequence in prefixes for symbol in self._symbols
+                               if sequence + symbol not in prefixes])
 
     def _add_to_red(self, sequence: Sequence):
-        if sequence not in self._observation_table.red:
-            self._observation_table.red.add(sequence)
-            self._observation_table[sequence] = self._get_filled_row_for(
-                sequence)
+        self._add_all_to_red([sequence])
 
     def _add_to_blue(self, sequence: Sequence):
-        if not sequence in self._observation_table.blue:
-            self._observation_table.blue.add(sequence)
-            self._observation_table[sequence] = self._get_filled_row_for(
-                sequence)
+        self._add_all_to_blue([sequence])
+
+    def _add_all_to_red(self, sequences: list[Sequence]):
+        newSequences = [sequence for sequence in dict.fromkeys(sequences)
+                        if sequence not in self._observation_table.red]
+        self._observation_table.red.update(newSequences)
+        for sequence, row in zip(newSequences, self._get_filled_rows_for(newSequences)):
+            self._observation_table[sequence] = row
+
+    def _add_all_to_blue(self, sequences: list[Sequence]):
+        newSequences = [sequence for sequence in dict.fromkeys(sequences)
+                        if sequence not in self._observation_table.blue]
+        self._observation_table.blue.update(newSequences)
+        for sequence, row in zip(newSequences, self._get_filled_rows_for(newSequences)):
+            self._observation_table[sequence] = row
 
     def _get_filled_row_for(self, sequence: Sequence) -> list:
+        return self._get_filled_rows_for([sequence])[0]
+
+    def _get_filled_rows_for(self, sequences: list[Sequence]) -> list[list]:
         requiredSuffixes = self._observation_table.exp
-        row = []
-        for suffix in requiredSuffixes:
-            result = self._teacher.membership_query(sequence + suffix)
-            row.append(result)
-        return row
+        width = len(requiredSuffixes)
+        results = self._teacher.membership_queries_batch(
+            [sequence + suffix for sequence in sequences for suffix in requiredSuffixes])
+        return [results[i * width:(i + 1) * width] for i in range(len(sequences))]
 
     def _learning_results_for(self, model, duration):
         numberOfStates = len(model.states) if model is not None else 0
@@ -123,6 +131,8 @@ class LStarLearner(Learner):
             'membership_queries_count': self._teacher.membership_queries_count,
             'observation_table': self._observation_table,
             'duration': duration,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info
         }
         return LearningResult(model, numberOfStates, info)
 
@@ -143,9 +153,9 @@ class LStarLearner(Learner):
 
 
 class LStarObservationTable(ObservationTable):
-    def __init__(self, alphabet: Alphabet):
+    def __init__(self, alphabet: Alphabet, compact: bool = False):
         self.alphabet = alphabet
-        super().__init__()
+        super().__init__(compact)
 
     def is_closed(self) -> bool:
         for sequence in self.blue:
@@ -153,25 +163,8 @@ class LStarObservationTable(ObservationTable):
                 return False
         return True
 
-    def same_row_exists_in_red(self, blueSequence: Sequence) -> bool:
-        for sequence in self.red:
-            if self.observations[sequence] == self.observations[blueSequence]:
-                return True
-        return False
-
     def is_consistent(self) -> bool:
         return self.find_inconsistency() is not None
 
     def find_inconsistency(self) -> Union[tuple, None, TableInconsistency]:
-        redList = list(self.red)
-        redListLength = len(redList)
-        for i in range(redListLength):
-            for j in range(i + 1, redListLength):
-                red1 = redList[i]
-                red2 = redList[j]
-                if red1 != red2 and self.observations[red1] == self.observations[red2]:
-                    inconsistency = self._inconsistency_between(
-                        red1, red2, self.alphabet)
-                    if inconsistency is not None:
-                        return inconsistency
-        return None
+        return self._find_inconsistency_among_red(self.alphabet)
@@ -10,8 +10,9 @@ from pymodelextractor.learners.observation_table_learners.lstar_learner import L
 
 class LStarColLearner(Learner):
 
-    def __init__(self):
+    def __init__(self, compact_observations: bool = False):
         self._model_translator = FAObservationTableTranslator()
+        self._compact_observations = compact_observations
 
     def learn(self, teacher: Teacher) -> LearningResult:        
         self._teacher = teacher
@@ -31,17 +32,21 @@ class LStarColLearner(Learner):
         return self._learning_results_for(model)
 
     def _build_observation_table(self):
-        self._observation_table = LStarObservationTable(self._alphabet)
+        self._observation_table = LStarObservationTable(self._alphabet, self._compact_observations)
 
     def _initialize_observation_table(self):
         self._observation_table.exp = [epsilon]
         self._add_to_red(epsilon)
-        for symbol in self._symbols:
-            self._add_to_blue(Sequence((symbol,)))
+        self._add_all_to_blue([Sequence((symbol,)) for symbol in self._symbols])
 
     def _fill_hole_for(self, sequence: Sequence):
+        self._fill_holes_for([sequence])
+
+    def _fill_holes_for(self, sequences: list[Sequence]):
         suffix = self._observation_table.exp[-1]
-        self._observation_table[sequence].append(self._teacher.membership_query(sequence + suffix))
+        results = self._teacher.membership_queries_batch([sequence + suffix for sequence in sequences])
+        for sequence, result in zip(sequences, results):
+            self._observation_table[sequence].append(result)
 
     def _close(self):
         while True:
@@ -49,9 +54,7 @@ class LStarColLearner(Learner):
             if blueSequence is None:
                 return
             self._move_from_blue_to_red(blueSequence)
-            for symbol in self._symbols:
-                newBlueSequence = blueSequence + symbol
-                self._add_to_blue(newBlueSequence)
+            self._add_all_to_blue([blueSequence + symbol for symbol in self._symbols])
 
     def _get_closedness_violation_sequence(self):
         return next(filter(self._no_same_row_exists_in_red, self._observation_table.blue), None)
@@ -67,8 +70,7 @@ class LStarColLearner(Learner):
             self._fill_last_column()
 
     def _fill_last_column(self):
-        for sequence in self._observation_table.observations:
-            self._fill_hole_for(sequence)
+        self._fill_holes_for(list(self._observation_table.observations))
 
     def _add_to_red(self, sequence: Sequence):
         if sequence not in self._observation_table.red:
@@ -76,24 +78,33 @@ class LStarColLearner(Learner):
             self._observation_table[sequence] = self._get_filled_row_for(sequence)
 
     def _add_to_blue(self, sequence: Sequence):
-        if not sequence in self._observation_table.blue:
-            self._observation_table.blue.add(sequence)
-            self._observation_table[sequence] = self._get_filled_row_for(sequence)
+        self._add_all_to_blue([sequence])
+
+    def _add_all_to_blue(self, sequences: list[Sequence]):
+        newSequences = [sequence for sequence in dict.fromkeys(sequences)
+                        if sequence not in self._observation_table.blue]
+        self._observation_table.blue.update(newSequences)
+        for sequence, row in zip(newSequences, self._get_filled_rows_for(newSequences)):
+            self._observation_table[sequence] = row
 
     def _get_filled_row_for(self, sequence: Sequence) -> list:
+        return self._get_filled_rows_for([sequence])[0]
+
+    def _get_filled_rows_for(self, sequences: list[Sequence]) -> list[list]:
         requiredSuffixes = self._observation_table.exp
-        row = []
-        for suffix in requiredSuffixes:
-            result = self._teacher.membership_query(sequence + suffix)
-            row.append(result)
-        return row
+        width = len(requiredSuffixes)
+        results = self._teacher.membership_queries_batch(
+            [sequence + suffix for sequence in sequences for suffix in requiredSuffixes])
+        return [results[i * width:(i + 1) * width] for i in range(len(sequences))]
 
     def _learning_results_for(self, model):
         numberOfStates = len(model.states) if model is not None else 0
         info = {
             'equivalence_queries_count': self._teacher.equivalence_queries_count,
             'membership_queries_count': self._teacher.membership_queries_count,
-            'observation_table': self._observation_table
+            'observation_table': self._observation_table,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info
         }
         return LearningResult(model, numberOfStates, info)
 
@@ -9,37 +9,47 @@ import time
 lamda = Sequence()
 
 class MMLStarLearner:
-    def __init__(self):
+    def __init__(self, compact_observations: bool = False):
         self._model_translator = MMObservationTableTranslator()
+        self._compact_observations = compact_observations
 
     def _build_observation_table(self):
-        self._observation_table = MMObservationTable()
+        self._observation_table = MMObservationTable(self._compact_observations)
     
     def _initialize_observation_table(self):
         self._observation_table.exp = [lamda]
         self._add_to_red(lamda)
-        for symbol in self._symbols:
-            self._add_to_blue(Sequence((symbol,)))
+        self._add_all_to_blue([Sequence((symbol,)) for symbol in self._symbols])
 
     def _add_to_blue(self, sequence: Sequence):
-        if not sequence in self._observation_table.blue:
-            self._observation_table.blue.add(sequence)
-            self._observation_table[sequence] = self._get_filled_row_for(
-                sequence)
+        self._add_all_to_blue([sequence])
+
+    def _add_all_to_blue(self, sequences: list[Sequence]):
+        newSequences = [sequence for sequence in dict.fromkeys(sequences)
+                        if sequence not in self._observation_table.blue]
+        self._observation_table.blue.update(newSequences)
+        for sequence, row in zip(newSequences, self._get_filled_rows_for(newSequences)):
+            self._observation_table[sequence] = row
 
     def _add_to_red(self, sequence: Sequence):
-        if sequence not in self._observation_table.red:
-            redValue = self._get_filled_row_for(sequence)
+        self._add_all_to_red([sequence])
+
+    def _add_all_to_red(self, sequences: list[Sequence]):
+        newSequences = [sequence for sequence in dict.fromkeys(sequences)
+                        if sequence not in self._observation_table.red]
+        for sequence, redValue in zip(newSequences, self._get_filled_rows_for(newSequences)):
             self._observation_table[sequence] = redValue
             self._observation_table.add_to_red(sequence, redValue)
     
     def _get_filled_row_for(self, sequence: Sequence) -> list:
+        return self._get_filled_rows_for([sequence])[0]
+
+    def _get_filled_rows_for(self, sequences: list[Sequence]) -> list[list]:
         requiredSuffixes = self._observation_table.exp
-        row = []
-        for suffix in requiredSuffixes:
-            result = self._teacher.membership_query(sequence + suffix)
-            row.append(result)
-        return row
+        width = len(requiredSuffixes)
+        results = self._teacher.membership_queries_batch(
+            [sequence + suffix for sequence in sequences for suffix in requiredSuffixes])
+        return [results[i * width:(i + 1) * width] for i in range(len(sequences))]
 
     def learn(self, teacher: MMTeacher, verbose: bool = False) -> LearningResult:
         start_time = time.time()
@@ -83,12 +93,9 @@ class MMLStarLearner:
 
     def _update_observation_table_with(self, counterexample):
         prefixes = counterexample.get_prefixes()
-        for sequence in prefixes:
-            self._add_to_red(sequence)
-            for symbol in self._symbols:
-                suffixedSequence = sequence + symbol
-                if suffixedSequence not in prefixes:
-                    self._add_to_blue(suffixedSequence)
+        self._add_all_to_red(prefixes)
+        self._add_all_to_blue([sequence + symbol for sequence in prefixes for symbol in self._symbols
+                               if sequence + symbol not in prefixes])
 
     def _learning_results_for(self, model, duration):
         numberOfStates = len(model.states) if model is not None else 0
@@ -97,6 +104,8 @@ class MMLStarLearner:
             'membership_queries_count': self._teacher.membership_queries_count,
             'observation_table': self._observation_table,
             'duration': duration,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info
         }
         return LearningResult(model, numberOfStates, info)
 
@@ -113,8 +122,7 @@ class MMLStarLearner:
             self._add_suffixes_to_blue(closedCounterExample)
 
     def _add_suffixes_to_blue(self, sequence: Sequence):
-        for symbol in self._symbols:
-            self._add_to_blue(sequence + symbol)
+        self._add_all_to_blue([sequence + symbol for symbol in self._symbols])
 
     def _make_consistent(self):
         while True:
@@ -136,13 +144,16 @@ class MMLStarLearner:
     def _resolve_inconsistency(self, inconsistency):
         symbol = inconsistency.symbol + inconsistency.differenceSequence
         self._observation_table.exp.append(symbol)
-        for sequence in self._observation_table.observations:
-            self._fill_hole_for(sequence, symbol)
+        self._fill_holes_for(list(self._observation_table.observations), symbol)
         self._observation_table.update_red_values()
         
 
     def _fill_hole_for(self, sequence: Sequence, suffix: Sequence):
-        self._observation_table[sequence].append(
-            self._teacher.membership_query(sequence + suffix))
+        self._fill_holes_for([sequence], suffix)
+
+    def _fill_holes_for(self, sequences: list[Sequence], suffix: Sequence):
+        results = self._teacher.membership_queries_batch([sequence + suffix for sequence in sequences])
+        for sequence, result in zip(sequences, results):
+            self._observation_table[sequence].append(result)
     
     
\ No newline at end of file
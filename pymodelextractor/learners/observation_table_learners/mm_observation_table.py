@@ -5,21 +5,24 @@ from pythautomata.base_types.alphabet import Alphabet
 import time
 
 from pymodelextractor.learners.observation_table_learners.observation_table import TableInconsistency
+from pymodelextractor.learners.observation_table_learners.columnar_observations import ColumnarObservations
+from pymodelextractor.learners.observation_table_learners.row_signature_index import RowSignatureIndex
 
 
 class MMObservationTable:
+    """Observation table of Moore machine outputs; `compact` stores them as integer-coded columns."""
     red: set[Sequence]
     blue: set[Sequence]
     observations: dict[Sequence, list[Symbol]]
     exp: list[Sequence]
 
-    def __init__(self):
+    def __init__(self, compact: bool = False):
         self.red = set()
         self.blue = set()
-        self.observations = {}
+        self.observations = ColumnarObservations(boolean=False) if compact else {}
         self.exp = []
 
-        self.redValues = set()
+        self._red_index = RowSignatureIndex()
 
     def __getitem__(self, sequence: Sequence) -> list[Symbol]:
         return self.observations[sequence]
@@ -27,33 +30,32 @@ class MMObservationTable:
     def __setitem__(self, sequence: Sequence, observationsRow: list[Symbol]):
         self.observations[sequence] = observationsRow
 
+    @property
+    def red_index(self) -> RowSignatureIndex:
+        return self._red_index.sync(self.red, self.observations, len(self.exp))
+
+    @property
+    def redValues(self) -> set[tuple]:
+        return {tuple(self.observations[sequence]) for sequence in self.red if sequence in self.observations}
+
     def is_closed(self) -> Union[Sequence, None]:
+        red_index = self.red_index
         for sequence in self.blue:
-            blue_symbol = self.observations[sequence]
-            if not(tuple(blue_symbol) in self.redValues):
+            if self.observations[sequence] not in red_index:
                 return sequence
         return None
 
-    def update_red_values(self) -> set[list[Symbol]]:
-        self.redValues = set()
-        for sequence in self.red: 
-            redSymbol = tuple(self.observations[sequence])
-            if not (self.redValues in redSymbol):
-                self.redValues.add(redSymbol)
-        return self.redValues
+    def update_red_values(self):
+        self._red_index.rebuild(self.red, self.observations, len(self.exp))
+        return self._red_index.signatures
 
     def find_inconsistency(self, alphabet: Alphabet) -> Union[TableInconsistency, None]:
-        redValues: dict[tuple, Sequence]
-        redValues = {}
-        for row in self.red:
-            rowSymbols = self.observations[row]
-            redValue = redValues.get(tuple(rowSymbols))
-            if not (redValue is None):
-                inconsistency = self._are_inconsistent(redValue, row, alphabet)
+        # Equal rows are equal to the first of their group, so comparing against it finds any inconsistent pair.
+        for sequences in self.red_index.rows_sharing_signature():
+            for sequence in sequences[1:]:
+                inconsistency = self._are_inconsistent(sequences[0], sequence, alphabet)
                 if not (inconsistency is None):
                     return inconsistency
-            else:
-                redValues[tuple(rowSymbols)] = row
         return None
 
     def _are_inconsistent(self, sequence1, sequence2, alphabet: Alphabet)-> \
@@ -82,7 +84,7 @@ class MMObservationTable:
 
     def add_to_red(self, sequence: Sequence, values: list[Symbol]):
         self.red.add(sequence)
-        self.redValues.add(tuple(values))
+        self._red_index.add(sequence, self.observations.get(sequence, values))
     
     def add_to_blue(self, sequence: Sequence):
         self.blue.add(sequence)
@@ -0,0 +1,105 @@
+from typing import Iterable, Iterator
+
+import numpy as np
+from pythautomata.base_types.sequence import Sequence
+
+
+class ObservationMatrix:
+    """Rows of weights keyed by sequence, stored in one growable 2-D numpy array.
+
+    Every sequence owns a row of the matrix and a width, the number of suffixes it has
+    values for. `matrix[sequence]` is a view of the filled part of its row, so reading
+    rows copies nothing; views are only valid until the matrix grows, which can happen
+    on any write. Rows and columns grow by doubling, and `extend_rows` writes the new
+    columns of many rows with a single assignment when their widths agree.
+    """
+
+    def __init__(self, dtype=np.float64, initial_rows: int = 64, initial_columns: int = 8):
+        self._dtype = np.dtype(dtype)
+        self._matrix = np.zeros((max(1, initial_rows), max(1, initial_columns)), dtype=self._dtype)
+        self._widths = np.zeros(self._matrix.shape[0], dtype=np.int64)
+        self._row_index = {}
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes
+
+    def __len__(self) -> int:
+        return len(self._row_index)
+
+    def __contains__(self, sequence: Sequence) -> bool:
+        return sequence in self._row_index
+
+    def __iter__(self) -> Iterator[Sequence]:
+        return iter(self._row_index)
+
+    def keys(self):
+        return self._row_index.keys()
+
+    def __getitem__(self, sequence: Sequence) -> np.ndarray:
+        row = self._row_index[sequence]
+        return self._matrix[row, :self._widths[row]]
+
+    def __setitem__(self, sequence: Sequence, values: Iterable[float]):
+        values = np.asarray(values, dtype=self._dtype)
+        row = self._row_for(sequence)
+        self._reserve_columns(len(values))
+        self._matrix[row, :len(values)] = values
+        self._widths[row] = len(values)
+
+    def width(self, sequence: Sequence) -> int:
+        return int(self._widths[self._row_index[sequence]])
+
+    def rows(self, sequences: list[Sequence]) -> np.ndarray:
+        """Copy of the rows of `sequences`, which must all have the same width, as a 2-D array."""
+        indices = np.fromiter((self._row_index[sequence] for sequence in sequences), dtype=np.int64,
+                              count=len(sequences))
+        widths = self._widths[indices]
+        width = int(widths[0]) if len(indices) > 0 else 0
+        assert np.all(widths == width), 'Rows should have the same width'
+        return self._matrix[indices, :width]
+
+    def extend_rows(self, sequences: list[Sequence], values) -> None:
+        """Appends `values[i]`, one value per new column, to the row of `sequences[i]`."""
+        values = np.asarray(values, dtype=self._dtype)
+        if values.size == 0:
+            return
+        values = values.reshape(len(sequences), -1)
+        indices = np.fromiter((self._row_index[sequence] for sequence in sequences), dtype=np.int64,
+                              count=len(sequences))
+        widths = self._widths[indices]
+        added = values.shape[1]
+        self._reserve_columns(int(widths.max()) + added)
+        width = int(widths[0])
+        if np.all(widths == width):
+            self._matrix[indices, width:width + added] = values
+        else:
+            for index, row_width, row_values in zip(indices, widths, values):
+                self._matrix[index, row_width:row_width + added] = row_values
+        self._widths[indices] = widths + added
+
+    def _row_for(self, sequence: Sequence) -> int:
+        row = self._row_index.get(sequence)
+        if row is None:
+            row = len(self._row_index)
+            if row == self._matrix.shape[0]:
+                self._resize(2 * self._matrix.shape[0], self._matrix.shape[1])
+                self._widths = np.concatenate([self._widths, np.zeros_like(self._widths)])
+            self._row_index[sequence] = row
+        return row
+
+    def _reserve_columns(self, width: int):
+        columns = self._matrix.shape[1]
+        if width > columns:
+            while columns < width:
+                columns *= 2
+            self._resize(self._matrix.shape[0], columns)
+
+    def _resize(self, rows: int, columns: int):
+        matrix = np.zeros((rows, columns), dtype=self._dtype)
+        matrix[:self._matrix.shape[0], :self._matrix.shape[1]] = self._matrix
+        self._matrix = matrix
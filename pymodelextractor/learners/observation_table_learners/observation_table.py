@@ -5,6 +5,8 @@ from typing import Union
 from pythautomata.base_types.alphabet import Alphabet
 from pythautomata.base_types.sequence import Sequence
 from pythautomata.base_types.symbol import Symbol
+from pymodelextractor.learners.observation_table_learners.columnar_observations import ColumnarObservations
+from pymodelextractor.learners.observation_table_learners.row_signature_index import RowSignatureIndex
 
 epsilon = Sequence()
 
@@ -37,22 +39,30 @@ class TableInconsistency():
 
 
 class ObservationTable(ABC):
+    """Boolean observation table.
+
+    Rows are lists of booleans unless `compact` is set, in which case they are stored as
+    packed bit columns in a `ColumnarObservations` and read through list-like views.
+    """
     red: set[Sequence]
     blue: set[Sequence]
     exp: list[Sequence]
     observations: dict[Sequence, list[bool]]
 
-    def __init__(self):
+    def __init__(self, compact: bool = False):
         self.red = set()
         self.blue = set()
         self.exp = []
-        self.observations = {}
+        self.observations = ColumnarObservations(boolean=True) if compact else {}
+        self._red_index = RowSignatureIndex()
 
     def __getitem__(self, sequence: Sequence) -> list[bool]:
         return self.observations[sequence]
 
     def __setitem__(self, sequence: Sequence, observationsRow: list[bool]):
         self.observations[sequence] = observationsRow
+        if sequence in self.red:
+            self._red_index.add(sequence, self.observations[sequence])
 
     @abstractmethod
     def is_closed(self) -> bool:
@@ -65,6 +75,23 @@ class ObservationTable(ABC):
     def move_from_blue_to_red(self, sequence: Sequence):
         self.blue.remove(sequence)
         self.red.add(sequence)
+        self._red_index.add(sequence, self.observations[sequence])
+
+    @property
+    def red_index(self) -> RowSignatureIndex:
+        return self._red_index.sync(self.red, self.observations, len(self.exp))
+
+    def same_row_exists_in_red(self, sequence: Sequence) -> bool:
+        return self.observations[sequence] in self.red_index
+
+    def _find_inconsistency_among_red(self, alphabet: Alphabet) -> Union[TableInconsistency, None]:
+        # Equal rows are equal to the first of their group, so comparing against it finds any inconsistent pair.
+        for sequences in self.red_index.rows_sharing_signature():
+            for sequence in sequences[1:]:
+                inconsistency = self._inconsistency_between(sequences[0], sequence, alphabet)
+                if inconsistency is not None:
+                    return inconsistency
+        return None
 
     def _inconsistency_between(self, sequence1: Sequence, sequence2: Sequence, alphabet: Alphabet) -> \
             Union[TableInconsistency, None]:
@@ -1,4 +1,5 @@
 import time
+import numpy as np
 
 from pythautomata.base_types.sequence import Sequence
 from pythautomata.model_comparators.wfa_comparison_strategy import WFAComparator
@@ -16,8 +17,10 @@ from pymodelextractor.learners.learning_result import LearningResult
 
 class PDFALStarLearner:
 
-    def __init__(self, comparator: WFAComparator = None, model_translator: PDFAObservationTableTranslator = None):
+    def __init__(self, comparator: WFAComparator = None, model_translator: PDFAObservationTableTranslator = None,
+                 observation_dtype=np.float64):
         self.terminal_symbol = None
+        self.observation_dtype = observation_dtype
         self._teacher = None
         self.tolerance = None
         if comparator is None:
@@ -80,7 +83,9 @@ class PDFALStarLearner:
         info = {
             'equivalence_queries_count': self._teacher.equivalence_queries_count,
             'last_token_weight_queries_count': self._teacher.last_token_weight_queries_count,
-            'observation_table': self.observation_table
+            'observation_table': self.observation_table,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info
         }
         numberOfStates = len(model.weighted_states) if model is not None else 0
         learningResult = LearningResult(model, numberOfStates, info)
@@ -92,15 +97,14 @@ class PDFALStarLearner:
         self._teacher.reset()
 
     def __build_observation_table(self):
-        self.observation_table = PDFAObservationTable(self.__alphabet, self.comparator)
+        self.observation_table = PDFAObservationTable(self.__alphabet, self.comparator, self.observation_dtype)
 
     def __initialize_observation_table(self):
         self.observation_table.add_suffix(Sequence([self.terminal_symbol]))
         for s in self.__symbols:
             self.observation_table.add_suffix(Sequence([s]))
         self.__add_to_red(epsilon)
-        for symbol in self.__symbols:
-            seq = Sequence([symbol])
+        for seq in self.observation_table.sequences.extensions(epsilon, self.__symbols):
             self.__add_to_blue(seq)
 
     def __seq_prefix_weight(self, seq):
@@ -130,8 +134,7 @@ class PDFALStarLearner:
         violating_sequence = self.observation_table.get_violating_closedness_sequence()
         while violating_sequence is not None:
             self.__add_to_red(violating_sequence)
-            for symbol in self.__symbols:
-                new_blue_sequence = violating_sequence + symbol
+            for new_blue_sequence in self.observation_table.sequences.extensions(violating_sequence, self.__symbols):
                 self.__add_to_blue(new_blue_sequence)
             violating_sequence = self.observation_table.get_violating_closedness_sequence()
 
@@ -147,19 +150,19 @@ class PDFALStarLearner:
         different_suffix = inconsistency.different_suffix
         new_suffix = symbol + different_suffix
         self.observation_table.add_suffix(new_suffix)
-        for sequence in self.observation_table.get_observed_sequences():
-            self._fill_hole_for(sequence, new_suffix)
+        sequences = self.observation_table.get_observed_sequences()
+        self.observation_table.extend_rows(sequences, [self._get_hole_value_for(sequence, new_suffix)
+                                                       for sequence in sequences])
 
-    def _fill_hole_for(self, sequence: Sequence, suffix):
-        self.observation_table[sequence].append(self._teacher.last_token_weights(sequence, [suffix])[0])
+    def _get_hole_value_for(self, sequence: Sequence, suffix) -> float:
+        return self._teacher.last_token_weights(sequence, [suffix])[0]
 
     def __update_observation_table_with(self, counterexample):
-        prefixes = counterexample.get_prefixes()
+        prefixes = self.observation_table.sequences.prefixes(counterexample)
         for sequence in prefixes:
             self.__add_to_red(sequence)
         for prefix in self.observation_table.red:
-            for symbol in self.__symbols:
-                blue_prefix = prefix + symbol
+            for blue_prefix in self.observation_table.sequences.extensions(prefix, self.__symbols):
                 self.__add_to_blue(blue_prefix)
 
     # Helper methods
@@ -17,8 +17,10 @@ from pymodelextractor.learners.learning_result import LearningResult
 
 class PDFALStarColLearner:
 
-    def __init__(self, comparator: WFAComparator = None, model_translator: PDFAObservationTableTranslator = None):
+    def __init__(self, comparator: WFAComparator = None, model_translator: PDFAObservationTableTranslator = None,
+                 observation_dtype=np.float64):
         self.terminal_symbol = None
+        self.observation_dtype = observation_dtype
         self._teacher = None
         if comparator is None:
             self.comparator = WFAToleranceComparator()
@@ -73,7 +75,9 @@ class PDFALStarColLearner:
         info = {
             'equivalence_queries_count': self._teacher.equivalence_queries_count,
             'last_token_weight_queries_count': self._teacher.last_token_weight_queries_count,
-            'observation_table': self.observation_table
+            'observation_table': self.observation_table,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info
         }
         learningResult = LearningResult(model, len(model.weighted_states), info)
         return learningResult
@@ -84,15 +88,14 @@ class PDFALStarColLearner:
         self._teacher.reset()
 
     def __build_observation_table(self):
-        self.observation_table = PDFAObservationTable(self.__alphabet, self.comparator)
+        self.observation_table = PDFAObservationTable(self.__alphabet, self.comparator, self.observation_dtype)
 
     def __initialize_observation_table(self):
         self.observation_table.add_suffix(Sequence([self.terminal_symbol]))
         for s in self.__symbols:
             self.observation_table.add_suffix(Sequence([s]))
         self.__add_to_red(epsilon)
-        for symbol in self.__symbols:
-            seq = Sequence([symbol])
+        for seq in self.observation_table.sequences.extensions(epsilon, self.__symbols):
             self.__add_to_blue(seq)
 
     def __seq_prefix_weight(self, seq):
@@ -122,13 +125,12 @@ class PDFALStarColLearner:
         violating_sequence = self.observation_table.get_violating_closedness_sequence()
         while violating_sequence is not None:
             self.__add_to_red(violating_sequence)
-            for symbol in self.__symbols:
-                new_blue_sequence = violating_sequence + symbol
+            for new_blue_sequence in self.observation_table.sequences.extensions(violating_sequence, self.__symbols):
                 self.__add_to_blue(new_blue_sequence)
             violating_sequence = self.observation_table.get_violating_closedness_sequence()
 
-    def _fill_hole_for(self, sequence: Sequence, suffixes):
-        self.observation_table[sequence].extend(self._teacher.last_token_weights(sequence, suffixes))
+    def _get_hole_values_for(self, sequence: Sequence, suffixes) -> list[float]:
+        return self._teacher.last_token_weights(sequence, suffixes)
 
     def __update_observation_table_with(self, counterexample, proposed_model):
         all_suffixes = []
@@ -139,8 +141,9 @@ class PDFALStarColLearner:
             added = self.observation_table.add_suffix(suffix)
             if added:
                 all_suffixes.append(suffix)
-        for sequence in self.observation_table.get_observed_sequences():
-            self._fill_hole_for(sequence, all_suffixes)
+        sequences = self.observation_table.get_observed_sequences()
+        self.observation_table.extend_rows(sequences, [self._get_hole_values_for(sequence, all_suffixes)
+                                                       for sequence in sequences])
 
     def __get_shortest_counterexample_with_symbol(self, counterexample, proposed_model):
         symbols = list(self.__symbols)
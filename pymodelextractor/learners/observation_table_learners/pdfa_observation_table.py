@@ -3,10 +3,15 @@ from pythautomata.base_types.sequence import Sequence
 from pythautomata.base_types.alphabet import Alphabet
 from collections import namedtuple
 from typing import Union
-import heapq
+import numpy as np
 
 from pythautomata.model_comparators.wfa_comparison_strategy import WFAComparator
 from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pymodelextractor.learners.observation_table_learners.observation_matrix import ObservationMatrix
+from pymodelextractor.learners.observation_table_learners.row_matching_index import RowMatchingIndex, \
+    row_matching_index_for
+from pymodelextractor.utils.indexed_heap import IndexedHeap
+from pymodelextractor.utils.sequence_store import SequenceStore
 
 epsilon = Sequence()
 
@@ -14,43 +19,108 @@ Inconsistency = namedtuple('Inconsistency', 'sequence1 sequence2 symbol differen
 
 
 class PDFAObservationTable:
-
-    def __init__(self, alphabet: Alphabet, comparator: WFAComparator):
+    """Observation table of next-token weights, compared with a `WFAComparator`.
+
+    Red rows are kept in a `RowMatchingIndex` for the comparator, so closedness and
+    consistency checks only run `equivalent_output` on the few red rows bucketed near a
+    row. The index is rebuilt when suffixes are added or `red` or `comparator` is
+    replaced; red rows are added to it as they are observed, so `red` should only grow
+    through `add_to_red`.
+
+    Blue rows wait in an `IndexedHeap` ordered by their weight. A blue row found to
+    match a red row leaves the heap and is remembered as closed: red rows are only added,
+    so it stays closed until suffixes are added, `red` or `comparator` is replaced, or
+    the row or the red row it matched is overwritten, and only then is it checked again.
+
+    Rows live in an `ObservationMatrix` of `dtype` (float64 by default, float32 halves
+    its size); `table[sequence]` is a numpy view of the row, and new suffix columns are
+    written with `extend_rows`. Sequences built by the table and its learner come from
+    `sequences`, a `SequenceStore`.
+    """
+
+    def __init__(self, alphabet: Alphabet, comparator: WFAComparator, dtype=np.float64):
         self.alphabet = alphabet
-        self.red = set()
+        self.__red = set()
         self.__blue = set()
-        self.__blue_queue = []
+        self.__blue_queue = IndexedHeap()
+        self.__closed_blue = {}
+        self.__closing_red = set()
         self.__suffixes = []
         self.__suffixes_set = set()
-        self.__observations = {}
+        self.__observations = ObservationMatrix(dtype)
         self.symbols = alphabet.symbols
-        self.comparator = comparator
+        self.sequences = SequenceStore()
+        self.__comparator = comparator
+        self.__red_index = row_matching_index_for(comparator)
+        self.__unindexed_red = {}
+        self.__red_index_stale = False
+
+    @property
+    def red(self) -> set[Sequence]:
+        return self.__red
+
+    @red.setter
+    def red(self, red: set[Sequence]):
+        self.__red = red
+        self.__invalidate()
+
+    @property
+    def comparator(self) -> WFAComparator:
+        return self.__comparator
+
+    @comparator.setter
+    def comparator(self, comparator: WFAComparator):
+        self.__comparator = comparator
+        self.__invalidate()
+
+    def __invalidate(self):
+        # Every red row is indexed and every blue row checked again
+        self.__red_index_stale = True
+        self.__reopen_closed_blue()
 
     def __getitem__(self, element):
         return self.__observations[element]
 
     def __setitem__(self, sequence: Sequence, observations_row):
         self.__observations[sequence] = observations_row
+        self.__row_changed(sequence)
+
+    def extend_rows(self, sequences: list[Sequence], values) -> None:
+        """Appends `values[i]`, one value per new suffix, to the row of `sequences[i]`."""
+        self.__observations.extend_rows(sequences, values)
+        for sequence in sequences:
+            self.__row_changed(sequence)
+
+    def __row_changed(self, sequence: Sequence):
+        if sequence in self.red:
+            self.__unindexed_red[sequence] = None
+        if sequence in self.__closing_red:
+            self.__reopen_closed_blue()
+        elif sequence in self.__closed_blue:
+            self.__blue_queue.push(sequence, self.__closed_blue.pop(sequence))
 
     def add_suffix(self, sequence: Sequence) -> bool:
         added = False
         if sequence not in self.__suffixes_set:
             self.__suffixes_set.add(sequence)
             self.__suffixes.append(sequence)
+            self.__invalidate()
             added = True
         return added
 
     def add_to_red(self, sequence: Sequence) -> None:
         self.red.add(sequence)
+        self.__unindexed_red[sequence] = None
 
     def add_to_blue(self, weighted_sequence: tuple[float, Sequence]) -> None:
-        heapq.heappush(self.__blue_queue, weighted_sequence)
+        self.__closed_blue.pop(weighted_sequence[1], None)
+        self.__blue_queue.push(weighted_sequence[1], weighted_sequence)
         self.__blue.add(weighted_sequence[1])
 
     def remove_from_blue(self, sequence: Sequence) -> None:
         self.__blue.remove(sequence)
-        self.__blue_queue = list(filter(lambda x: x[1] != sequence, self.__blue_queue))
-        heapq.heapify(self.__blue_queue)
+        self.__blue_queue.discard(sequence)
+        self.__closed_blue.pop(sequence, None)
 
     def contains_in_red(self, sequence: Sequence) -> bool:
         return sequence in self.red
@@ -67,33 +137,59 @@ class PDFAObservationTable:
     def get_observed_sequences(self) -> list[Sequence]:
         return list(self.__observations.keys())
 
+    def get_observation_matrix(self, sequences: list[Sequence]) -> np.ndarray:
+        """Copy of the rows of `sequences` as a 2-D array, in the given order."""
+        return self.__observations.rows(sequences)
+
     def get_violating_closedness_sequence(self) -> Union[Sequence, None]:
-        violating_sequence = None
-        non_violating_seqs = []
-        while len(self.__blue_queue) > 0 and violating_sequence is None:
-            value, blue_sequence = heapq.heappop(self.__blue_queue)
-            if not self.__same_observation_exists_in_red(blue_sequence):
+        # Closed blue rows still match a red row, so the first unchecked violating row is the first of all.
+        while len(self.__blue_queue) > 0:
+            blue_sequence, weighted_sequence = self.__blue_queue.pop_entry()
+            red_sequence = self.__equivalent_red_sequence(blue_sequence)
+            if red_sequence is None:
                 self.__blue.remove(blue_sequence)
-                violating_sequence = blue_sequence
-            else:
-                non_violating_seqs.append((value, blue_sequence))
-        for non_violating_seq in non_violating_seqs:
-            heapq.heappush(self.__blue_queue, non_violating_seq)
-        return violating_sequence
+                return blue_sequence
+            self.__closed_blue[blue_sequence] = weighted_sequence
+            self.__closing_red.add(red_sequence)
+        return None
 
-    def __same_observation_exists_in_red(self, blue_sequence):
-        return any(self.comparator.equivalent_output(observation1=self[blue_sequence], observation2=self[sequence])
-                   for sequence in self.red)
+    def __reopen_closed_blue(self):
+        for blue_sequence, weighted_sequence in self.__closed_blue.items():
+            self.__blue_queue.push(blue_sequence, weighted_sequence)
+        self.__closed_blue = {}
+        self.__closing_red = set()
+
+    def __equivalent_red_sequence(self, blue_sequence) -> Union[Sequence, None]:
+        return next((sequence for sequence in self.red_index.candidates(self[blue_sequence])
+                     if self.comparator.equivalent_output(observation1=self[blue_sequence],
+                                                          observation2=self[sequence])), None)
+
+    @property
+    def red_index(self) -> RowMatchingIndex:
+        if self.__red_index_stale:
+            if self.__red_index.comparator is not self.comparator:
+                self.__red_index = row_matching_index_for(self.comparator)
+            self.__red_index.rebuild(self.__observed_red_rows())
+            self.__unindexed_red = {sequence: None for sequence in self.red if sequence not in self.__observations}
+            self.__red_index_stale = False
+        for sequence in list(self.__unindexed_red):
+            if sequence in self.red and sequence in self.__observations:
+                self.__red_index.add(sequence, self.__observations[sequence])
+                del self.__unindexed_red[sequence]
+        return self.__red_index
 
     def find_inconsistency(self) -> Union[Inconsistency, None]:
+        # Pairs are visited in the same order as a scan of all sorted red pairs, so the same inconsistency is found.
+        red_index = self.red_index
         red_list = sorted(list(self.red))
-        red_list_length = len(red_list)
-        for i in range(red_list_length):
-            for j in range(i + 1, red_list_length):
-                red1 = red_list[i]
+        positions = {sequence: i for i, sequence in enumerate(red_list)}
+        for i, red1 in enumerate(red_list):
+            observations1 = self.__observations[red1]
+            later_candidates = sorted(positions[sequence] for sequence in red_index.candidates(observations1)
+                                      if positions.get(sequence, -1) > i)
+            for j in later_candidates:
                 red2 = red_list[j]
-                if red1 != red2 and \
-                        self.comparator.equivalent_output(self.__observations[red1], self.__observations[red2]):
+                if self.comparator.equivalent_output(observations1, self.__observations[red2]):
                     inconsistency = self.__inconsistency_between(red1, red2)
                     if inconsistency is not None:
                         return inconsistency
@@ -101,8 +197,8 @@ class PDFAObservationTable:
 
     def __inconsistency_between(self, sequence1: Sequence, sequence2: Sequence):
         for symbol in self.symbols:
-            suffixed_sequence1 = sequence1 + symbol
-            suffixed_sequence2 = sequence2 + symbol
+            suffixed_sequence1 = self.sequences.concatenation(sequence1, symbol)
+            suffixed_sequence2 = self.sequences.concatenation(sequence2, symbol)
             different_suffix = self.__max_difference(suffixed_sequence1, suffixed_sequence2)
             if different_suffix is not None:
                 return Inconsistency(sequence1, sequence2, symbol, different_suffix)
@@ -113,22 +209,21 @@ class PDFAObservationTable:
         observations2 = self.__observations[sequence2]
         assert len(observations1) == len(observations2), 'Observations should have the same length'
         if isinstance(self.comparator, WFAToleranceComparator):
-            maxim = self.comparator.tolerance
-            max_i = 0
-            for i in range(0, len(observations1)):
-                diff = abs(observations1[i] - observations2[i])
-                if diff > maxim:
-                    maxim = diff
-                    max_i = i
-            if maxim == self.comparator.tolerance:
+            if len(observations1) == 0:
                 return None
-            else:
+            differences = np.abs(observations1 - observations2)
+            max_i = int(np.argmax(differences))
+            if differences[max_i] > self.comparator.tolerance:
                 return self.__suffixes[max_i]
+            return None
         else:
             for i in range(0, len(observations1)):
                 if not self.comparator.equivalent_values(observations1[i], observations2[i]):
                     return self.__suffixes[i]
             return None
 
-    def get_red_observations(self) -> dict[Sequence, list[float]]:
+    def get_red_observations(self) -> dict[Sequence, np.ndarray]:
         return {key: self.__observations[key] for key in list(self.red)}
+
+    def __observed_red_rows(self) -> dict[Sequence, np.ndarray]:
+        return {key: self.__observations[key] for key in self.red if key in self.__observations}
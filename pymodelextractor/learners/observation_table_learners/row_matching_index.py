@@ -0,0 +1,132 @@
+from itertools import product
+from math import floor
+from typing import Iterable, Iterator
+
+import numpy as np
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.model_comparators.wfa_comparison_strategy import WFAComparator
+from pythautomata.model_comparators.wfa_quantization_comparison_strategy import WFAQuantizationComparator
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pythautomata.utilities import pdfa_utils
+
+
+class RowMatchingIndex:
+    """Rows of a PDFA observation table bucketed so that equivalent rows are found by lookup.
+
+    `candidates(row)` returns a superset of the indexed rows the comparator considers
+    equivalent to `row`, so callers still confirm each candidate with
+    `comparator.equivalent_output`. This base class buckets nothing and returns every
+    row; it is used for comparators without a known bucketing.
+    """
+
+    def __init__(self, comparator: WFAComparator):
+        self.comparator = comparator
+        self._keys = {}
+        self._buckets = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, sequence: Sequence) -> bool:
+        return sequence in self._keys
+
+    def add(self, sequence: Sequence, row: list[float]):
+        self.discard(sequence)
+        key = self._key_of(row)
+        self._keys[sequence] = key
+        self._buckets.setdefault(key, {})[sequence] = None
+
+    def discard(self, sequence: Sequence):
+        key = self._keys.pop(sequence, None)
+        if key is not None:
+            bucket = self._buckets[key]
+            del bucket[sequence]
+            if len(bucket) == 0:
+                del self._buckets[key]
+
+    def rebuild(self, rows: dict[Sequence, list[float]]):
+        self._keys = {}
+        self._buckets = {}
+        for sequence, row in rows.items():
+            self.add(sequence, row)
+
+    def candidates(self, row: list[float]) -> Iterator[Sequence]:
+        for key in self._keys_near(row):
+            yield from self._buckets.get(key, ())
+
+    def _key_of(self, row: list[float]):
+        return ()
+
+    def _keys_near(self, row: list[float]) -> Iterable:
+        return (self._key_of(row),)
+
+
+class ToleranceGridIndex(RowMatchingIndex):
+    """Buckets rows on a grid of tolerance-sized cells over a few of their coordinates.
+
+    Rows within tolerance differ by at most one cell on every coordinate, so only the
+    3^k cells around a row's cell have to be looked up. The k coordinates are those
+    with the largest spread among the rows the index was last rebuilt with, which keeps
+    the buckets small. With a tolerance of 0 rows are bucketed by all their values.
+    """
+
+    def __init__(self, comparator: WFAToleranceComparator, dimensions: int = 3):
+        super().__init__(comparator)
+        # Cells slightly wider than the tolerance keep rounding from splitting matching rows two cells apart.
+        self._cell_width = comparator.tolerance * (1 + 1e-9)
+        self._max_dimensions = dimensions
+        self._dimensions = None
+
+    def rebuild(self, rows: dict[Sequence, list[float]]):
+        self._dimensions = None
+        if self._cell_width > 0 and len({len(row) for row in rows.values()}) == 1:
+            values = np.array(list(rows.values()), dtype=float)
+            if values.shape[1] > 0:
+                spread = values.max(axis=0) - values.min(axis=0)
+                self._dimensions = tuple(int(i) for i in np.argsort(-spread, kind='stable')[:self._max_dimensions])
+        super().rebuild(rows)
+
+    def _dimensions_for(self, row: list[float]) -> tuple[int, ...]:
+        if self._dimensions is None:
+            self._dimensions = tuple(range(min(len(row), self._max_dimensions)))
+        return self._dimensions
+
+    def _key_of(self, row: list[float]):
+        if self._cell_width == 0:
+            return tuple(row)
+        return tuple(floor(row[i] / self._cell_width) for i in self._dimensions_for(row))
+
+    def _keys_near(self, row: list[float]) -> Iterable:
+        if self._cell_width == 0:
+            return (tuple(row),)
+        return product(*((cell - 1, cell, cell + 1) for cell in self._key_of(row)))
+
+
+class PartitionKeyIndex(RowMatchingIndex):
+    """Buckets rows by the quantization partition of each of their values.
+
+    Two rows are equivalent under quantization exactly when all their partitions match,
+    so a row's only candidates are the rows in its own bucket.
+    """
+
+    def __init__(self, comparator: WFAQuantizationComparator):
+        super().__init__(comparator)
+        self._partitions = {}
+
+    def _partition_of(self, value: float) -> int:
+        partition = self._partitions.get(value)
+        if partition is None:
+            partition = pdfa_utils.get_quantized_interval_partition(value, self.comparator.partitions)
+            self._partitions[value] = partition
+        return partition
+
+    def _key_of(self, row: list[float]):
+        return tuple(self._partition_of(value) for value in row)
+
+
+def row_matching_index_for(comparator: WFAComparator) -> RowMatchingIndex:
+    if isinstance(comparator, WFAToleranceComparator):
+        return ToleranceGridIndex(comparator)
+    if isinstance(comparator, WFAQuantizationComparator):
+        return PartitionKeyIndex(comparator)
+    return RowMatchingIndex(comparator)
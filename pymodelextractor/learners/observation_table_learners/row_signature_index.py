@@ -0,0 +1,104 @@
+from typing import Iterable, Iterator
+
+from pythautomata.base_types.sequence import Sequence
+from pymodelextractor.learners.observation_table_learners.columnar_observations import row_signature
+
+
+class RowSignatureIndex:
+    """Red rows of an observation table grouped by their observations.
+
+    Lets a table answer "is there a red row equal to this one" with a single lookup and
+    look for inconsistencies only among red rows that share their observations, instead
+    of scanning every red row or every pair of them.
+
+    Rows held in a `ColumnarObservations` are keyed by a `RowKey`, hashed by their digest,
+    other rows by the tuple of their values. Rows are added as they become red. Appending a column
+    changes every signature, so the index records the width and the number of rows it was
+    built with and `sync` rebuilds it when either no longer matches the table.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._signatures = {}
+        self._shared = {}
+        self._width = None
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, row: Iterable) -> bool:
+        return row_signature(row) in self._rows
+
+    @property
+    def signatures(self):
+        return self._rows.keys()
+
+    def add(self, sequence: Sequence, row: Iterable):
+        signature = row_signature(row)
+        width = len(row)
+        if self._width is None:
+            self._width = width
+        elif width != self._width:
+            self._width = -1
+        self.add_signature(sequence, signature)
+
+    def add_signature(self, sequence: Sequence, signature):
+        """Indexes `sequence` under a precomputed signature, any hashable that is equal exactly for equal rows."""
+        previous = self._signatures.get(sequence)
+        if previous == signature:
+            return
+        if previous is not None:
+            self._discard(sequence, previous)
+        self._signatures[sequence] = signature
+        rows = self._rows.setdefault(signature, {})
+        rows[sequence] = None
+        if len(rows) == 2:
+            self._shared[signature] = None
+
+    def has_signature(self, signature) -> bool:
+        return signature in self._rows
+
+    def signature_of(self, sequence: Sequence):
+        return self._signatures.get(sequence)
+
+    def rows_with_signature(self, signature) -> list[Sequence]:
+        return list(self._rows.get(signature, ()))
+
+    def count(self, signature) -> int:
+        return len(self._rows.get(signature, ()))
+
+    @property
+    def shared_signatures(self):
+        return self._shared.keys()
+
+    def _discard(self, sequence: Sequence, signature: tuple):
+        rows = self._rows[signature]
+        del rows[sequence]
+        if len(rows) < 2:
+            self._shared.pop(signature, None)
+        if len(rows) == 0:
+            del self._rows[signature]
+
+    def rows_sharing_signature(self) -> Iterator[list[Sequence]]:
+        """Yields, for every signature with more than one red row, the rows that have it."""
+        for signature in list(self._shared):
+            yield list(self._rows[signature])
+
+    def clear(self):
+        self._rows = {}
+        self._signatures = {}
+        self._shared = {}
+        self._width = None
+
+    def rebuild(self, red: Iterable[Sequence], observations: dict, width: int):
+        self.clear()
+        for sequence in red:
+            if sequence in observations:
+                self.add(sequence, observations[sequence])
+        self._width = width
+
+    def sync(self, red: set[Sequence], observations: dict, width: int) -> 'RowSignatureIndex':
+        """Rebuilds the index if columns were appended or rows made red behind its back."""
+        if self._width != width or len(self._signatures) != len(red):
+            self.rebuild(red, observations, width)
+        return self
@@ -0,0 +1,84 @@
+"""Matrix forms of the comparisons the PDFA observation table translators make row by row.
+
+Each function gives, for one observation against every row of a matrix, exactly the answer
+the scalar code gives for each pair, so translations built on them are unchanged.
+"""
+from typing import Union
+
+import numpy as np
+from pythautomata.model_comparators.wfa_comparison_strategy import WFAComparator
+from pythautomata.model_comparators.wfa_quantization_comparison_strategy import WFAQuantizationComparator
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+
+
+def equivalence_mask(comparator: WFAComparator, value, observations: np.ndarray) -> np.ndarray:
+    """`comparator.equivalent_output(value, row)` for every row of `observations`."""
+    if len(observations) == 0:
+        return np.zeros(0, dtype=bool)
+    value = np.asarray(value)
+    if isinstance(comparator, WFAToleranceComparator):
+        return np.all(np.abs(observations - value) <= comparator.tolerance, axis=1)
+    if isinstance(comparator, WFAQuantizationComparator):
+        return np.all(quantized_partitions(observations, comparator.partitions) ==
+                      quantized_partitions(value, comparator.partitions), axis=-1)
+    return np.fromiter((comparator.equivalent_output(value, row) for row in observations), dtype=bool,
+                       count=len(observations))
+
+
+def quantized_partitions(values, partitions: int) -> np.ndarray:
+    """`pdfa_utils.get_quantized_interval_partition` of every value.
+
+    The scalar version bisects the positions `range(partitions)` against the limits
+    `linspace(0, 1, partitions + 1)`, and its halves are uneven whenever a range has odd
+    length, so the same bisection is replayed here on arrays instead of using `searchsorted`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    limits = np.linspace(0, 1, partitions + 1)
+    low = np.zeros(values.shape, dtype=np.int64)
+    length = np.full(values.shape, partitions, dtype=np.int64)
+    middle = np.full(values.shape, len(limits) // 2, dtype=np.int64)
+    while np.any(length > 1):
+        searching = length > 1
+        upper = searching & (values >= limits[middle])
+        low = np.where(upper, low + length // 2, low)
+        length = np.where(searching, np.where(upper, length - length // 2, length // 2), length)
+        middle = low + length // 2
+    return np.where(values == 1, partitions - 1, low)
+
+
+def squared_distance_sums(value, rows: np.ndarray) -> np.ndarray:
+    """Sum of squared differences between `value` and every row, added left to right like `sum`."""
+    differences = (np.asarray(value) - rows) ** 2
+    totals = np.zeros(len(rows), dtype=differences.dtype)
+    for column in range(differences.shape[1] if differences.ndim == 2 else 0):
+        totals = totals + differences[:, column]
+    return totals
+
+
+def distances(value, rows: np.ndarray) -> np.ndarray:
+    return np.sqrt(squared_distance_sums(value, rows))
+
+
+def states_where(mask: np.ndarray, labels: np.ndarray, state_count: int, criterion=all) -> np.ndarray:
+    """For every state, `criterion` (`all` or `any`) of `mask` over the rows labelled with it."""
+    hits = np.bincount(labels, weights=mask, minlength=state_count)
+    if criterion is any:
+        return hits > 0
+    return hits == np.bincount(labels, minlength=state_count)
+
+
+def first_state_for(sequence, owners: dict, representatives: np.ndarray, observation_table,
+                    comparator: WFAComparator) -> Union[int, None]:
+    """Position of the first state that either holds `sequence`, as told by `owners`, or has its
+    representative row equivalent to the row of `sequence`; rows are only read when needed."""
+    owner = owners.get(sequence)
+    if owner == 0:
+        return 0
+    candidate = first_true(equivalence_mask(comparator, observation_table[sequence], representatives[:owner]))
+    return owner if candidate is None else candidate
+
+
+def first_true(mask: np.ndarray) -> Union[int, None]:
+    if len(mask) == 0 or not mask.any():
+        return None
+    return int(np.argmax(mask))
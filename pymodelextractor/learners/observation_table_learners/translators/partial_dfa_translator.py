@@ -5,6 +5,7 @@ from pymodelextractor.learners.observation_table_learners.observation_table \
     import ObservationTable
 from pymodelextractor.learners.observation_table_learners.general_observation_table \
     import GeneralObservationTable
+from pymodelextractor.learners.observation_table_learners.translators.row_state_index import RowStateIndex
 from pythautomata.base_types.alphabet import Alphabet
 from pythautomata.abstract.boolean_model import BooleanModel
 from pythautomata.abstract.model import Model
@@ -14,7 +15,6 @@ from pythautomata.automata.deterministic_finite_automaton import \
     DeterministicFiniteAutomaton as DFA
 from pythautomata.model_comparators.dfa_comparison_strategy import DFAComparisonStrategy \
     as DFAComparator
-from pythautomata.base_types.symbol import Symbol
 
 class PartialDFATranslator(ObservationTableTranslator):
     # This partial observation table translator is non deterministic due to red being an 
@@ -25,6 +25,8 @@ class PartialDFATranslator(ObservationTableTranslator):
     hole_state = State("Hole", False)
     epsilon = Sequence([])
 
+    _state_index: Union[RowStateIndex, None] = None
+
     def translate(self, observation_table: Union[ObservationTable, GeneralObservationTable],
                   alphabet: Alphabet, output_alphabet: Alphabet = None) \
                     -> Union[BooleanModel, Model]:
@@ -34,8 +36,7 @@ class PartialDFATranslator(ObservationTableTranslator):
         for seq, state in states:
             for suffix in alphabet.symbols:
                 if (seq+suffix) in (observation_table.observations):
-                    next_state_value = observation_table[seq + suffix]
-                    next_state = self.find_state(states, observation_table, next_state_value)
+                    next_state = self.find_state(states, observation_table, seq + suffix)
 
                     if next_state is None:
                         state.add_hole_transition(self.hole_state)
@@ -48,26 +49,24 @@ class PartialDFATranslator(ObservationTableTranslator):
                    DFAComparator, hole=self.hole_state)
 
     def create_states(self, observation_table) -> list[tuple[Sequence, State]]:
-        red_values = set()
-        states = []
-        if self.epsilon in observation_table.observations:
-            states.append((self.epsilon, State(str(self.epsilon), observation_table[self.epsilon][0], access_string=self.epsilon)))
-        for red_seq in observation_table.red:
-            if red_seq in observation_table.observations:
-                red_value = tuple(observation_table[red_seq])
-                if red_value not in red_values:
-                    state = State(str(red_seq), red_value[0], access_string=red_seq)
-                    states.append((red_seq, state))
-                    red_values.add(red_value)
-        
-        return states
+        # States from an earlier translation of the same table are kept while their rows are, so
+        # only red rows observed since then are read.
+        index = self._state_index = RowStateIndex.for_table(self._state_index, observation_table)
+        if self.epsilon in observation_table.observations and index.states[:1] != [self.epsilon]:
+            if index.states:
+                index = self._state_index = RowStateIndex(observation_table)
+            index.add_state(self.epsilon)
+        observed_red = [red_seq for red_seq in observation_table.red if red_seq in observation_table.observations]
+        for red_seq in index.unindexed_red(observed_red):
+            red_value = index.signature_of(red_seq)
+            if red_value not in index.red_signatures:
+                index.add_state(red_seq)
+                index.red_signatures.add(red_value)
+
+        return [(seq, State(str(seq), observation_table[seq][0], access_string=seq)) for seq in index.states]
     
     def find_state(self, states: list[tuple[Sequence, State]], 
                    observation_table: Union[ObservationTable, GeneralObservationTable],
-                   value: Union[list[bool], list[Symbol]]) -> Union[State, None]:
-        
-        for sequence, state in states:
-            if value == observation_table[sequence]:
-                return state
-        
-        return None
+                   sequence: Sequence) -> Union[State, None]:
+        position = self._state_index.state_for(sequence)
+        return None if position is None else states[position][1]
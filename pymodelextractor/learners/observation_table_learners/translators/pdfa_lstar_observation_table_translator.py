@@ -6,6 +6,8 @@ from pythautomata.model_comparators.wfa_comparison_strategy import WFAComparator
 from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator as PDFAComparator
 from pymodelextractor.learners.observation_table_learners.pdfa_observation_table import PDFAObservationTable, \
      epsilon
+from pymodelextractor.learners.observation_table_learners.translators.observation_clustering import distances, \
+     equivalence_mask, states_where
 from pymodelextractor.learners.observation_table_learners.translators.pdfa_observation_table_translator import \
      PDFAObservationTableTranslator
 
@@ -34,7 +36,7 @@ class PDFALStarObservationTableTranslation(PDFAObservationTableTranslator):
             self.centroid = sum(self.observations.values()) / len(self.observations)
 
         def add_observation(self, key, value):
-            arr_value = np.array(value)
+            arr_value = np.asarray(value)
             self.observations[key] = arr_value
             if self.centroid is None:
                 self.centroid = arr_value
@@ -42,20 +44,6 @@ class PDFALStarObservationTableTranslation(PDFAObservationTableTranslator):
                 self.centroid = self.__new_centroid(arr_value)
             self.obs_count += 1
 
-        def belongs_to_state(self, value, criterion):
-            return criterion(self.comparator.equivalent_output(value, obs)
-                             for obs in self.observations.values())
-
-        def distance_to_centroid(self, value):
-            np_value = np.array(value)
-            return np.ma.sqrt(sum((np_value - self.centroid) ** 2))
-
-        def membership_value(self, value, criterion=all):
-            if self.belongs_to_state(value, criterion):
-                return True, self.distance_to_centroid(value)
-            else:
-                return False, float('Inf')
-
         def has_sequence(self, sequence):
             return sequence in self.observations.keys()
 
@@ -72,11 +60,11 @@ class PDFALStarObservationTableTranslation(PDFAObservationTableTranslator):
     def translate(self, observation_table: PDFAObservationTable, terminal_symbol: Symbol, comparator) \
             -> PDFA:
         states = self.__make_states(observation_table.get_red_observations(), comparator)
-        self.__add_transitions(observation_table, states)
+        self.__add_transitions(observation_table, states, comparator)
         was_deterministic = self.__make_deterministic(states, comparator)
         while not was_deterministic:
             self.__reset_states(states)
-            self.__add_transitions(observation_table, states)
+            self.__add_transitions(observation_table, states, comparator)
             was_deterministic = self.__make_deterministic(states, comparator)
         wfa_states = self.__make_wfa_states(states, terminal_symbol)
         self.__add_wfa_transitions(states, wfa_states)
@@ -84,58 +72,52 @@ class PDFALStarObservationTableTranslation(PDFAObservationTableTranslator):
         return PDFA(observation_table.alphabet, wfa_states, terminal_symbol, PDFAComparator())
 
     def __make_states(self, red, comparator):
+        # Every red row is compared against all rows placed before it at once; a row joins the state
+        # with the nearest centroid among those it is equivalent to every observation of.
         intermediate_states = list()
         red_prefixes = list(sorted(red.keys()))
-        for key in red_prefixes:
-            self.__add_to_state(intermediate_states, (key, red[key]), comparator)
+        rows = np.array([red[key] for key in red_prefixes])
+        labels = np.zeros(len(red_prefixes), dtype=np.int64)
+        centroids = np.zeros_like(rows)
+        for i, key in enumerate(red_prefixes):
+            belongs = states_where(equivalence_mask(comparator, rows[i], rows[:i]), labels[:i],
+                                   len(intermediate_states))
+            if belongs.any():
+                membership_values = np.where(belongs, distances(rows[i], centroids[:len(intermediate_states)]),
+                                             np.inf)
+                state_pos = int(np.argmin(membership_values))
+            else:
+                state_pos = len(intermediate_states)
+                intermediate_states.append(self.IntermediateState(comparator))
+            intermediate_states[state_pos].add_observation(key, rows[i])
+            labels[i] = state_pos
+            centroids[state_pos] = intermediate_states[state_pos].centroid
         return intermediate_states
 
-    def __add_to_state(self, intermediate_states, red_obs, comparator):
-        i = 0
-        membership_values = np.array([])
-        belongs = np.array([])
-        while i < len(intermediate_states):
-            intermediate_state = intermediate_states[i]
-            belong, membership_value = intermediate_state.membership_value(red_obs[1])
-            belongs = np.append(belongs, belong)
-            membership_values = np.append(membership_values, membership_value)
-            i += 1
-        if np.sum(belongs) == 0:
-            new_intermediate_state = self.IntermediateState(comparator)
-            new_intermediate_state.add_observation(red_obs[0], red_obs[1])
-            intermediate_states.append(new_intermediate_state)
-        else:
-            min_dist_arg = np.argmin(membership_values)
-            intermediate_states[min_dist_arg].add_observation(red_obs[0], red_obs[1])
-
-    def __add_transitions(self, observation_table, intermediate_states):
+    def __add_transitions(self, observation_table, intermediate_states, comparator):
+        owners = dict()
+        for state_pos, state in enumerate(intermediate_states):
+            for prefix in state.observations:
+                owners.setdefault(prefix, state_pos)
+        observations = np.array([obs for state in intermediate_states for obs in state.observations.values()])
+        labels = np.array([state_pos for state_pos, state in enumerate(intermediate_states)
+                           for _ in state.observations], dtype=np.int64)
+        centroids = np.array([state.centroid for state in intermediate_states])
         for state in intermediate_states:
             for prefix, obs in state.observations.items():
                 for symbol_pos in range(1, len(observation_table.symbols) + 1):
                     symbol = observation_table.get_suffixes()[symbol_pos]
                     new_sequence = prefix + symbol
-                    next_state_pos = 0
-                    added = False
-                    while next_state_pos < len(intermediate_states) and not added:
-                        next_state = intermediate_states[next_state_pos]
-                        if next_state.has_sequence(new_sequence):
-                            state.add_transition(prefix, symbol.value[0], next_state_pos, obs[symbol_pos])
-                            added = True
-                        next_state_pos += 1
-                    if not added:
-                        next_state_pos = 0
-                        belongs = np.array([])
-                        membership_values = np.array([])
-                        while next_state_pos < len(intermediate_states):
-                            next_state = intermediate_states[next_state_pos]
-                            belong, membership_value = \
-                                next_state.membership_value(observation_table[new_sequence], criterion=any)
-                            belongs = np.append(belongs, belong)
-                            membership_values = np.append(membership_values, membership_value)
-                            next_state_pos += 1
-                        if np.sum(belongs) > 0:
-                            min_dist_arg = np.argmin(membership_values)
-                            state.add_transition(prefix, symbol.value[0], min_dist_arg, obs[symbol_pos])
+                    next_state_pos = owners.get(new_sequence)
+                    if next_state_pos is None:
+                        value = observation_table[new_sequence]
+                        belongs = states_where(equivalence_mask(comparator, value, observations), labels,
+                                               len(intermediate_states), criterion=any)
+                        if belongs.any():
+                            membership_values = np.where(belongs, distances(value, centroids), np.inf)
+                            next_state_pos = int(np.argmin(membership_values))
+                    if next_state_pos is not None:
+                        state.add_transition(prefix, symbol.value[0], next_state_pos, obs[symbol_pos])
 
     def __make_wfa_states(self, intermediate_states, terminal_symbol):
         wfa_states = list()
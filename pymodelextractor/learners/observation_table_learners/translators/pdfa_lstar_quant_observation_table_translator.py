@@ -6,6 +6,8 @@ from pythautomata.model_comparators.wfa_comparison_strategy import WFAComparator
 from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator as PDFAComparator
 from pymodelextractor.learners.observation_table_learners.pdfa_observation_table import PDFAObservationTable, \
      epsilon
+from pymodelextractor.learners.observation_table_learners.translators.observation_clustering import \
+     equivalence_mask, first_state_for, first_true
 from pymodelextractor.learners.observation_table_learners.translators.pdfa_observation_table_translator import \
      PDFAObservationTableTranslator
 
@@ -30,12 +32,9 @@ class PDFALStarQuantObservationTableTranslation(PDFAObservationTableTranslator):
             self.transitions = dict()
 
         def add_observation(self, key, value):
-            arr_value = np.array(value)
+            arr_value = np.asarray(value)
             self.observations[key] = arr_value
 
-        def belongs_to_state(self, value):
-            return self.comparator.equivalent_output(value,  list(self.observations.values())[0])
-
         def has_sequence(self, sequence):
             return sequence in self.observations.keys()
 
@@ -49,11 +48,11 @@ class PDFALStarQuantObservationTableTranslation(PDFAObservationTableTranslator):
     def translate(self, observation_table: PDFAObservationTable, terminal_symbol: Symbol, comparator) \
             -> PDFA:
         states = self.__make_states(observation_table.get_red_observations(), comparator)
-        self.__add_transitions(observation_table, states)
+        self.__add_transitions(observation_table, states, comparator)
         # was_deterministic = self.__make_deterministic(states, comparator)
         # while not was_deterministic:
         #     self.__reset_states(states)
-        #     self.__add_transitions(observation_table, states)
+        #     self.__add_transitions(observation_table, states, comparator)
         #     was_deterministic = self.__make_deterministic(states, comparator)
         wfa_states = self.__make_wfa_states(states)
         self.__add_wfa_transitions(states, wfa_states)
@@ -61,41 +60,36 @@ class PDFALStarQuantObservationTableTranslation(PDFAObservationTableTranslator):
         return PDFA(observation_table.alphabet, wfa_states, terminal_symbol, PDFAComparator())
 
     def __make_states(self, red, comparator):
+        # Every red row joins the first state whose first observation it is equivalent to.
         intermediate_states = list()
         red_prefixes = list(sorted(red.keys()))
-        for key in red_prefixes:
-            self.__add_to_state(intermediate_states, (key, red[key]), comparator)
+        rows = np.array([red[key] for key in red_prefixes])
+        representatives = np.zeros_like(rows)
+        for i, key in enumerate(red_prefixes):
+            state_pos = first_true(equivalence_mask(comparator, rows[i], representatives[:len(intermediate_states)]))
+            if state_pos is None:
+                state_pos = len(intermediate_states)
+                intermediate_states.append(self.IntermediateState(comparator))
+                representatives[state_pos] = rows[i]
+            intermediate_states[state_pos].add_observation(key, rows[i])
         return intermediate_states
 
-    def __add_to_state(self, intermediate_states, red_obs, comparator):
-        i = 0
-        added = False
-        while i < len(intermediate_states) and not added:
-            intermediate_state = intermediate_states[i]
-            if intermediate_state.belongs_to_state(red_obs[1]):
-                intermediate_state.add_observation(red_obs[0], red_obs[1])
-                added = True
-            i += 1
-        if not added:
-            new_intermediate_state = self.IntermediateState(comparator)
-            new_intermediate_state.add_observation(red_obs[0], red_obs[1])
-            intermediate_states.append(new_intermediate_state)
-
-    def __add_transitions(self, observation_table, intermediate_states):
+    def __add_transitions(self, observation_table, intermediate_states, comparator):
+        # The first state either holding the sequence or equivalent to its row takes the transition.
+        owners = dict()
+        for state_pos, state in enumerate(intermediate_states):
+            for prefix in state.observations:
+                owners.setdefault(prefix, state_pos)
+        representatives = np.array([next(iter(state.observations.values())) for state in intermediate_states])
         for state in intermediate_states:
             for prefix, obs in state.observations.items():
                 for symbol_pos in range(1, len(observation_table.symbols) + 1):
                     symbol = observation_table.get_suffixes()[symbol_pos]
                     new_sequence = prefix + symbol
-                    next_state_pos = 0
-                    added = False
-                    while next_state_pos < len(intermediate_states) and not added:
-                        next_state = intermediate_states[next_state_pos]
-                        if next_state.has_sequence(new_sequence) or \
-                                next_state.belongs_to_state(observation_table[new_sequence]):
-                            state.add_transition(prefix, symbol.value[0], next_state_pos, obs[symbol_pos])
-                            added = True
-                        next_state_pos += 1
+                    next_state_pos = first_state_for(new_sequence, owners, representatives, observation_table,
+                                                     comparator)
+                    if next_state_pos is not None:
+                        state.add_transition(prefix, symbol.value[0], next_state_pos, obs[symbol_pos])
 
     def __make_wfa_states(self, intermediate_states):
         wfa_states = list()
@@ -6,6 +6,8 @@ from pythautomata.base_types.symbol import Symbol
 
 from pymodelextractor.learners.observation_table_learners.pdfa_observation_table import PDFAObservationTable, \
      epsilon
+from pymodelextractor.learners.observation_table_learners.translators.observation_clustering import distances, \
+     equivalence_mask
 from pymodelextractor.learners.observation_table_learners.translators.pdfa_observation_table_translator import \
      PDFAObservationTableTranslator
 
@@ -23,19 +25,6 @@ class PDFALStarColObservationTableTranslator(PDFAObservationTableTranslator):
             self.transitions = dict()
             self.comparator = comparator
 
-        def belongs_to_state(self, value):
-            return self.comparator.equivalent_output(value, self.observation[1])
-
-        def distance_to_value(self, value):
-            np_value = np.array(value)
-            return np.ma.sqrt(sum((np_value - self.observation[1]) ** 2))
-
-        def membership_value(self, value):
-            if self.belongs_to_state(value):
-                return True, self.distance_to_value(value)
-            else:
-                return False, float('Inf')
-
         def has_sequence(self, sequence):
             return sequence == self.observation[0]
 
@@ -49,7 +38,7 @@ class PDFALStarColObservationTableTranslator(PDFAObservationTableTranslator):
     def translate(self, observation_table: PDFAObservationTable, terminal_symbol: Symbol, comparator) \
             -> PDFA:
         states = self.__make_states(observation_table.get_red_observations(), comparator)
-        self.__add_transitions(observation_table, states)
+        self.__add_transitions(observation_table, states, comparator)
         wfa_states = self.__make_wfa_states(states)
         self.__add_wfa_transitions(states, wfa_states)
         wfa_states = set(wfa_states)
@@ -63,34 +52,23 @@ class PDFALStarColObservationTableTranslator(PDFAObservationTableTranslator):
             intermediate_states.append(new_intermediate_state)
         return intermediate_states
 
-    def __add_transitions(self, observation_table, intermediate_states):
+    def __add_transitions(self, observation_table, intermediate_states, comparator):
+        owners = {state.observation[0]: state_pos for state_pos, state in enumerate(intermediate_states)}
+        rows = np.array([state.observation[1] for state in intermediate_states])
         for state in intermediate_states:
             prefix, obs = state.observation
             for symbol_pos in range(1, len(observation_table.symbols) + 1):
                 symbol = observation_table.get_suffixes()[symbol_pos]
                 new_sequence = prefix + symbol
-                next_state_pos = 0
-                added = False
-                while next_state_pos < len(intermediate_states) and not added:
-                    next_state = intermediate_states[next_state_pos]
-                    if next_state.has_sequence(new_sequence):
-                        state.add_transition(prefix, symbol.value[0], next_state_pos, obs[symbol_pos])
-                        added = True
-                    next_state_pos += 1
-                if not added:
-                    next_state_pos = 0
-                    belongs = np.array([])
-                    membership_values = np.array([])
-                    while next_state_pos < len(intermediate_states):
-                        next_state = intermediate_states[next_state_pos]
-                        belong, membership_value = \
-                            next_state.membership_value(observation_table[new_sequence])
-                        belongs = np.append(belongs, belong)
-                        membership_values = np.append(membership_values, membership_value)
-                        next_state_pos += 1
-                    if np.sum(belongs) > 0:
-                        min_dist_arg = np.argmin(membership_values)
-                        state.add_transition(prefix, symbol.value[0], min_dist_arg, obs[symbol_pos])
+                next_state_pos = owners.get(new_sequence)
+                if next_state_pos is None:
+                    value = observation_table[new_sequence]
+                    belongs = equivalence_mask(comparator, value, rows)
+                    if belongs.any():
+                        membership_values = np.where(belongs, distances(value, rows), np.inf)
+                        next_state_pos = int(np.argmin(membership_values))
+                if next_state_pos is not None:
+                    state.add_transition(prefix, symbol.value[0], next_state_pos, obs[symbol_pos])
 
     def __make_wfa_states(self, intermediate_states):
         wfa_states = list()
@@ -6,10 +6,13 @@ from pythautomata.base_types.symbol import Symbol
 
 from pymodelextractor.learners.observation_table_learners.pdfa_observation_table import PDFAObservationTable, \
      epsilon
+from pymodelextractor.learners.observation_table_learners.translators.observation_clustering import \
+     first_state_for
 from pymodelextractor.learners.observation_table_learners.translators.pdfa_observation_table_translator import \
      PDFAObservationTableTranslator
 
 from collections import namedtuple
+import numpy as np
 
 
 class PDFALStarColQuantObservationTableTranslator(PDFAObservationTableTranslator):
@@ -22,9 +25,6 @@ class PDFALStarColQuantObservationTableTranslator(PDFAObservationTableTranslator
             self.transitions = dict()
             self.comparator = comparator
 
-        def belongs_to_state(self, value):
-            return self.comparator.equivalent_output(value, self.observation[1])
-
         def has_sequence(self, sequence):
             return sequence == self.observation[0]
 
@@ -38,7 +38,7 @@ class PDFALStarColQuantObservationTableTranslator(PDFAObservationTableTranslator
     def translate(self, observation_table: PDFAObservationTable, terminal_symbol: Symbol, comparator) \
             -> PDFA:
         states = self.__make_states(observation_table.get_red_observations(), comparator)
-        self.__add_transitions(observation_table, states)
+        self.__add_transitions(observation_table, states, comparator)
         wfa_states = self.__make_wfa_states(states)
         self.__add_wfa_transitions(states, wfa_states)
         wfa_states = set(wfa_states)
@@ -52,21 +52,18 @@ class PDFALStarColQuantObservationTableTranslator(PDFAObservationTableTranslator
             intermediate_states.append(new_intermediate_state)
         return intermediate_states
 
-    def __add_transitions(self, observation_table, intermediate_states):
+    def __add_transitions(self, observation_table, intermediate_states, comparator):
+        # The first state either holding the sequence or equivalent to its row takes the transition.
+        owners = {state.observation[0]: state_pos for state_pos, state in enumerate(intermediate_states)}
+        rows = np.array([state.observation[1] for state in intermediate_states])
         for state in intermediate_states:
             prefix, obs = state.observation
             for symbol_pos in range(1, len(observation_table.symbols) + 1):
                 symbol = observation_table.get_suffixes()[symbol_pos]
                 new_sequence = prefix + symbol
-                next_state_pos = 0
-                added = False
-                while next_state_pos < len(intermediate_states) and not added:
-                    next_state = intermediate_states[next_state_pos]
-                    if next_state.has_sequence(new_sequence) or \
-                            next_state.belongs_to_state(observation_table[new_sequence]):
-                        state.add_transition(prefix, symbol.value[0], next_state_pos, obs[symbol_pos])
-                        added = True
-                    next_state_pos += 1
+                next_state_pos = first_state_for(new_sequence, owners, rows, observation_table, comparator)
+                if next_state_pos is not None:
+                    state.add_transition(prefix, symbol.value[0], next_state_pos, obs[symbol_pos])
 
     def __make_wfa_states(self, intermediate_states):
         wfa_states = list()
@@ -0,0 +1,85 @@
+import weakref
+from typing import Hashable, Iterable, Union
+
+from pythautomata.base_types.sequence import Sequence
+
+from pymodelextractor.learners.observation_table_learners.columnar_observations import ObservationRow, \
+    row_signature
+
+
+class RowStateIndex:
+    """States of a hypothesis keyed by the signature of the row each one stands for.
+
+    Translators resolve the target of every transition with one dictionary lookup here
+    instead of comparing its row with the row of every state. The index keeps the
+    signature of each row it read, together with a cheap token of it: the digest of stored
+    rows, or the identity and length of plain rows, as learners only ever replace rows or
+    append to them. While every token still matches and the table only gained red rows,
+    `for_table` hands the same index back so the translator adds the new red rows as
+    states and rewires transitions from cached signatures, reading only unseen rows.
+    """
+
+    def __init__(self, observation_table):
+        self._table = weakref.ref(observation_table)
+        self._width = len(observation_table.exp)
+        self.states: list[Sequence] = []
+        # Signatures of the red rows given a state, for translators that add other states too.
+        self.red_signatures: set[Hashable] = set()
+        self._positions: dict[Hashable, int] = {}
+        self._indexed_red: set[Sequence] = set()
+        self._signatures: dict[Sequence, Hashable] = {}
+        self._tokens: dict[Sequence, tuple] = {}
+
+    @classmethod
+    def for_table(cls, previous: Union['RowStateIndex', None], observation_table) -> 'RowStateIndex':
+        """`previous` if it still describes `observation_table`, a new empty index otherwise."""
+        if previous is not None and previous._describes(observation_table):
+            return previous
+        return cls(observation_table)
+
+    def signature_of(self, sequence: Sequence) -> Hashable:
+        signature = self._signatures.get(sequence)
+        if signature is None:
+            row = self._table()[sequence]
+            signature = row_signature(row)
+            self._signatures[sequence] = signature
+            self._tokens[sequence] = _token_of(row)
+        return signature
+
+    def add_state(self, sequence: Sequence) -> int:
+        position = len(self.states)
+        self.states.append(sequence)
+        self._positions.setdefault(self.signature_of(sequence), position)
+        return position
+
+    def state_for(self, sequence: Sequence) -> Union[int, None]:
+        """Position of the first state whose row equals the row of `sequence`."""
+        return self._positions.get(self.signature_of(sequence))
+
+    def unindexed_red(self, red: Iterable[Sequence]) -> list[Sequence]:
+        """The sequences of `red` not seen by earlier calls, in iteration order; they are seen from now on."""
+        sequences = [sequence for sequence in red if sequence not in self._indexed_red]
+        self._indexed_red.update(sequences)
+        return sequences
+
+    def _describes(self, observation_table) -> bool:
+        if self._table() is not observation_table or len(observation_table.exp) != self._width or \
+                not self._indexed_red <= observation_table.red:
+            return False
+        observations = observation_table.observations
+        for sequence, token in self._tokens.items():
+            if sequence not in observations or not _token_matches(token, observations[sequence]):
+                return False
+        return True
+
+
+def _token_of(row) -> tuple:
+    if isinstance(row, ObservationRow):
+        return row.digest, None
+    return row, len(row)
+
+
+def _token_matches(token: tuple, row) -> bool:
+    if isinstance(row, ObservationRow):
+        return token[1] is None and token[0] == row.digest
+    return token[0] is row and token[1] == len(row)
@@ -0,0 +1,36 @@
+from typing import Any, Callable, Iterable, Optional
+
+from pythautomata.base_types.sequence import Sequence
+
+
+def sift_level_by_level(sequences: Iterable[Sequence], root,
+                        ask_batch: Callable[[list[Sequence]], list],
+                        next_node: Callable[[Sequence, Any, Any], Optional[Any]],
+                        start_nodes: Optional[dict[Sequence, Any]] = None) -> dict[Sequence, Any]:
+    """Sifts all `sequences` down a discrimination tree together, one level at a time.
+
+    At every level the queries `sequence + node.string` of the sequences still at inner
+    nodes are answered by a single `ask_batch` call, and `next_node(sequence, node, answer)`
+    moves each sequence on, in the order the sequences were given; returning None stops
+    it. Nodes only need `string` and `is_leaf()`. A node sits at a fixed depth, so all the
+    sequences that ever reach it do so at the same level and in their given order: changes
+    `next_node` makes to the tree (e.g. adding a leaf) are seen by later sequences exactly
+    as if they had been sifted one after another, with one round-trip per level instead of
+    one per query. Sequences in `start_nodes` start at the node given there instead of
+    `root`, which is only sound when `next_node` leaves the tree unchanged.
+
+    Returns the node each sequence stopped at, or None.
+    """
+    if start_nodes:
+        positions = {sequence: start_nodes.get(sequence, root) for sequence in sequences}
+    else:
+        positions = dict.fromkeys(sequences, root)
+    moving = [sequence for sequence, node in positions.items() if not node.is_leaf()]
+    while moving:
+        queries = [sequence + positions[sequence].string for sequence in moving]
+        answers = ask_batch(queries)
+        for sequence, answer in zip(moving, answers):
+            positions[sequence] = next_node(sequence, positions[sequence], answer)
+        moving = [sequence for sequence in moving
+                  if positions[sequence] is not None and not positions[sequence].is_leaf()]
+    return positions
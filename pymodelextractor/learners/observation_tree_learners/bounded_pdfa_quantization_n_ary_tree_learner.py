@@ -15,8 +15,10 @@ from pythautomata.automata.wheighted_automaton_definition.weighted_state import
 import numpy as np
 
 class BoundedPDFAQuantizationNAryTreeLearner(PDFAQuantizationNAryTreeLearner):
-    def __init__(self, partitioner, max_states, max_query_length, max_seconds_run=None, generate_partial_hipothesis = False, pre_cache_queries_for_building_hipothesis = False, check_probabilistic_hipothesis = True, exhaust_counterexample = False, mean_distribution_for_partial_hipothesis = False, omit_zero_transitions = False, check_max_states_in_tree = False):
-        super().__init__(partitioner, pre_cache_queries_for_building_hipothesis, check_probabilistic_hipothesis, exhaust_counterexample, omit_zero_transitions)
+    def __init__(self, partitioner, max_states, max_query_length, max_seconds_run=None, generate_partial_hipothesis = False, pre_cache_queries_for_building_hipothesis = False, check_probabilistic_hipothesis = True, exhaust_counterexample = False, mean_distribution_for_partial_hipothesis = False, omit_zero_transitions = False, check_max_states_in_tree = False,
+                 tree_history_keep_last = None, tree_history_every = 1, tree_cache = None):
+        super().__init__(partitioner, pre_cache_queries_for_building_hipothesis, check_probabilistic_hipothesis, exhaust_counterexample, omit_zero_transitions,
+                         tree_history_keep_last, tree_history_every, tree_cache)
         self._max_states = max_states
         self._max_query_length = max_query_length
         self._max_seconds_run = max_seconds_run
@@ -24,7 +26,7 @@ class BoundedPDFAQuantizationNAryTreeLearner(PDFAQuantizationNAryTreeLearner):
         self._exceeded_max_mq_length = False
         self._exceded_time_bound = False
         self._history = []        
-        self._tree_history = []
+        self._tree_history = self._new_tree_history()
         self._generate_partial_hipothesis = generate_partial_hipothesis
         self._compute_mean_distribution_for_partial_hipothesis = mean_distribution_for_partial_hipothesis
         self._check_max_states_in_tree = check_max_states_in_tree
@@ -32,7 +34,7 @@ class BoundedPDFAQuantizationNAryTreeLearner(PDFAQuantizationNAryTreeLearner):
 
     def _perform_equivalence_query(self, model):
         self._history.append(model)
-        self._tree_history.append(self._tree)
+        self._tree_history.record(self._tree)
         if len(model.weighted_states) > self._max_states:
             raise NumberOfStatesExceededException
         return super()._perform_equivalence_query(model)
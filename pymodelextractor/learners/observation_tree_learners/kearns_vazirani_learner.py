@@ -5,11 +5,16 @@ from pymodelextractor.learners.learner import Learner
 from pythautomata.automata.deterministic_finite_automaton import DeterministicFiniteAutomaton as DFA
 from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
 from pymodelextractor.learners.learning_result import LearningResult
+from pymodelextractor.learners.observation_tree_learners.batched_sift import sift_level_by_level
+from pymodelextractor.utils.query_cache import QueryCache
+from pymodelextractor.utils.sequence_store import SequenceStore
 
 
 class KearnsVaziraniLearner(Learner):
-    def __init__(self):
-        pass
+    def __init__(self, tree_cache: QueryCache = None):
+        # Bounds and policy of the membership query cache of each tree, unbounded when None
+        self._tree_cache = tree_cache
+        self._tree = None
 
     @property
     def _alphabet(self):
@@ -36,11 +41,12 @@ class KearnsVaziraniLearner(Learner):
         else:
             nodeRoot.right = nodeCounterexample
             nodeRoot.left = nodeEpsilon
-        self._tree = ClassificationTree(nodeRoot, self._teacher, cache_in_tree)
+        self._tree = ClassificationTree(nodeRoot, self._teacher, cache_in_tree, QueryCache.like(self._tree_cache))
         return (False, None)
 
     def learn(self, teacher: Teacher, cache_in_tree: bool = True) -> LearningResult:
         self._teacher = teacher
+        self._tree = None
         is_target_DFA, model = self.initialization(cache_in_tree)
         if not is_target_DFA:
             model = self.tentative_hypothesis()
@@ -60,20 +66,27 @@ class KearnsVaziraniLearner(Learner):
             'equivalence_queries_count': self._teacher.equivalence_queries_count,
             'membership_queries_count': self._teacher.membership_queries_count,
             'observation_tree': self._tree,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info,
+            **(self._tree.query_cache_info if self._tree is not None else {})
         }
         return LearningResult(model, numberOfStates, info)
     
     def tentative_hypothesis(self) -> DFA:
         states = {}
-        for leaf in self._tree.leaves:
-            is_final = self._tree._ask_membership_query(leaf)
+        leaves = list(self._tree.leaves)
+        # Every hypothesis asks again whether its leaves are accepted, so their answers are kept
+        self._tree.pin_queries(leaves)
+        for leaf, is_final in zip(leaves, self._tree._ask_membership_queries(leaves)):
             state = State(leaf, is_final, access_string=leaf)
             states[leaf] = state
         
-        for access_string, state in states.items():
-            for symbol in self._symbols:
-                access_string_of_transition = self._tree.sift(access_string+symbol)
-                state.add_transition(symbol, states[access_string_of_transition])
+        # Every transition is sifted at once, with one batch of membership queries per tree level.
+        transitions = [(state, symbol, self._tree.sequences.concatenation(access_string, symbol))
+                       for access_string, state in states.items() for symbol in self._symbols]
+        targets = self._tree.sift_batch([sequence for _, _, sequence in transitions])
+        for (state, symbol, _), access_string_of_transition in zip(transitions, targets):
+            state.add_transition(symbol, states[access_string_of_transition])
         
         return DFA(self._alphabet, states[epsilon], set(states.values()), None)
         
@@ -91,7 +104,7 @@ class KearnsVaziraniLearner(Learner):
         s_i = epsilon
         gamma_j_minus_1 = epsilon
         distinguishing_string_found = False
-        for prefix in counterexample.get_prefixes():
+        for prefix in self._tree.sequences.prefixes(counterexample):
             s_i_minus_1 = s_i
             s_i = self._tree.sift(prefix)
             s_hat_i = self.get_accessing_string(model,prefix)
@@ -111,12 +124,20 @@ class KearnsVaziraniLearner(Learner):
         return DFA(self._alphabet, epsilonState, set([epsilonState]), None)
 
 class ClassificationTree():
-    def __init__(self, root: 'ClassificationNode', teacher: Teacher, cache_queries: bool = True):
+    def __init__(self, root: 'ClassificationNode', teacher: Teacher, cache_queries: bool = True,
+                 query_cache: QueryCache = None):
         self._teacher = teacher
         self.root = root
         self.add_leaves_to_dict()
-        self._mq_cache = {}
+        self._mq_cache = query_cache if query_cache is not None else QueryCache()
+        # Sifted sequences (transitions and counterexample prefixes), as canonical sequences hashed
+        # only once; the queries built from them are not interned, so the store grows with the tree
+        self.sequences = SequenceStore()
         self._sift_cache = {}
+        # Sequences cached in _sift_cache under each leaf, so that splitting a leaf only touches those
+        self._sifted_into = {}
+        # Inner node from which to resume sifting a sequence whose cached leaf was split
+        self._sift_resume = {}
         self._cache_queries = cache_queries
   
     def add_leaves_to_dict(self):
@@ -133,35 +154,56 @@ class ClassificationTree():
                 q.append(node.right)
 
     def _ask_membership_query(self, sequence: Sequence) -> bool:
-        if self._cache_queries:
+        return self._ask_membership_queries([sequence])[0]
+
+    def _ask_membership_queries(self, sequences: list[Sequence]) -> list[bool]:
+        if not self._cache_queries:
+            return self._teacher.membership_queries_batch(sequences)
+
+        # Answers are collected apart from the cache, which may evict some of them when bounded
+        answers = {}
+        missing = []
+        for sequence in dict.fromkeys(sequences):
             if sequence in self._mq_cache:
-                return self._mq_cache[sequence]
-        
-        mq = self._teacher.membership_query(sequence)
-        
-        if self._cache_queries:
-            self._mq_cache[sequence] = mq
+                answers[sequence] = self._mq_cache[sequence]
+            else:
+                missing.append(sequence)
+        if missing:
+            results = dict(zip(missing, self._teacher.membership_queries_batch(missing)))
+            self._mq_cache.update(results)
+            answers.update(results)
+        return [answers[sequence] for sequence in sequences]
 
-        return mq
+    @property
+    def query_cache_info(self) -> dict:
+        if not self._cache_queries:
+            return {}
+        return {'tree_cache': self._mq_cache.statistics}
 
-    def sift(self, sequence: Sequence) -> Sequence:
+    def pin_queries(self, sequences: list[Sequence]):
         if self._cache_queries:
-            if sequence in self._sift_cache:
-                return self._sift_cache[sequence]
+            self._mq_cache.pin(sequences)
 
-        node = self.root
-        while not node.is_leaf():
-            d = node.string
-            sd = sequence+d
-            if self._ask_membership_query(sd):
-                node = node.right
-            else:
-                node = node.left
+    def sift(self, sequence: Sequence) -> Sequence:
+        return self.sift_batch([sequence])[0]
 
+    def sift_batch(self, sequences: list[Sequence]) -> list[Sequence]:
+        """Access strings of the leaves `sequences` sift into, asking the queries of each level in one batch."""
         if self._cache_queries:
-            self._sift_cache[sequence] = node.string
+            to_sift = [sequence for sequence in sequences if sequence not in self._sift_cache]
+        else:
+            to_sift = sequences
+
+        leaves = sift_level_by_level(to_sift, self.root, self._ask_membership_queries,
+                                     lambda sequence, node, answer: node.right if answer else node.left,
+                                     start_nodes=self._sift_resume)
+        access_strings = {sequence: leaf.string for sequence, leaf in leaves.items()}
 
-        return node.string
+        if self._cache_queries:
+            for sequence, access_string in access_strings.items():
+                self._cache_sift(sequence, access_string)
+            return [self._sift_cache[sequence] for sequence in sequences]
+        return [access_strings[sequence] for sequence in sequences]
 
     # def get_distinguishing_string(self, string1, string2):
     #     queue = []
@@ -216,16 +258,20 @@ class ClassificationTree():
         node_to_be_replaced: node_2,
         })
         if self._cache_queries:
-            self._update_sift_cache(old_string)
+            self._update_sift_cache(old_string, old_node)
 
-    def _update_sift_cache(self, old_string):
-        keys_to_remove = []
-        for seq, access_string in self._sift_cache.items():
-            if access_string == old_string:
-                keys_to_remove.append(seq)
+    def _cache_sift(self, sequence: Sequence, access_string: Sequence):
+        self._sift_cache[sequence] = access_string
+        self._sifted_into.setdefault(access_string, set()).add(sequence)
+        self._sift_resume.pop(sequence, None)
 
-        for seq in keys_to_remove:
-            del self._sift_cache[seq]    
+    def _update_sift_cache(self, old_string, split_node):
+        # Sequences that sifted into the split leaf still go through split_node, so they are sifted
+        # again from there when next asked for.
+        for seq in self._sifted_into.pop(old_string, ()):
+            if self._sift_cache.get(seq) == old_string:
+                del self._sift_cache[seq]
+                self._sift_resume[seq] = split_node
 
 class ClassificationNode():
     def __init__(self, string: Sequence, parent: 'ClassificationNode' = None):
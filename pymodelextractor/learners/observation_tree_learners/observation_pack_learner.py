@@ -6,11 +6,15 @@ from pythautomata.automata.deterministic_finite_automaton import DeterministicFi
 from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
 from pymodelextractor.learners.learning_result import LearningResult
 from pymodelextractor.learners.counterexample_processing.rivest_schapire import RivestSchapire
+from pymodelextractor.learners.observation_tree_learners.batched_sift import sift_level_by_level
+from pymodelextractor.utils.query_cache import QueryCache
+from pymodelextractor.utils.sequence_store import SequenceStore
 from pythautomata.base_types.symbol import Symbol
 
 class ObservationPackLearner(Learner):
-    def __init__(self):
-        pass
+    def __init__(self, tree_cache: QueryCache = None):
+        # Bounds and policy of the membership query cache of each tree, unbounded when None
+        self._tree_cache = tree_cache
 
     @property
     def _alphabet(self):
@@ -52,7 +56,10 @@ class ObservationPackLearner(Learner):
         info = {
             'equivalence_queries_count': self._teacher.equivalence_queries_count,
             'membership_queries_count': self._teacher.membership_queries_count,
-            'discrimination_tree': self._tree
+            'discrimination_tree': self._tree,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info,
+            **self._tree.query_cache_info
         }
         return LearningResult(hypothesis, numberOfStates, info)
 
@@ -69,7 +76,7 @@ class ObservationPackLearner(Learner):
         else:
             nodeRoot.left = nodeEpsilon
     
-        self._tree = ClassificationTree(nodeRoot, self._teacher)
+        self._tree = ClassificationTree(nodeRoot, self._teacher, QueryCache.like(self._tree_cache))
         self.link_state_t_node[hypothesis.initial_state] = nodeEpsilon
         self.link_node_t_state[nodeEpsilon] = hypothesis.initial_state
 
@@ -78,20 +85,23 @@ class ObservationPackLearner(Learner):
         return hypothesis
     
     def close_transitions(self, hypothesis: DFA) -> DFA:
+        # Open transitions are sifted together, one batch of membership queries per tree level;
+        # states discovered on the way open the transitions of the next round.
         while len(self.open_transitions) > 0:
-            state, symbol = self.open_transitions.pop()
-            transition_aseq = state.name + Sequence([symbol])
-            tgt, new_state_discovered, is_final = self._tree.sift(transition_aseq)
+            open_transitions = list(self.open_transitions)
+            self.open_transitions = set()
+            sifted = self._tree.sift_batch([self._tree.sequences.concatenation(state.name, symbol)
+                                            for state, symbol in open_transitions])
+            for (state, symbol), (tgt, new_state_discovered, is_final) in zip(open_transitions, sifted):
+                if new_state_discovered:
+                    new_state = self.create_single_state(tgt.string, is_final)
+                    self.link_state_t_node[new_state] = tgt
+                    self.link_node_t_state[tgt] = new_state
 
-            if new_state_discovered:
-                new_state = self.create_single_state(tgt.string, is_final)
-                self.link_state_t_node[new_state] = tgt
-                self.link_node_t_state[tgt] = new_state
+                state.transitions[symbol] = {self.link_node_t_state[tgt]}
 
-            state.transitions[symbol] = {self.link_node_t_state[tgt]}
-
-            self.outgoing[state].add((self.link_node_t_state[tgt], symbol))
-            self.incoming[self.link_node_t_state[tgt]].add((state, symbol))
+                self.outgoing[state].add((self.link_node_t_state[tgt], symbol))
+                self.incoming[self.link_node_t_state[tgt]].add((state, symbol))
 
         states = list(self.link_state_t_node.keys())
                             
@@ -160,53 +170,59 @@ class ObservationPackLearner(Learner):
         return new_state
 
 class ClassificationTree():
-    def __init__(self, root: 'ClassificationNode', teacher: Teacher):
+    def __init__(self, root: 'ClassificationNode', teacher: Teacher, query_cache: QueryCache = None):
         self._teacher = teacher
         self.root = root
-        self._mq_cache = {}
+        self._mq_cache = query_cache if query_cache is not None else QueryCache()
+        # Sifted sequences (transitions and counterexample prefixes), as canonical sequences hashed
+        # only once; the queries built from them are not interned, so the store grows with the tree
+        self.sequences = SequenceStore()
 
     def _ask_membership_query(self, sequence: Sequence) -> bool:
-        if sequence in self._mq_cache:
-            return self._mq_cache[sequence]
-        
-        mq = self._teacher.membership_query(sequence)
-        self._mq_cache[sequence] = mq
+        return self._ask_membership_queries([sequence])[0]
+
+    def _ask_membership_queries(self, sequences: list[Sequence]) -> list[bool]:
+        # Answers are collected apart from the cache, which may evict some of them when bounded
+        answers = {}
+        missing = []
+        for sequence in dict.fromkeys(sequences):
+            if sequence in self._mq_cache:
+                answers[sequence] = self._mq_cache[sequence]
+            else:
+                missing.append(sequence)
+        if missing:
+            results = dict(zip(missing, self._teacher.membership_queries_batch(missing)))
+            self._mq_cache.update(results)
+            answers.update(results)
+        return [answers[sequence] for sequence in sequences]
 
-        return mq
+    @property
+    def query_cache_info(self) -> dict:
+        return {'tree_cache': self._mq_cache.statistics}
 
     def sift(self, sequence: Sequence) -> tuple['ClassificationNode', bool, bool]:
-        node = self.root
-        prev_node = None
-        is_right = False
-        first_mq = True
-        is_final = False
-        new_state_discovered = False
-
-        while (not node.is_leaf()):
-            d = node.string
-            sd = sequence + d
-            prev_node = node
-            if self._ask_membership_query(sd):
-                is_right = True
-                node = node.right
-            else:
-                is_right = False
-                node = node.left
-        
-            if first_mq:
-                first_mq = False
-                is_final = is_right
-                
-            if node is None:
-                new_state_discovered = True
-                new_node = ClassificationNode(sequence, parent=prev_node)
+        return self.sift_batch([sequence])[0]
+
+    def sift_batch(self, sequences: list[Sequence]) -> list[tuple['ClassificationNode', bool, bool]]:
+        """Sifts `sequences` in order, as `sift` would one after another, asking the queries of each
+        level in one batch. A sequence falling off the tree becomes a new leaf there."""
+        is_final = {}
+        discovered = set()
+
+        def next_node(sequence, node, is_right):
+            is_final.setdefault(sequence, is_right)
+            child = node.right if is_right else node.left
+            if child is None:
+                child = ClassificationNode(sequence, parent=node)
                 if is_right:
-                    prev_node.right = new_node
+                    node.right = child
                 else:
-                    prev_node.left = new_node
-                node = new_node
+                    node.left = child
+                discovered.add(sequence)
+            return child
 
-        return node, new_state_discovered, is_final
+        leaves = sift_level_by_level(sequences, self.root, self._ask_membership_queries, next_node)
+        return [(leaves[sequence], sequence in discovered, is_final.get(sequence, False)) for sequence in sequences]
     
 class ClassificationNode():
     def __init__(self, string: Sequence, parent: 'ClassificationNode' = None):
@@ -9,16 +9,22 @@ from pythautomata.automata.wheighted_automaton_definition.probabilistic_determin
     ProbabilisticDeterministicFiniteAutomaton as PDFA, ProbabilisticDeterministicFiniteAutomaton
 from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
 from pymodelextractor.learners.learning_result import LearningResult
+from pymodelextractor.learners.observation_tree_learners.batched_sift import sift_level_by_level
+from pymodelextractor.learners.observation_tree_learners.tree_history import TreeHistory, TreeSnapshot
+from pymodelextractor.utils.query_cache import QueryCache
+from pymodelextractor.utils.sequence_store import SequenceStore
 from pymodelextractor.exceptions.query_length_exceeded_exception import QueryLengthExceededException
 from pymodelextractor.exceptions.number_of_states_exceeded_exception import NumberOfStatesExceededException
 from collections import OrderedDict
+from collections.abc import Mapping
 import math
 import warnings
 from graphviz import Digraph
 import numpy as np
 
 class PDFAQuantizationNAryTreeLearner:
-    def __init__(self, probabilityPartitioner: ProbabilityPartitioner, pre_cache_queries_for_building_hipothesis = False, check_probabilistic_hipothesis = True, exhaust_counterexample = False, omit_zero_transitions = False):
+    def __init__(self, probabilityPartitioner: ProbabilityPartitioner, pre_cache_queries_for_building_hipothesis = False, check_probabilistic_hipothesis = True, exhaust_counterexample = False, omit_zero_transitions = False,
+                 tree_history_keep_last = None, tree_history_every = 1, tree_cache: QueryCache = None):
         self.probability_partitioner = probabilityPartitioner
         self._pre_cache_queries_for_building_hipothesis = pre_cache_queries_for_building_hipothesis
         self._verbose = False
@@ -26,8 +32,16 @@ class PDFAQuantizationNAryTreeLearner:
         self._check_probabilistic_hipothesis = check_probabilistic_hipothesis
         self._exhaust_counterexample = exhaust_counterexample
         self._omit_zero_transitions = omit_zero_transitions
+        # Retention of the tree snapshots in 'tree_history', see TreeHistory
+        self._tree_history_keep_last = tree_history_keep_last
+        self._tree_history_every = tree_history_every
+        # Bounds and policy of the next token probabilities cache of each tree, unbounded when None
+        self._tree_cache = tree_cache
         pass
 
+    def _new_tree_history(self) -> TreeHistory:
+        return TreeHistory(self._tree_history_keep_last, self._tree_history_every)
+
     @property
     def _alphabet(self):
         return self._teacher.alphabet
@@ -79,7 +93,8 @@ class PDFAQuantizationNAryTreeLearner:
         nodeRoot.childs[tuple(next_token_probabilities_epsilon.values())] = nodeEpsilon
         nodeRoot.childs[tuple(next_token_probabilities_counterexample.values())] = nodeCounterexample
 
-        self._tree = ClassificationTree(nodeRoot, self._teacher, self.probability_partitioner, verbose=verbose)
+        self._tree = ClassificationTree(nodeRoot, self._teacher, self.probability_partitioner, verbose=verbose,
+                                        query_cache=QueryCache.like(self._tree_cache))
         if verbose:
             print('Initial tree')
             self._tree.pretty_print()
@@ -93,11 +108,11 @@ class PDFAQuantizationNAryTreeLearner:
         self.terminal_symbol = teacher.terminal_symbol
         self._teacher = teacher
         models = []
-        tree_history = []
+        tree_history = self._new_tree_history()
         if verbose: print('Starting learning process')
         is_target_DFA, model = self.initialization(verbose)
         if self._tree is not None:
-            tree_history.append(self._tree.copy())
+            tree_history.record(self._tree)
         symbols = list(self._alphabet.symbols)
         epsilon_probablity = self._teacher.next_token_probabilities(Sequence())
         if not is_target_DFA:
@@ -108,7 +123,7 @@ class PDFAQuantizationNAryTreeLearner:
             model = self.tentative_hypothesis()
             models.append(model)
             last_size = len(model.weighted_states)
-            tree_history.append(self._tree.copy())
+            tree_history.record(self._tree)
             if verbose: 
                 print('Current tree')
                 self._tree.pretty_print()
@@ -139,7 +154,7 @@ class PDFAQuantizationNAryTreeLearner:
                     print('Current tree')
                     self._tree.pretty_print()
                     print('Running EQ')
-                tree_history.append(self._tree.copy())
+                tree_history.record(self._tree)
                 are_equivalent, counterexample = self._perform_equivalence_query(model)
         if verbose: print('Learning process finished')
         result = self._learning_results_for(model, tree_history)
@@ -156,6 +171,9 @@ class PDFAQuantizationNAryTreeLearner:
             'last_token_weight_queries_count': self._teacher.last_token_weight_queries_count,
             'observation_tree': self._tree,
             'tree_history': tree_history,
+            **self._teacher.equivalence_query_info,
+            **self._teacher.query_cache_info,
+            **(self._tree.query_cache_info if self._tree is not None else {})
         }
         return LearningResult(model, numberOfStates, info)
 
@@ -177,12 +195,23 @@ class PDFAQuantizationNAryTreeLearner:
         visited_states = set()
         states_to_visit = []
         states_to_visit.append(epsilon)
+        prefetched_states = set()
         while states_to_visit:
+            if states_to_visit[-1] not in prefetched_states:
+                # Every state waiting in the stack gets visited, so the queries sifting all of their
+                # transitions are asked together before sifting them one by one from the cache.
+                waiting_states = [state for state in dict.fromkeys(states_to_visit) if state not in prefetched_states]
+                self._tree.prefetch_sift_queries([
+                    self._tree.sequences.concatenation(access_string, symbol)
+                    for access_string in waiting_states for symbol in symbols
+                    if self._tree.leaves[access_string].probabilities[symbol] > 0 or not self._omit_zero_transitions])
+                prefetched_states.update(waiting_states)
             access_string = states_to_visit.pop()
             visited_states.add(access_string)
             for symbol in symbols:
                 if self._tree.leaves[access_string].probabilities[symbol] > 0 or not self._omit_zero_transitions:
-                    access_string_of_transition, updated_tree = self._tree.sift(access_string + symbol)
+                    access_string_of_transition, updated_tree = self._tree.sift(
+                        self._tree.sequences.concatenation(access_string, symbol))
                     if updated_tree:
                         new_leaf = self._tree.leaves[access_string_of_transition]
                         terminal_symbol_probability = new_leaf.probabilities[self.terminal_symbol]
@@ -229,7 +258,7 @@ class PDFAQuantizationNAryTreeLearner:
         s_i = epsilon
         gamma_j_minus_1 = epsilon
         if self._verbose: print('CE:', counterexample)
-        for prefix in counterexample.get_prefixes():
+        for prefix in self._tree.sequences.prefixes(counterexample):
             s_i_minus_1 = s_i
             s_i, _ = self._tree.sift(prefix)
             s_hat_i = self.get_accessing_string(model, prefix)
@@ -264,7 +293,8 @@ class ClassificationTree:
     unknown_leaf = "UNKNOWN"
 
     def __init__(self, root: 'ClassificationNode', teacher: ProbabilisticTeacher, probability_partitioner: ProbabilityPartitioner,
-                 max_query_length: int = math.inf, verbose=False, max_states: int = math.inf,check_max_states_in_tree = False):
+                 max_query_length: int = math.inf, verbose=False, max_states: int = math.inf,check_max_states_in_tree = False,
+                 query_cache: QueryCache = None):
         self.leaves = dict()
         self._teacher = teacher
         self.root = root
@@ -272,19 +302,34 @@ class ClassificationTree:
         self.inner_nodes = dict()
         self._add_leaves_and_inner_nodes()
         self._equivalence_dict = dict()
-        self._next_token_probabilities_cache = dict()
+        self._next_token_probabilities_cache = query_cache if query_cache is not None else QueryCache()
+        # Leaves keep the probabilities of their access strings, so those are never evicted
+        self._next_token_probabilities_cache.pin(self.leaves)
         self._partitions_cache = dict()
+        # Sifted sequences (transitions and counterexample prefixes), as canonical sequences hashed
+        # only once; the queries built from them are not interned, so the store grows with the tree
+        self.sequences = SequenceStore()
         self._sift_cache = dict()
+        # Sequences cached in _sift_cache under each leaf, so that splitting a leaf only touches those
+        self._sifted_into = dict()
+        # Inner node from which to resume sifting a sequence whose cached leaf was split
+        self._sift_resume = dict()
         self._max_query_length = max_query_length        
         self._verbose = verbose
         self._check_max_states_in_tree = check_max_states_in_tree
         self._max_states = max_states
+        # Stamped on the nodes added and leaves split from now on, see snapshot
+        self._version = 0
         
 
     @property
     def depth(self) -> int:
         return max([x.depth for x in self.leaves.values()])
 
+    @property
+    def query_cache_info(self) -> dict:
+        return {'tree_cache': self._next_token_probabilities_cache.statistics}
+
     def _add_leaves_and_inner_nodes(self):
         q = [self.root]        
         while q:
@@ -303,8 +348,8 @@ class ClassificationTree:
         for access_string in self.leaves.keys():
             for symbol in symbols:
                 for distinguishing_string in self.inner_nodes:
-                    query = access_string + symbol + distinguishing_string
-                    if query not in self._next_token_probabilities_cache:
+                    query = self.sequences.concatenation(access_string, symbol) + distinguishing_string
+                    if not self._next_token_probabilities_cache.holds(query):
                         queries.add(query)
         if len(queries)>0:
             results = self._teacher.next_token_probabilities_batch(queries)
@@ -313,21 +358,23 @@ class ClassificationTree:
     def sift(self, sequence: Sequence, update = True) -> Sequence:
         if sequence in self._sift_cache:
                 return self._sift_cache[sequence], False
-        node = self.root
+        node = self._sift_resume.get(sequence, self.root)
         updated_tree = False
         while not node.is_leaf():
             d = node.string
             sd = sequence + d
             sd_probabilities = self._next_token_probabilities(sd, update).values()
-            child_key = self._look_for_branch(node.childs, list(sd_probabilities))
+            child_key = self._look_for_branch(node, tuple(sd_probabilities))
             if child_key is not None:
-                node = node.childs[tuple(child_key)]
+                node = node.childs[child_key]
             else:
                 if update:
                     node_probabilities = self._next_token_probabilities(sequence, update)
-                    new_node = ClassificationNode(sequence, parent=node, probabilities=node_probabilities)
+                    new_node = ClassificationNode(sequence, parent=node, probabilities=node_probabilities,
+                                                  version=self._version)
                     node.childs[tuple(sd_probabilities)] = new_node
                     self.leaves.update({new_node.string: new_node})
+                    self._next_token_probabilities_cache.pin([new_node.string])
                     updated_tree = True
                     node = new_node
                     if self._check_max_states_in_tree:
@@ -338,17 +385,80 @@ class ClassificationTree:
                             )
                 else:
                     return ClassificationTree.unknown_leaf, False
-        self._sift_cache[sequence] = node.string
+        self._cache_sift(sequence, node.string)
         return node.string, updated_tree
 
-    def _look_for_branch(self, childs, probabilities):
-        if tuple(probabilities) in childs:
+    def _cache_sift(self, sequence: Sequence, access_string: Sequence):
+        self._sift_cache[sequence] = access_string
+        self._sifted_into.setdefault(access_string, set()).add(sequence)
+        self._sift_resume.pop(sequence, None)
+
+    def prefetch_sift_queries(self, sequences: list[Sequence]):
+        """Asks, one batch per tree level, the next token probabilities that sifting `sequences` reads.
+
+        Sifting only adds leaves, so unless a sequence is caught by a leaf added meanwhile, the
+        inner nodes it goes through, and thus its queries, do not depend on the order sequences
+        are sifted in: later calls to `sift` find them in the cache. Queries longer than the
+        maximum query length are not asked.
+        """
+        def next_node(sequence, node, probabilities):
+            if probabilities is None:
+                return None
+            child_key = self._look_for_branch(node, tuple(probabilities.values()))
+            return None if child_key is None else node.childs[child_key]
+
+        sift_level_by_level([sequence for sequence in sequences if sequence not in self._sift_cache],
+                            self.root, self._next_token_probabilities_batch, next_node,
+                            start_nodes=self._sift_resume)
+
+    def _next_token_probabilities_batch(self, sequences: list[Sequence]) -> list:
+        """Cached next token probabilities of `sequences`, or None for those longer than the maximum query length."""
+        # Answers are collected apart from the cache, which may evict some of them when bounded
+        answers = {}
+        missing = []
+        for sequence in dict.fromkeys(sequences):
+            if len(sequence) > self._max_query_length:
+                continue
+            if sequence in self._next_token_probabilities_cache:
+                answers[sequence] = self._next_token_probabilities_cache[sequence]
+            else:
+                missing.append(sequence)
+        if len(missing) > 1 and self._teacher.supports_batch_queries:
+            results = self._teacher.next_token_probabilities_batch(missing)
+            if not isinstance(results, Mapping):
+                results = dict(results)
+            # Looked up one by one, so batches that build their dicts on lookup only build these
+            for sequence in missing:
+                probabilities = results[sequence]
+                self._next_token_probabilities_cache[sequence] = probabilities
+                answers[sequence] = probabilities
+        else:
+            for sequence in missing:
+                answers[sequence] = self._next_token_probabilities(sequence)
+        return [answers.get(sequence) for sequence in sequences]
+
+    def _look_for_branch(self, node: 'ClassificationNode', probabilities: tuple):
+        """Key of the child of `node` that `probabilities` lead to: the child with exactly those
+        probabilities, otherwise the first child in their partition, or None."""
+        if probabilities in node.childs:
             return probabilities
-        for probs in childs.keys():
-            probs = list(probs)
-            if self.probability_partitioner.are_in_same_partition(probs, probabilities):
-                return probs
-        return None
+        return self._childs_by_partition(node).get(self._partition_key(probabilities))
+
+    def _childs_by_partition(self, node: 'ClassificationNode') -> dict:
+        # Children are only ever added, so the keys not indexed yet are the last ones.
+        if node.indexed_childs < len(node.childs):
+            for probabilities in list(node.childs)[node.indexed_childs:]:
+                node.childs_by_partition.setdefault(self._partition_key(probabilities), probabilities)
+            node.indexed_childs = len(node.childs)
+        return node.childs_by_partition
+
+    def _partition_key(self, probabilities: tuple) -> tuple:
+        """Hashable partition of a probability vector, computed once per vector."""
+        key = self._partitions_cache.get(probabilities)
+        if key is None:
+            key = tuple(np.asarray(self.probability_partitioner.get_partition(probabilities)).tolist())
+            self._partitions_cache[probabilities] = key
+        return key
 
     def _next_token_probabilities(self, sequence: Sequence, check_max_query_length = True):
         if check_max_query_length and len(sequence) > self._max_query_length:
@@ -388,11 +498,14 @@ class ClassificationTree:
         old_node = self.leaves[node_to_be_replaced]
         old_string = old_node.string
         old_node.string = distinguishing_string
+        old_node.split_version = self._version
         self.inner_nodes.update({distinguishing_string: old_node})
         next_token_probabilities_node1 = self._next_token_probabilities(leaf_1)
         next_token_probabilities_node2 = self._next_token_probabilities(node_to_be_replaced)
-        node_1 = ClassificationNode(leaf_1, parent=old_node, probabilities=next_token_probabilities_node1)
-        node_2 = ClassificationNode(node_to_be_replaced, parent=old_node, probabilities=next_token_probabilities_node2)
+        node_1 = ClassificationNode(leaf_1, parent=old_node, probabilities=next_token_probabilities_node1,
+                                    version=self._version)
+        node_2 = ClassificationNode(node_to_be_replaced, parent=old_node, probabilities=next_token_probabilities_node2,
+                                    version=self._version)
 
         node1_cont = leaf_1 + distinguishing_string
         node1_cont_probabilities = self._next_token_probabilities(node1_cont)
@@ -410,10 +523,11 @@ class ClassificationTree:
             leaf_1: node_1,
             node_to_be_replaced: node_2,
         })
+        self._next_token_probabilities_cache.pin([leaf_1])
         if self._verbose:
             print(self.leaves.keys())
             print("--------")       
-        self._update_sift_cache(old_string)
+        self._update_sift_cache(old_string, old_node)
         if self._check_max_states_in_tree:
             if len(self.leaves) > self._max_states:
                 raise NumberOfStatesExceededException(
@@ -421,14 +535,13 @@ class ClassificationTree:
                     f"Current number of leaves: {len(self.leaves)}."
                 )
 
-    def _update_sift_cache(self, old_string):
-        keys_to_remove = []
-        for seq, access_string in self._sift_cache.items():
-            if access_string == old_string:
-                keys_to_remove.append(seq)
-
-        for seq in keys_to_remove:
-            del self._sift_cache[seq]
+    def _update_sift_cache(self, old_string, split_node):
+        # Sequences that sifted into the split leaf still go through split_node, so they are sifted
+        # again from there when next asked for.
+        for seq in self._sifted_into.pop(old_string, ()):
+            if self._sift_cache.get(seq) == old_string:
+                del self._sift_cache[seq]
+                self._sift_resume[seq] = split_node
 
     def pretty_print(self, node=None, indent="", last=True):
         """
@@ -577,22 +690,51 @@ class ClassificationTree:
             max_query_length=self._max_query_length,
             verbose=self._verbose,
             max_states=self._max_states,
-            check_max_states_in_tree=self._check_max_states_in_tree
+            check_max_states_in_tree=self._check_max_states_in_tree,
+            query_cache=self._next_token_probabilities_cache.copy()
         )
         
         # Copy all the caches and dictionaries
-        new_tree._next_token_probabilities_cache = self._next_token_probabilities_cache.copy()
         new_tree._partitions_cache = self._partitions_cache.copy()
+        # Stores only grow, so the copy can share this one
+        new_tree.sequences = self.sequences
         new_tree._sift_cache = self._sift_cache.copy()
+        new_tree._sifted_into = {access_string: set(sequences) for access_string, sequences in self._sifted_into.items()}
         new_tree._equivalence_dict = self._equivalence_dict.copy()
         
         return new_tree
 
-    def _copy_node(self, node: 'ClassificationNode') -> 'ClassificationNode':
-        """Helper method to recursively copy a node and its children."""
+    def snapshot(self) -> TreeSnapshot:
+        """The tree as it is now, kept apart from later changes without copying it."""
+        snapshot = TreeSnapshot(self, self._version)
+        self._version += 1
+        return snapshot
+
+    def at_version(self, version: int) -> 'ClassificationTree':
+        """A copy of the tree as it was when the snapshot of `version` was taken.
+
+        Next token probabilities and partitions never change once known, so the copy shares
+        those caches with this tree instead of duplicating them.
+        """
+        new_tree = ClassificationTree(
+            root=self._copy_node(self.root, version),
+            teacher=self._teacher,
+            probability_partitioner=self.probability_partitioner,
+            max_query_length=self._max_query_length,
+            verbose=self._verbose,
+            max_states=self._max_states,
+            check_max_states_in_tree=self._check_max_states_in_tree,
+            query_cache=self._next_token_probabilities_cache
+        )
+        new_tree._partitions_cache = self._partitions_cache
+        new_tree.sequences = self.sequences
+        return new_tree
+
+    def _copy_node(self, node: 'ClassificationNode', version: int = None) -> 'ClassificationNode':
+        """Helper method to recursively copy a node and its children, as they were at `version` if given."""
         # Create a copy of the current node
         node_copy = ClassificationNode(
-            string=node.string,
+            string=node.string if version is None else node.string_at(version),
             parent=None,  # Will be set when copying parent
             probabilities=node.probabilities.copy() if node.probabilities else None
         )
@@ -600,19 +742,28 @@ class ClassificationTree:
         
         # Recursively copy all children
         for probs, child in node.childs.items():
-            child_copy = self._copy_node(child)
+            if version is not None and child.added_version > version:
+                continue
+            child_copy = self._copy_node(child, version)
             child_copy.parent = node_copy
             node_copy.childs[probs] = child_copy
         
         return node_copy
 
 class ClassificationNode:
-    def __init__(self, string: Sequence, parent: 'ClassificationNode' = None, probabilities=None):
+    def __init__(self, string: Sequence, parent: 'ClassificationNode' = None, probabilities=None, version: int = 0):
         self.parent = parent
         self.childs = OrderedDict()
         self.string = string
         self.probabilities = probabilities
         self._depth = parent.depth + 1 if parent else 0
+        # Partition key -> key of the first child in that partition, for the first indexed_childs childs
+        self.childs_by_partition = dict()
+        self.indexed_childs = 0
+        # Tree versions in which the node was added and, for a leaf turned into an inner node, split
+        self.added_version = version
+        self.split_version = None
+        self._leaf_string = string
 
     @property
     def depth(self) -> int:
@@ -620,3 +771,8 @@ class ClassificationNode:
 
     def is_leaf(self) -> bool:
         return len(self.childs) == 0
+
+    def string_at(self, version: int) -> Sequence:
+        if self.split_version is not None and self.split_version > version:
+            return self._leaf_string
+        return self.string
@@ -0,0 +1,48 @@
+from typing import Optional
+
+
+class TreeSnapshot:
+    """A classification tree as it was when its `snapshot` method was called.
+
+    Trees stamp each node with the version it was added in and each leaf they split with
+    the version of the split, so taking a snapshot copies nothing: it is just the tree and
+    a version. The tree of that version is rebuilt, sharing the query caches of the live
+    tree, the first time the snapshot is used like a `ClassificationTree`.
+    """
+
+    def __init__(self, tree, version: int):
+        self._live_tree = tree
+        self.version = version
+        self._tree = None
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = self._live_tree.at_version(self.version)
+        return self._tree
+
+    def __getattr__(self, name):
+        if name in ('_live_tree', 'version', '_tree'):
+            raise AttributeError(name)
+        return getattr(self.tree, name)
+
+
+class TreeHistory(list):
+    """Snapshots of a classification tree taken while learning, kept according to a retention
+    policy: one of every `every` snapshots offered is kept, and of those only the last
+    `keep_last` (all of them when None, none when 0)."""
+
+    def __init__(self, keep_last: Optional[int] = None, every: int = 1):
+        super().__init__()
+        assert every >= 1 and (keep_last is None or keep_last >= 0)
+        self._keep_last = keep_last
+        self._every = every
+        self._offered = 0
+
+    def record(self, tree):
+        """Keeps a snapshot of `tree`, or None when there is no tree yet, if the policy says so."""
+        if self._offered % self._every == 0 and self._keep_last != 0:
+            self.append(None if tree is None else tree.snapshot())
+            if self._keep_last is not None and len(self) > self._keep_last:
+                del self[0]
+        self._offered += 1
@@ -28,6 +28,32 @@ from pymodelextractor.tests.learners_tests.test_partial_table_translator import
 from pymodelextractor.tests.learners_tests.test_ensemble_boolean_learner import TestEnsembleBooleanLearner
 from pymodelextractor.tests.learners_tests.test_ensemble_probabilistic_learner import TestEnsembleProbabilisticLearner
 from pymodelextractor.tests.learners_tests.test_observation_pack_learner import TestObservationPackLearner
+from pymodelextractor.tests.learners_tests.test_sqlite_query_cache_store import TestSQLiteQueryCacheStore
+from pymodelextractor.tests.learners_tests.test_membership_queries_batch import TestMembershipQueriesBatch
+from pymodelextractor.tests.learners_tests.test_concurrent_general_teacher import TestConcurrentGeneralTeacher
+from pymodelextractor.tests.learners_tests.test_pac_sampling_engine import TestPACSamplingEngine
+from pymodelextractor.tests.learners_tests.test_prefix_state_caching_model import TestPrefixStateCachingModel
+from pymodelextractor.tests.learners_tests.test_shared_memory_probability_cache import TestSharedMemoryProbabilityCache
+from pymodelextractor.tests.learners_tests.test_compiled_pdfa import TestCompiledPDFA
+from pymodelextractor.tests.learners_tests.test_pac_sample_streaming import TestPACSampleStreaming
+from pymodelextractor.tests.learners_tests.test_pac_sample_pool import TestPACSamplePool
+from pymodelextractor.tests.learners_tests.test_sequential_pac_test import TestSequentialPACTest
+from pymodelextractor.tests.learners_tests.test_row_signature_index import TestRowSignatureIndex
+from pymodelextractor.tests.learners_tests.test_incremental_general_observation_table import \
+    TestIncrementalGeneralObservationTable
+from pymodelextractor.tests.learners_tests.test_columnar_observations import TestColumnarObservations
+from pymodelextractor.tests.learners_tests.test_row_matching_index import TestRowMatchingIndex
+from pymodelextractor.tests.learners_tests.test_indexed_heap import TestIndexedHeap
+from pymodelextractor.tests.learners_tests.test_observation_matrix import TestObservationMatrix
+from pymodelextractor.tests.learners_tests.test_observation_clustering import TestObservationClustering
+from pymodelextractor.tests.learners_tests.test_row_state_index import TestRowStateIndex
+from pymodelextractor.tests.learners_tests.test_batched_sift import TestBatchedSift
+from pymodelextractor.tests.learners_tests.test_sift_cache_invalidation import TestSiftCacheInvalidation
+from pymodelextractor.tests.learners_tests.test_partition_branch_lookup import TestPartitionBranchLookup
+from pymodelextractor.tests.learners_tests.test_tree_history import TestTreeHistory
+from pymodelextractor.tests.learners_tests.test_query_cache import TestQueryCache
+from pymodelextractor.tests.learners_tests.test_sequence_store import TestSequenceStore
+from pymodelextractor.tests.learners_tests.test_array_queries import TestArrayQueries
 
 def run():
      test_classes_to_run = [TestLStarLearner,
@@ -55,7 +81,32 @@ def run():
                               TestPartialDFATranslator,
                               TestEnsembleBooleanLearner,
                               TestEnsembleProbabilisticLearner,
-                              TestObservationPackLearner]
+                              TestObservationPackLearner,
+                              TestSQLiteQueryCacheStore,
+                              TestMembershipQueriesBatch,
+                              TestConcurrentGeneralTeacher,
+                              TestPACSamplingEngine,
+                              TestPrefixStateCachingModel,
+                              TestSharedMemoryProbabilityCache,
+                              TestCompiledPDFA,
+                              TestPACSampleStreaming,
+                              TestPACSamplePool,
+                              TestSequentialPACTest,
+                              TestRowSignatureIndex,
+                              TestIncrementalGeneralObservationTable,
+                              TestColumnarObservations,
+                              TestRowMatchingIndex,
+                              TestIndexedHeap,
+                              TestObservationMatrix,
+                              TestObservationClustering,
+                              TestRowStateIndex,
+                              TestBatchedSift,
+                              TestSiftCacheInvalidation,
+                              TestPartitionBranchLookup,
+                              TestTreeHistory,
+                              TestQueryCache,
+                              TestSequenceStore,
+                              TestArrayQueries]
      
      loader = TestLoader()
      suites_list = []
@@ -29,6 +29,12 @@ class DeterministicFiniteAutomatonTeacher(Teacher):
         self._membership_queries_count += 1
         return self.automaton.accepts(sequence)
 
+    def membership_queries_batch(self, sequences: list[Sequence]) -> list[bool]:
+        self._membership_queries_count += len(sequences)
+        if hasattr(self.automaton, 'accepts_batch'):
+            return list(self.automaton.accepts_batch(sequences))
+        return [self.automaton.accepts(sequence) for sequence in sequences]
+
     def equivalence_query(self, model: FiniteAutomaton) -> Tuple[bool, Union[Sequence, None]]:
         self._equivalence_queries_count += 1
         counterexample = self._comparison_strategy.get_counterexample_between(model, self.automaton)
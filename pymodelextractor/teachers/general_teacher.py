@@ -1,3 +1,5 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
 from typing import Tuple, Union
 
 from pythautomata.base_types.sequence import Sequence
@@ -10,17 +12,26 @@ from pythautomata.model_comparators.moore_machine_comparison_strategy import Moo
 from pythautomata.abstract.boolean_model import BooleanModel
 from pythautomata.abstract.model import Model
 from pymodelextractor.utils.data_loader import DataLoader
+from pymodelextractor.utils.query_cache import QueryCache
+from pymodelextractor.utils.query_cache_store import QueryCacheStore
 
 class GeneralTeacher(Teacher):
 
     def __init__(self, state_machine: Union[BooleanModel, Model],
                 comparison_strategy: Union[FAComparator, PAC, MealyComparator, MooreComparator],
                 w_cache = True,
-                cache_from_dataloader: DataLoader = None):
+                cache_from_dataloader: DataLoader = None,
+                cache_store: QueryCacheStore = None,
+                max_workers: int = 1,
+                cache: QueryCache = None):
         self._state_machine = state_machine
         self._comparison_strategy = comparison_strategy
-        self._cache = {}
+        self._cache = cache if cache is not None else QueryCache()
         self._w_cache = w_cache
+        self._cache_store = cache_store
+        self._lock = Lock()
+        self._in_flight: dict[Sequence, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers) if max_workers > 1 else None
         if cache_from_dataloader is not None:
             self._cache.update(cache_from_dataloader.get_data())
 
@@ -42,19 +53,123 @@ class GeneralTeacher(Teacher):
     def equivalence_queries_count(self) -> int:
         return self._equivalence_queries_count
 
+    @property
+    def query_cache_info(self) -> dict:
+        if not self._w_cache:
+            return {}
+        return {'teacher_cache': self._cache.statistics}
+
     def membership_query(self, sequence: Sequence):
-        self._membership_queries_count += 1
+        with self._lock:
+            self._membership_queries_count += 1
 
         if not self._w_cache:
             return self._state_machine.process_query(sequence)  
         
+        if self._executor is not None:
+            return self._in_flight_answer_for(sequence).result()
+
         if sequence not in self._cache:
-            result = self._state_machine.process_query(sequence)
+            result = self._stored_or_processed(sequence)
             self._cache[sequence] = result
             return result
 
         return self._cache[sequence]
 
+    def membership_queries_batch(self, sequences: list[Sequence]) -> list:
+        with self._lock:
+            self._membership_queries_count += len(sequences)
+
+        if not self._w_cache:
+            return self._process_queries(sequences)
+
+        if self._executor is not None and not self._has_batch_target:
+            futures = {sequence: self._in_flight_answer_for(sequence) for sequence in sequences}
+            return [futures[sequence].result() for sequence in sequences]
+
+        # Answers are collected apart from the cache, which may evict some of them when bounded
+        answers = {}
+        missing = []
+        for sequence in dict.fromkeys(sequences):
+            if sequence in self._cache:
+                answers[sequence] = self._cache[sequence]
+            else:
+                missing.append(sequence)
+        if len(missing) > 0:
+            results = dict(zip(missing, self._stored_or_processed_batch(missing)))
+            self._cache.update(results)
+            answers.update(results)
+
+        return [answers[sequence] for sequence in sequences]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    @property
+    def _has_batch_target(self) -> bool:
+        return hasattr(self._state_machine, 'process_query_batch') or \
+            hasattr(self._state_machine, 'accepts_batch')
+
+    def _process_queries(self, sequences: list[Sequence]) -> list:
+        if hasattr(self._state_machine, 'process_query_batch'):
+            return list(self._state_machine.process_query_batch(sequences))
+        if hasattr(self._state_machine, 'accepts_batch'):
+            return list(self._state_machine.accepts_batch(sequences))
+        if self._executor is not None:
+            return list(self._executor.map(self._state_machine.process_query, sequences))
+        return [self._state_machine.process_query(sequence) for sequence in sequences]
+
+    def _in_flight_answer_for(self, sequence: Sequence) -> Future:
+        # A sequence is either cached, being answered by a worker, or unseen;
+        # requests for a sequence already in flight share its future.
+        with self._lock:
+            if sequence in self._cache:
+                future = Future()
+                future.set_result(self._cache[sequence])
+                return future
+            future = self._in_flight.get(sequence)
+            if future is None:
+                future = self._executor.submit(self._answer_and_cache, sequence)
+                self._in_flight[sequence] = future
+            return future
+
+    def _answer_and_cache(self, sequence: Sequence):
+        try:
+            result = self._stored_or_processed(sequence)
+            with self._lock:
+                self._cache[sequence] = result
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[sequence]
+
+    def _stored_or_processed_batch(self, sequences: list[Sequence]) -> list:
+        if self._cache_store is None:
+            return self._process_queries(sequences)
+        results = {}
+        for sequence in sequences:
+            try:
+                results[sequence] = self._cache_store[sequence]
+            except KeyError:
+                pass
+        missing = [sequence for sequence in sequences if sequence not in results]
+        if len(missing) > 0:
+            for sequence, result in zip(missing, self._process_queries(missing)):
+                self._cache_store[sequence] = result
+                results[sequence] = result
+        return [results[sequence] for sequence in sequences]
+
+    def _stored_or_processed(self, sequence: Sequence):
+        if self._cache_store is None:
+            return self._state_machine.process_query(sequence)
+        try:
+            return self._cache_store[sequence]
+        except KeyError:
+            result = self._state_machine.process_query(sequence)
+            self._cache_store[sequence] = result
+            return result
+
     def equivalence_query(self, model: Union[Model, BooleanModel]) \
             -> Tuple[bool, Union[Sequence, None]]:
         self._equivalence_queries_count += 1
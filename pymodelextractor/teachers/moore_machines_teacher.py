@@ -34,6 +34,12 @@ class MooreMachineTeacher(Teacher):
         self._membership_queries_count += 1
         return self.moore_machine.last_symbol(sequence)
 
+    def membership_queries_batch(self, sequences: list[Sequence]) -> list:
+        self._membership_queries_count += len(sequences)
+        if hasattr(self.moore_machine, 'last_symbol_batch'):
+            return list(self.moore_machine.last_symbol_batch(sequences))
+        return [self.moore_machine.last_symbol(sequence) for sequence in sequences]
+
     def equivalence_query(self, model: MM, verbose: bool = False) -> Tuple[bool, Union[Sequence, None]]:
         start_eq_time = time.time()
         self._equivalence_queries_count += 1
@@ -5,7 +5,12 @@ from pythautomata.utilities.sequence_generator import SequenceGenerator
 from pymodelextractor.teachers.pac_probabilistic_teacher import PACProbabilisticTeacher
 from pythautomata.abstract.finite_automaton import FiniteAutomataComparator
 from pythautomata.base_types.symbol import Symbol
+from pythautomata.utilities.probability_partitioner import ProbabilityPartitioner
 from pymodelextractor.utils.data_loader import DataLoader
+from pymodelextractor.utils.compiled_pdfa import CompiledPDFA
+from pymodelextractor.utils.batch_comparison import next_tokens_equivalent_output_batch
+from pymodelextractor.utils.array_queries import last_token_weights_batch, supports_array_queries
+import numpy as np
 
 from typing import Union
 from collections import OrderedDict
@@ -13,33 +18,38 @@ class PACBatchProbabilisticTeacher(PACProbabilisticTeacher):
 
     def __init__(self, model: ProbabilisticModel, epsilon: float, delta: float,
                  comparator: FiniteAutomataComparator, sequence_generator: SequenceGenerator = None,
-                 max_seq_length: float = 128, compute_epsilon_star: bool = True, parallel_cache = False, max_query_elements = 1_000_000, batch_size = 10_000, cache_from_dataloader:DataLoader = None):
-        super().__init__(model, comparator, epsilon, delta, sequence_generator, max_seq_length, compute_epsilon_star, parallel_cache , max_query_elements, batch_size, cache_from_dataloader)
-        assert (hasattr(model, 'get_last_token_weights_batch'))
+                 max_seq_length: float = 128, compute_epsilon_star: bool = True, parallel_cache = False, max_query_elements = 1_000_000, batch_size = 10_000, cache_from_dataloader:DataLoader = None,
+                 reuse_sample: bool = False, partitioner: ProbabilityPartitioner = None):
+        super().__init__(model, comparator, epsilon, delta, sequence_generator, max_seq_length, compute_epsilon_star, parallel_cache , max_query_elements, batch_size, cache_from_dataloader,
+                         reuse_sample=reuse_sample)
+        assert (hasattr(model, 'get_last_token_weights_batch') or supports_array_queries(model))
+        # The partitioner of a `WFAPartitionComparator`, to compare its partitions in batch
+        self._partitioner = partitioner
 
     def equivalence_query(self, aut: WeightedAutomaton) -> tuple[bool, Union[Sequence, None]]:
         self._equivalence_queries_count += 1
         sample_size = self._calculate_sample_size()
-        errorCount = 0
-        counterexample = None
         suffixes = [self.terminal_symbol]
 
         for symbol in self.alphabet.symbols:
             suffixes.append(Sequence((symbol,)))
 
-        rand_words = self._sequence_generator.generate_words(sample_size)
-        rand_words.sort(key=len)
-        results = self._target_model.get_last_token_weights_batch(rand_words, suffixes)
-        for i in range(len(rand_words)):
-            word = rand_words[i]
-            obs1 = results[i]
-            obs2 = aut.get_last_token_weights(word, suffixes)
-            if not self._comparator.next_tokens_equivalent_output(obs1, obs2):
-                errorCount += 1
-                if counterexample is None:
-                    counterexample = word
-                if not self._compute_epsilon_star:
-                    return False, counterexample
+        if self._sample_pool is not None:
+            rand_words = sorted(self._sample_pool.grow_to(
+                sample_size, self._sequence_generator,
+                lambda sequences: last_token_weights_batch(self._target_model, sequences, suffixes)), key=len)
+            results = np.array([self._sample_pool.answers[word] for word in rand_words])
+        else:
+            rand_words = self._sequence_generator.generate_words(sample_size)
+            rand_words.sort(key=len)
+            results = last_token_weights_batch(self._target_model, rand_words, suffixes)
+        hypothesis_results = CompiledPDFA(aut, suffixes).last_token_weights_batch(rand_words)
+        errors = np.flatnonzero(~next_tokens_equivalent_output_batch(self._comparator, results, hypothesis_results,
+                                                                     self._partitioner))
+        errorCount = len(errors)
+        counterexample = rand_words[errors[0]] if errorCount > 0 else None
+        if counterexample is not None and not self._compute_epsilon_star:
+            return False, counterexample
         if errorCount > 0:
             self._calculate_epsilon_star_with(errorCount)
 
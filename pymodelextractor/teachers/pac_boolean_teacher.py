@@ -1,5 +1,9 @@
-from typing import Tuple
+from typing import Callable, Tuple
 from pymodelextractor.teachers.teacher import Teacher
+from pymodelextractor.teachers.pac_sampling_engine import PACSamplingEngine, BooleanDisagreement, sample_chunks, \
+    uniform_length_sampler
+from pymodelextractor.teachers.pac_sample_pool import PACSamplePool
+from pymodelextractor.teachers.sequential_pac_test import SequentialPACTest
 from pythautomata.utilities.sequence_generator import SequenceGenerator
 from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
 from pythautomata.base_types.alphabet import Alphabet
@@ -11,7 +15,11 @@ from math import ceil, log, comb
 class PACBooleanTeacher(Teacher):
 
     def __init__(self, model: BooleanModel, epsilon: float, delta: float, sequence_generator: SequenceGenerator = None,
-                 max_seq_length: int = 128, compute_epsilon_star: bool = True, verbose: bool = False):
+                 max_seq_length: int = 128, compute_epsilon_star: bool = True, verbose: bool = False,
+                 sampling_engine: PACSamplingEngine = None, stream_sample: bool = False,
+                 reuse_sample: bool = False, adaptive: bool = False, length_sampler: Callable[[], int] = None):
+        if stream_sample and reuse_sample:
+            raise ValueError('stream_sample and reuse_sample cannot both be set, a reused sample is kept whole')
         self.last_sample_size = None
         self.__target_model = model
         self._epsilon = epsilon
@@ -21,9 +29,18 @@ class PACBooleanTeacher(Teacher):
         self.__compute_epsilon_star = compute_epsilon_star
         if sequence_generator is None:
             self._sequence_generator = UniformLengthSequenceGenerator(self.__target_model.alphabet, max_seq_length=max_seq_length)
+            if length_sampler is None:
+                length_sampler = uniform_length_sampler(max_seq_length)
         else:
             self._sequence_generator = sequence_generator
+        self._length_sampler = length_sampler
         self._verbose = verbose
+        self._sampling_engine = PACSamplingEngine() if sampling_engine is None else sampling_engine
+        self._stream_sample = stream_sample
+        self._sample_pool = PACSamplePool() if reuse_sample else None
+        self._sequential_test = SequentialPACTest(epsilon, delta) if adaptive else None
+        self.samples_spent = 0
+        self.epsilon_bound = None
         super().__init__()
 
     @property
@@ -38,34 +55,72 @@ class PACBooleanTeacher(Teacher):
     def equivalence_queries_count(self):
         return self._equivalence_queries_count
 
+    @property
+    def equivalence_query_info(self) -> dict:
+        if self._sequential_test is None:
+            return {}
+        return {'pac_samples_spent': self.samples_spent, 'pac_epsilon_bound': self.epsilon_bound}
+
     def membership_query(self, sequence: Sequence) -> bool:
         self._membership_queries_count += 1
         return self.__target_model.accepts(sequence)
 
+    def membership_queries_batch(self, sequences: list[Sequence]) -> list[bool]:
+        self._membership_queries_count += len(sequences)
+        if hasattr(self.__target_model, 'accepts_batch'):
+            return list(self.__target_model.accepts_batch(sequences))
+        return [self.__target_model.accepts(sequence) for sequence in sequences]
+
     def equivalence_query(self, model: BooleanModel) -> Tuple[bool, Sequence]:
         self._equivalence_queries_count += 1
         if self._verbose: print("*** Equivalence Query - teacher counter:", self.equivalence_queries_count, "***")
 
+        if self._sequential_test is not None:
+            return self._sequential_equivalence_query(BooleanDisagreement(self.__target_model, model))
+
         sample_size = self._calculate_sample_size()
         if self._verbose: print("Sample Size:", sample_size, "Epsilon:", self._epsilon, "Epsilon*:", self.epsilon_star,
                                 "Delta:", self._delta)
 
-        errorCount = 0
-        counterexample = None
-
-        sequences = self._sequence_generator.generate_words(sample_size)
-        sequences.sort(key=len)
-        for sequence in sequences:
-            if self.__target_model.accepts(sequence) != model.accepts(sequence):
-                if not self.__compute_epsilon_star:
-                    return (False, sequence)
-                errorCount += 1
-                if counterexample is None or len(sequence) < len(counterexample):
-                    counterexample = sequence
-        if errorCount > 0:
-            self._calculate_epsilon_star_with(errorCount)
+        if self._sample_pool is not None:
+            sequences = self._sample_pool.grow_to(sample_size, self._sequence_generator, self._target_answers)
+            evaluation = self._sampling_engine.evaluate(
+                sequences, BooleanDisagreement(self.__target_model, model, self._sample_pool.answers),
+                stop_at_first=not self.__compute_epsilon_star)
+        elif self._stream_sample:
+            disagreement = BooleanDisagreement(self.__target_model, model)
+            chunks, length_ordered = sample_chunks(self._sequence_generator, sample_size,
+                                                   self._sampling_engine.chunk_size, self._length_sampler)
+            evaluation = self._sampling_engine.evaluate_chunks(chunks, disagreement,
+                                                               stop_at_first=not self.__compute_epsilon_star,
+                                                               length_ordered=length_ordered)
+        else:
+            sequences = self._sequence_generator.generate_words(sample_size)
+            evaluation = self._sampling_engine.evaluate(sequences, BooleanDisagreement(self.__target_model, model),
+                                                        stop_at_first=not self.__compute_epsilon_star)
+        counterexample = evaluation.counterexample
+        if counterexample is not None and not self.__compute_epsilon_star:
+            return (False, counterexample)
+        if evaluation.error_count > 0:
+            self._calculate_epsilon_star_with(evaluation.error_count)
         return counterexample is None, counterexample
 
+    def _sequential_equivalence_query(self, disagreement: BooleanDisagreement) -> Tuple[bool, Sequence]:
+        result = self._sequential_test.run(self.equivalence_queries_count, self._sequence_generator, disagreement,
+                                           self._sampling_engine)
+        self.samples_spent += result.samples_spent
+        self.epsilon_bound = result.epsilon_bound
+        if result.error_count > 0 and self.__compute_epsilon_star:
+            self.last_sample_size = result.samples_spent
+            self._calculate_epsilon_star_with(result.error_count)
+        if self._verbose: print("Samples spent:", result.samples_spent, "Epsilon bound:", result.epsilon_bound)
+        return result.counterexample is None, result.counterexample
+
+    def _target_answers(self, sequences: list[Sequence]) -> list[bool]:
+        if hasattr(self.__target_model, 'accepts_batch'):
+            return list(self.__target_model.accepts_batch(sequences))
+        return [self.__target_model.accepts(sequence) for sequence in sequences]
+
     def _calculate_sample_size(self):
         numberOfCalls = self.equivalence_queries_count
         sample_size = ceil((log(2) * (numberOfCalls + 1) - log(self._delta)) / self._epsilon)
@@ -83,9 +138,13 @@ class PACBooleanTeacher(Teacher):
         self.sample_size = 0
         self.epsilon_star = 0
         self.last_sample_size = 0
+        self.samples_spent = 0
+        self.epsilon_bound = None
         self.membership_queries_count = 0
         self.equivalence_queries_count = 0
         self._sequence_generator.reset_seed()
+        if self._sample_pool is not None:
+            self._sample_pool.clear()
 
     @membership_queries_count.setter
     def membership_queries_count(self, value):
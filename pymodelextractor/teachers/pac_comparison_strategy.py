@@ -1,46 +1,70 @@
-from typing import Union
+from typing import Callable, Union
 from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
 from pythautomata.base_types.alphabet import Alphabet
 from pythautomata.base_types.sequence import Sequence
 from pythautomata.abstract.model import Model
 from pythautomata.abstract.boolean_model import BooleanModel
 from pythautomata.utilities.sequence_generator import SequenceGenerator
+from pymodelextractor.teachers.pac_sampling_engine import PACSamplingEngine, QueryDisagreement, sample_chunks, \
+    uniform_length_sampler
+from pymodelextractor.teachers.pac_sample_pool import PACSamplePool
 from math import ceil, log, comb
 
 
 class PACComparisonStrategy:
     def __init__(self, target_model_alphabet: Alphabet, epsilon: float, 
                 delta: float, max_seq_length: int = 128, 
-                compute_epsilon_star: bool = True, sequence_generator: SequenceGenerator = None):
+                compute_epsilon_star: bool = True, sequence_generator: SequenceGenerator = None,
+                sampling_engine: PACSamplingEngine = None, stream_sample: bool = False,
+                reuse_sample: bool = False, length_sampler: Callable[[], int] = None):
+        if stream_sample and reuse_sample:
+            raise ValueError('stream_sample and reuse_sample cannot both be set, a reused sample is kept whole')
         self._epsilon = epsilon
         self._delta = delta
         self._equivalence_queries_count = 0
         self._compute_epsilon_star = compute_epsilon_star
+        self._sampling_engine = PACSamplingEngine() if sampling_engine is None else sampling_engine
+        self._stream_sample = stream_sample
+        self._sample_pool = PACSamplePool() if reuse_sample else None
+        self._sample_pool_target = None
 
         if sequence_generator is None:
             self._sequence_generator = UniformLengthSequenceGenerator(target_model_alphabet, 
                                                                       max_seq_length)
+            if length_sampler is None:
+                length_sampler = uniform_length_sampler(max_seq_length)
         else:
             self._sequence_generator = sequence_generator
+        self._length_sampler = length_sampler
 
     def get_counterexample_between(self, model: Union[Model, BooleanModel], 
                                    target_model: Union[Model, BooleanModel]) -> Sequence:
             self._equivalence_queries_count += 1
             sample_size = self._calculate_sample_size()
-            sequences = self._sequence_generator.generate_words(sample_size)
-            error_count = 0
-            counterexample = None
-            sequences.sort(key=len)
-            for sequence in sequences:
-                if target_model.process_query(sequence) != model.process_query(sequence):
-                    if not self._compute_epsilon_star:
-                        return (False, sequence)
-                    error_count += 1
-                    if counterexample is None or len(sequence) < len(counterexample):
-                        counterexample = sequence
-            if error_count > 0:
-                self._calculate_epsilon_star_with(error_count)
-            return counterexample
+            if self._sample_pool is not None:
+                if target_model is not self._sample_pool_target:
+                    self._sample_pool.clear()
+                    self._sample_pool_target = target_model
+                sequences = self._sample_pool.grow_to(
+                    sample_size, self._sequence_generator,
+                    lambda sequences: [target_model.process_query(sequence) for sequence in sequences])
+                evaluation = self._sampling_engine.evaluate(
+                    sequences, QueryDisagreement(target_model, model, self._sample_pool.answers),
+                    stop_at_first=not self._compute_epsilon_star)
+            elif self._stream_sample:
+                disagreement = QueryDisagreement(target_model, model)
+                chunks, length_ordered = sample_chunks(self._sequence_generator, sample_size,
+                                                       self._sampling_engine.chunk_size, self._length_sampler)
+                evaluation = self._sampling_engine.evaluate_chunks(chunks, disagreement,
+                                                                   stop_at_first=not self._compute_epsilon_star,
+                                                                   length_ordered=length_ordered)
+            else:
+                sequences = self._sequence_generator.generate_words(sample_size)
+                evaluation = self._sampling_engine.evaluate(sequences, QueryDisagreement(target_model, model),
+                                                            stop_at_first=not self._compute_epsilon_star)
+            if evaluation.error_count > 0 and self._compute_epsilon_star:
+                self._calculate_epsilon_star_with(evaluation.error_count)
+            return evaluation.counterexample
     
     def _calculate_sample_size(self):
         numberOfCalls = self._equivalence_queries_count
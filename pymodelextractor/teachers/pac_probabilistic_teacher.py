@@ -4,9 +4,13 @@ from pythautomata.abstract.probabilistic_model import ProbabilisticModel
 from pythautomata.utilities.sequence_generator import SequenceGenerator
 from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
 from pymodelextractor.teachers.probabilistic_teacher import ProbabilisticTeacher
+from pymodelextractor.teachers.pac_sampling_engine import PACSamplingEngine, NextTokensDisagreement, \
+    sample_chunks, uniform_length_sampler
+from pymodelextractor.teachers.pac_sample_pool import PACSamplePool
+from pymodelextractor.teachers.sequential_pac_test import SequentialPACTest
 from pythautomata.abstract.finite_automaton import FiniteAutomataComparator
 from math import ceil, log, comb
-from typing import Union
+from typing import Callable, Union
 from pymodelextractor.utils.data_loader import DataLoader
 
 
@@ -14,7 +18,11 @@ class PACProbabilisticTeacher(ProbabilisticTeacher):
 
     def __init__(self, model: ProbabilisticModel, comparator: FiniteAutomataComparator, epsilon: float = 0.05,
                  delta: float = 0.01, sequence_generator: SequenceGenerator = None, max_seq_length: int = 128,
-                 compute_epsilon_star: bool = True, parallel_cache = False, max_query_elements = 1_000_000, batch_size = 10_000, cache_from_dataloader:DataLoader = None):
+                 compute_epsilon_star: bool = True, parallel_cache = False, max_query_elements = 1_000_000, batch_size = 10_000, cache_from_dataloader:DataLoader = None,
+                 sampling_engine: PACSamplingEngine = None, stream_sample: bool = False,
+                 reuse_sample: bool = False, adaptive: bool = False, length_sampler: Callable[[], int] = None):
+        if stream_sample and reuse_sample:
+            raise ValueError('stream_sample and reuse_sample cannot both be set, a reused sample is kept whole')
         super().__init__(model, parallel_cache, max_query_elements, batch_size, cache_from_dataloader)
         self._comparator = comparator
         self._epsilon = epsilon
@@ -22,10 +30,19 @@ class PACProbabilisticTeacher(ProbabilisticTeacher):
         self.sample_size = 0
         self.epsilon_star = 0
         self._compute_epsilon_star = compute_epsilon_star        
+        self._sampling_engine = PACSamplingEngine() if sampling_engine is None else sampling_engine
+        self._stream_sample = stream_sample
+        self._sample_pool = PACSamplePool() if reuse_sample else None
+        self._sequential_test = SequentialPACTest(epsilon, delta) if adaptive else None
+        self.samples_spent = 0
+        self.epsilon_bound = None
         if sequence_generator is None:
             self._sequence_generator = UniformLengthSequenceGenerator(self._target_model.alphabet, max_seq_length= max_seq_length)
+            if length_sampler is None:
+                length_sampler = uniform_length_sampler(max_seq_length)
         else:
             self._sequence_generator = sequence_generator
+        self._length_sampler = length_sampler
 
 
 
@@ -38,33 +55,66 @@ class PACProbabilisticTeacher(ProbabilisticTeacher):
     
     def equivalence_query(self, aut: WeightedAutomaton) -> tuple[bool, Union[Sequence,None]]:        
         self._equivalence_queries_count += 1
-        sample_size = self._calculate_sample_size()
-        errorCount = 0
-        counterexample = None      
         suffixes = []
         
         suffixes.append(self.terminal_symbol)
         #total_error = 0
         for symbol in self.alphabet.symbols:
             suffixes.append(Sequence((symbol,)))
-        
-        rand_words = self._sequence_generator.generate_words(sample_size)
-        rand_words.sort(key=len)
-        counterexample = None
-        for word in rand_words:  
-            obs1 = self._target_model.get_last_token_weights(word, suffixes)
-            obs2 = aut.get_last_token_weights(word, suffixes)
-            if not self._comparator.next_tokens_equivalent_output(obs1, obs2):
-                errorCount += 1
-                if counterexample is None:
-                    counterexample = word 
-                if not self._compute_epsilon_star:
-                    return False, counterexample               
+
+        if self._sequential_test is not None:
+            result = self._sequential_test.run(
+                self.equivalence_queries_count, self._sequence_generator,
+                NextTokensDisagreement(self._target_model, aut, self._comparator, suffixes), self._sampling_engine)
+            self.samples_spent += result.samples_spent
+            self.epsilon_bound = result.epsilon_bound
+            if result.error_count > 0 and self._compute_epsilon_star:
+                self.last_sample_size = result.samples_spent
+                self._calculate_epsilon_star_with(result.error_count)
+            return result.counterexample is None, result.counterexample
+
+        sample_size = self._calculate_sample_size()
+        if self._sample_pool is not None:
+            rand_words = self._sample_pool.grow_to(
+                sample_size, self._sequence_generator,
+                lambda sequences: [self._target_model.get_last_token_weights(sequence, suffixes)
+                                   for sequence in sequences])
+            evaluation = self._sampling_engine.evaluate(
+                rand_words, NextTokensDisagreement(self._target_model, aut, self._comparator, suffixes,
+                                                   self._sample_pool.answers),
+                stop_at_first=not self._compute_epsilon_star)
+        elif self._stream_sample:
+            disagreement = NextTokensDisagreement(self._target_model, aut, self._comparator, suffixes)
+            chunks, length_ordered = sample_chunks(self._sequence_generator, sample_size,
+                                                   self._sampling_engine.chunk_size, self._length_sampler)
+            evaluation = self._sampling_engine.evaluate_chunks(chunks, disagreement,
+                                                               stop_at_first=not self._compute_epsilon_star,
+                                                               length_ordered=length_ordered)
+        else:
+            rand_words = self._sequence_generator.generate_words(sample_size)
+            evaluation = self._sampling_engine.evaluate(rand_words, NextTokensDisagreement(
+                self._target_model, aut, self._comparator, suffixes),
+                                                        stop_at_first=not self._compute_epsilon_star)
+        counterexample = evaluation.counterexample
+        errorCount = evaluation.error_count
+        if counterexample is not None and not self._compute_epsilon_star:
+            return False, counterexample
         if errorCount > 0:
             self._calculate_epsilon_star_with(errorCount)
 
         return counterexample is None, counterexample
 
+    @property
+    def equivalence_query_info(self) -> dict:
+        if self._sequential_test is None:
+            return {}
+        return {'pac_samples_spent': self.samples_spent, 'pac_epsilon_bound': self.epsilon_bound}
+
+    def reset(self) -> None:
+        super().reset()
+        self.samples_spent = 0
+        self.epsilon_bound = None
+
     @property
     def alphabet(self):
         return self._target_model.alphabet
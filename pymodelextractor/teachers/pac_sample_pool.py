@@ -0,0 +1,60 @@
+from typing import Any, Callable
+
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.utilities.sequence_generator import SequenceGenerator
+
+
+class PACSamplePool:
+    """Sample words kept across the equivalence queries of a PAC teacher, together with the target's answers.
+
+    The i-th equivalence query needs a sample of m_i = ceil((ln(2) * (i + 1) - ln(delta)) / epsilon)
+    words. Instead of drawing m_i new words, the pool keeps the words of earlier queries and only draws
+    the m_i - m_(i-1) missing ones. The target is asked about each word once, and the hypothesis is
+    checked against the whole pool.
+
+    Guarantees kept by the reuse:
+        - Every pool word is an independent draw from the sequence generator's distribution, so each
+          query is still checked against m_i words with the same distribution as a fresh sample.
+        - The counterexample returned is still the shortest disagreeing word of the query's sample.
+        - epsilon* is computed over the same m_i words as without the pool.
+
+    Guarantee weakened by the reuse:
+        - Successive samples overlap, so a hypothesis is no longer independent of the words it is
+          checked against: the learner has seen the counterexamples earlier queries took from the pool.
+          The (1 - epsilon)^m_i bound behind delta assumes that independence, so with the pool it is an
+          estimate rather than a proof. Every hypothesis agrees with those counterexamples, so at most
+          i - 1 pool words can have been fitted by the learner. Teachers draw a fresh sample per query
+          unless a pool is requested, which keeps the strict guarantee.
+    """
+
+    def __init__(self):
+        self._sequences = []
+        self._answers = {}
+
+    def __len__(self) -> int:
+        return len(self._sequences)
+
+    @property
+    def sequences(self) -> list[Sequence]:
+        return self._sequences
+
+    @property
+    def answers(self) -> dict[Sequence, Any]:
+        return self._answers
+
+    def grow_to(self, sample_size: int, sequence_generator: SequenceGenerator,
+                answer_batch: Callable[[list[Sequence]], list]) -> list[Sequence]:
+        """Draws the words missing to reach `sample_size`, answers the new ones and returns the whole pool."""
+        missing = sample_size - len(self._sequences)
+        if missing > 0:
+            new_sequences = sequence_generator.generate_words(missing)
+            self._sequences.extend(new_sequences)
+            unanswered = list(dict.fromkeys(sequence for sequence in new_sequences
+                                            if sequence not in self._answers))
+            if len(unanswered) > 0:
+                self._answers.update(zip(unanswered, answer_batch(unanswered)))
+        return self._sequences
+
+    def clear(self):
+        self._sequences = []
+        self._answers = {}
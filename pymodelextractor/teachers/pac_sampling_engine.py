@@ -0,0 +1,251 @@
+import math
+import multiprocessing
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, Union
+
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.abstract.model import Model
+from pythautomata.abstract.boolean_model import BooleanModel
+from pythautomata.utilities.sequence_generator import SequenceGenerator
+
+_NOT_FOUND = 2 ** 31 - 1
+_CHECK_EVERY = 64
+
+_disagreement = None
+_first_found_chunk = None
+
+
+class SampleEvaluation:
+    def __init__(self, counterexample: Union[Sequence, None], error_count: int):
+        self.counterexample = counterexample
+        self.error_count = error_count
+
+
+class PACSamplingEngine:
+    """Evaluates the sample drawn by a PAC equivalence query.
+
+    The sample is checked in chunks, either serially (the default) or
+    concurrently on a process pool. The returned counterexample is always the
+    shortest disagreeing word, ties going to the word drawn first, which is what
+    a serial loop over the length-sorted sample returns. When stopping at the
+    first counterexample, work that cannot yield a shorter one is skipped;
+    otherwise every word is checked and the error count is exact.
+    """
+
+    def __init__(self, processes: int = 1, chunk_size: int = 1_000):
+        self._processes = processes
+        self._chunk_size = chunk_size
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    def evaluate(self, sequences: list[Sequence], disagreement: Callable[[Sequence], bool],
+                 stop_at_first: bool = False) -> SampleEvaluation:
+        sequences = sorted(sequences, key=len)
+        chunks = [sequences[i:i + self._chunk_size] for i in range(0, len(sequences), self._chunk_size)]
+        return self.evaluate_chunks(chunks, disagreement, stop_at_first)
+
+    def evaluate_chunks(self, chunks: Iterable[list[Sequence]], disagreement: Callable[[Sequence], bool],
+                        stop_at_first: bool = False, length_ordered: bool = True) -> SampleEvaluation:
+        """Evaluates a sample given as consecutive chunks, consuming them lazily.
+
+        With `length_ordered` no word is longer than any word in a later chunk and
+        each chunk is sorted, so the first counterexample found in chunk order is
+        final. Otherwise chunks are sorted on arrival and the shortest counterexample
+        is kept across all of them.
+        """
+        if self._processes <= 1:
+            return self._evaluate_serially(chunks, disagreement, stop_at_first, length_ordered)
+        return self._evaluate_in_pool(chunks, disagreement, stop_at_first, length_ordered)
+
+    def _evaluate_serially(self, chunks, disagreement, stop_at_first, length_ordered) -> SampleEvaluation:
+        error_count = 0
+        counterexample = None
+        for chunk in chunks:
+            if not length_ordered:
+                chunk = sorted(chunk, key=len)
+            for sequence in chunk:
+                if stop_at_first and counterexample is not None and len(sequence) >= len(counterexample):
+                    break
+                if disagreement(sequence):
+                    error_count += 1
+                    if counterexample is None or len(sequence) < len(counterexample):
+                        counterexample = sequence
+            if stop_at_first and length_ordered and counterexample is not None:
+                break
+        return SampleEvaluation(counterexample, error_count)
+
+    def _evaluate_in_pool(self, chunks, disagreement, stop_at_first, length_ordered) -> SampleEvaluation:
+        first_found_chunk = multiprocessing.Value('i', _NOT_FOUND)
+        found = {}
+        error_count = 0
+        chunks = enumerate(chunks)
+        exhausted = False
+        with ProcessPoolExecutor(self._processes, initializer=_initialize_worker,
+                                 initargs=(disagreement, first_found_chunk)) as executor:
+            pending = {}
+            while True:
+                # Only a bounded number of chunks is in flight, so a streamed sample is never fully materialized.
+                while not exhausted and len(pending) < 2 * self._processes and \
+                        not (stop_at_first and length_ordered and found):
+                    next_chunk = next(chunks, None)
+                    if next_chunk is None:
+                        exhausted = True
+                        break
+                    index, chunk = next_chunk
+                    if not length_ordered:
+                        chunk = sorted(chunk, key=len)
+                    shorter_than = _shortest(found, length_ordered) if stop_at_first and not length_ordered else None
+                    pending[executor.submit(_evaluate_chunk, index, chunk, stop_at_first, length_ordered,
+                                            shorter_than)] = index
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    if future.cancelled():
+                        continue
+                    index, errors, first = future.result()
+                    error_count += errors
+                    if first is not None:
+                        found[index] = first
+                if stop_at_first and length_ordered and found:
+                    # Chunks after the earliest counterexample cannot hold a shorter one.
+                    earliest = min(found)
+                    for future, index in list(pending.items()):
+                        if index > earliest and future.cancel():
+                            del pending[future]
+        if not found:
+            return SampleEvaluation(None, error_count)
+        return SampleEvaluation(found[_earliest(found, length_ordered)], error_count)
+
+
+def _earliest(found: dict, length_ordered: bool) -> int:
+    if length_ordered:
+        return min(found)
+    return min(found, key=lambda index: (len(found[index]), index))
+
+
+def _shortest(found: dict, length_ordered: bool):
+    return len(found[_earliest(found, length_ordered)]) if found else None
+
+
+def _initialize_worker(disagreement, first_found_chunk):
+    global _disagreement, _first_found_chunk
+    _disagreement = disagreement
+    _first_found_chunk = first_found_chunk
+
+
+def _evaluate_chunk(index: int, chunk: list[Sequence], stop_at_first: bool, length_ordered: bool = True,
+                    shorter_than: int = None):
+    errors = 0
+    first = None
+    for position, sequence in enumerate(chunk):
+        if stop_at_first and length_ordered and position % _CHECK_EVERY == 0 and _first_found_chunk.value < index:
+            return index, errors, None
+        if shorter_than is not None and len(sequence) >= shorter_than:
+            break
+        if _disagreement(sequence):
+            errors += 1
+            if first is None:
+                first = sequence
+            if stop_at_first:
+                if length_ordered:
+                    with _first_found_chunk.get_lock():
+                        if index < _first_found_chunk.value:
+                            _first_found_chunk.value = index
+                break
+    return index, errors, first
+
+
+def sample_chunks(sequence_generator: SequenceGenerator, sample_size: int, chunk_size: int,
+                  length_sampler: Callable[[], int] = None) -> tuple[Iterator[list[Sequence]], bool]:
+    """Streams a sample of `sample_size` words in chunks of at most `chunk_size` words.
+
+    For generators that draw a length and then a word of that length, `length_sampler`
+    draws lengths as the generator does (see `uniform_length_sampler` and
+    `uniform_word_length_sampler`). Lengths are then drawn first (keeping only their
+    histogram) and words generated length by length, so chunks come out length-ordered
+    with the same sample distribution. Without it, words are streamed in drawing order.
+    Returns the chunks and whether they are length-ordered.
+    """
+    if length_sampler is None:
+        return _chunks_in_drawing_order(sequence_generator, sample_size, chunk_size), False
+    return _chunks_in_length_order(sequence_generator, length_sampler, sample_size, chunk_size), True
+
+
+def uniform_length_sampler(max_seq_length: int, min_seq_length: int = 0) -> Callable[[], int]:
+    """Lengths as drawn by a `UniformLengthSequenceGenerator` with the same bounds."""
+    return lambda: random.randint(min_seq_length, max_seq_length)
+
+
+def uniform_word_length_sampler(alphabet_size: int, max_seq_length: int,
+                                min_seq_length: int = 0) -> Callable[[], int]:
+    """Lengths as drawn by a `UniformWordSequenceGenerator` with the same alphabet size and bounds."""
+    lengths = list(range(min_seq_length, max_seq_length))
+    total = math.pow(alphabet_size, max_seq_length + 1) - math.pow(alphabet_size, min_seq_length)
+    weights = [math.pow(alphabet_size, length) * (alphabet_size - 1) / total for length in lengths]
+    return lambda: random.choices(lengths, weights=weights, k=1)[0]
+
+
+def _chunks_in_length_order(sequence_generator, length_sampler, sample_size, chunk_size):
+    lengths = Counter(length_sampler() for _ in range(sample_size))
+    chunk = []
+    for length in sorted(lengths):
+        for _ in range(lengths[length]):
+            chunk.append(sequence_generator.generate_single_word(length))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _chunks_in_drawing_order(sequence_generator, sample_size, chunk_size):
+    for start in range(0, sample_size, chunk_size):
+        yield sequence_generator.generate_words(min(chunk_size, sample_size - start))
+
+
+class BooleanDisagreement:
+    def __init__(self, target: BooleanModel, model: BooleanModel, target_answers: dict = None):
+        self._target = target
+        self._model = model
+        self._target_answers = target_answers
+
+    def __call__(self, sequence: Sequence) -> bool:
+        if self._target_answers is not None:
+            return self._target_answers[sequence] != self._model.accepts(sequence)
+        return self._target.accepts(sequence) != self._model.accepts(sequence)
+
+
+class QueryDisagreement:
+    def __init__(self, target: Union[Model, BooleanModel], model: Union[Model, BooleanModel],
+                 target_answers: dict = None):
+        self._target = target
+        self._model = model
+        self._target_answers = target_answers
+
+    def __call__(self, sequence: Sequence) -> bool:
+        if self._target_answers is not None:
+            return self._target_answers[sequence] != self._model.process_query(sequence)
+        return self._target.process_query(sequence) != self._model.process_query(sequence)
+
+
+class NextTokensDisagreement:
+    def __init__(self, target, model, comparator, suffixes: list[Sequence], target_answers: dict = None):
+        self._target = target
+        self._model = model
+        self._comparator = comparator
+        self._suffixes = suffixes
+        self._target_answers = target_answers
+
+    def __call__(self, sequence: Sequence) -> bool:
+        if self._target_answers is not None:
+            obs1 = self._target_answers[sequence]
+        else:
+            obs1 = self._target.get_last_token_weights(sequence, self._suffixes)
+        obs2 = self._model.get_last_token_weights(sequence, self._suffixes)
+        return not self._comparator.next_tokens_equivalent_output(obs1, obs2)
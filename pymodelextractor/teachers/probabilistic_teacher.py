@@ -6,12 +6,16 @@ from pythautomata.base_types.alphabet import Alphabet
 from pythautomata.base_types.sequence import Sequence
 from pythautomata.automata.wheighted_automaton_definition.weighted_automaton import WeightedAutomaton
 from pymodelextractor.utils.data_loader import DataLoader
+from pymodelextractor.utils.shared_memory_probability_cache import SharedMemoryProbabilityCache
+from pymodelextractor.utils.array_queries import NextTokenWeightsBatch, last_token_weights_batch, \
+    supports_array_queries
 from pythautomata.abstract.probabilistic_model import ProbabilisticModel
 
 
 from collections import OrderedDict
-from multiprocessing import Process, Manager
+from multiprocessing import Process
 from typing import Union
+import numpy as np
 
 
 class ProbabilisticTeacher(ABC):
@@ -23,11 +27,12 @@ class ProbabilisticTeacher(ABC):
         self._parallel_cache = parallel_cache
         self._max_query_elements = max_query_elements   
         self._batch_size = batch_size
+        self._job = None
         if self._parallel_cache:
-            manager = Manager()
-            self._cache = manager.dict()
-            self._job = Process(target=self.fill_cache, args=(self._cache, model,self._max_query_elements, batch_size)) 
-            self._job.start() 
+            symbols = list(model.alphabet.symbols)
+            symbols.sort()
+            symbols = [model.terminal_symbol] + symbols
+            self._cache = SharedMemoryProbabilityCache(symbols, max_query_elements)
         if cache_from_dataloader is not None:
             if not self._parallel_cache:
                 self._cache = dict()
@@ -49,8 +54,10 @@ class ProbabilisticTeacher(ABC):
 
     def next_token_probabilities(self, sequence: Sequence) -> OrderedDict[Symbol, float]:
         if self._parallel_cache:            
-            if sequence in self._cache:
-                return self._cache[sequence]
+            self._start_cache_filler()
+            cached = self._cache.get(sequence)
+            if cached is not None:
+                return cached
         symbols = list(self.alphabet.symbols)
         symbols.sort()
         symbols = [self.terminal_symbol] + symbols
@@ -83,51 +90,89 @@ class ProbabilisticTeacher(ABC):
     def last_token_weight_queries_count(self):
         return self._last_token_weight_queries_count
 
+    @property
+    def equivalence_query_info(self) -> dict:
+        """Statistics about the equivalence queries answered so far, added by learners to `LearningResult.info`."""
+        return {}
+
+    @property
+    def query_cache_info(self) -> dict:
+        """Statistics of the caches answering queries, added by learners to `LearningResult.info`."""
+        if self._parallel_cache:
+            return {'teacher_cache': self._cache.statistics}
+        return {}
+
+    @property
+    def supports_batch_queries(self) -> bool:
+        """Whether `next_token_probabilities_batch` can be used, i.e. the target answers batches,
+        either as lists of sequences or through the array protocol (see `supports_array_queries`)."""
+        return hasattr(self._target_model, "get_last_token_weights_batch") or \
+            supports_array_queries(self._target_model)
+
     def next_token_probabilities_batch(self, sequences):
-        assert hasattr(self._target_model, "get_last_token_weights_batch")
+        assert self.supports_batch_queries
         symbols = list(self.alphabet.symbols)
         symbols.sort()
         symbols = [self.terminal_symbol] + symbols
 
         if self._parallel_cache:
+            self._start_cache_filler()
             queries = set()
             results_already_in_cache = dict()
             for sequence in sequences:
-                if sequence not in self._cache:
+                cached = self._cache.get(sequence)
+                if cached is None:
                     queries.add(sequence)
                 else:
-                    results_already_in_cache[sequence] = self._cache[sequence]
-            results = self._target_model.get_last_token_weights_batch(queries, symbols)   
+                    results_already_in_cache[sequence] = cached
+            queries = list(queries)
+            self._last_token_weight_queries_count += len(queries) * len(symbols)
+            results = last_token_weights_batch(self._target_model, queries, symbols)
+            if isinstance(results, np.ndarray):
+                results = results.tolist()
             results_od = [OrderedDict(zip(symbols, x)) for x in results]
             final_results  = dict(zip(queries, results_od))
             self._cache.update(final_results)
             final_results.update(results_already_in_cache)
         else:        
-            results = self._target_model.get_last_token_weights_batch(sequences, symbols)
+            sequences = list(sequences)
+            self._last_token_weight_queries_count += len(sequences) * len(symbols)
+            results = last_token_weights_batch(self._target_model, sequences, symbols)
+            if isinstance(results, np.ndarray):
+                # Dicts are only built for the sequences looked up
+                return NextTokenWeightsBatch(sequences, symbols, results)
             results_od = [OrderedDict(zip(symbols, x)) for x in results]
             final_results = zip(sequences, results_od)
         return final_results
     
+    def _start_cache_filler(self):
+        # Started on first use since subclasses set up their sequence generator after this constructor
+        if self._job is None:
+            self._job = Process(target=self.fill_cache, args=(self._cache, self._target_model,
+                                                              self._max_query_elements, self._batch_size),
+                                daemon=True)
+            self._job.start()
+
     def fill_cache(self, cache, model, max_query_elements, batch_size):
         total_elements = 0
         generator = self._sequence_generator.generate_all_words()
-        symbols = list(self.alphabet.symbols)
-        symbols.sort()
-        symbols = [self.terminal_symbol] + symbols
-        use_batch = hasattr(self._target_model, "get_last_token_weights_batch")
+        symbols = cache.symbols
+        use_batch = hasattr(model, "get_last_token_weights_batch")
         while total_elements<max_query_elements:
             queries = []
             if use_batch: 
-                for _ in range(batch_size):
+                for _ in range(min(batch_size, max_query_elements - total_elements)):
                     queries.append(next(generator))                                 
                 results = model.get_last_token_weights_batch(queries, symbols)     
             else:
                 queries = [next(generator)]
-                results = [self.last_token_weights(queries[0], symbols)]                
-            results_od = [OrderedDict(zip(symbols, x)) for x in results]
-            final_results  = dict(zip(queries, results_od))            
-            cache.update(final_results)
+                results = [model.get_last_token_weights(queries[0], symbols)]                
+            cache.update(zip(queries, results))
+            total_elements += len(queries)
 
     def __del__(self):
         if hasattr(self, "_parallel_cache") and self._parallel_cache:
-            self._job.terminate()
+            if self._job is not None:
+                self._job.terminate()
+                self._job.join()
+            self._cache.close()
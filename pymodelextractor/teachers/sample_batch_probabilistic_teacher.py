@@ -6,6 +6,7 @@ from pythautomata.utilities.sequence_generator import SequenceGenerator
 from pythautomata.abstract.finite_automaton import FiniteAutomataComparator
 from pymodelextractor.teachers.sample_probabilistic_teacher import SampleProbabilisticTeacher
 from pymodelextractor.utils.data_loader import DataLoader
+from pymodelextractor.utils.array_queries import last_token_weights_batch, supports_array_queries
 from typing import Union, Sized
 
 
@@ -13,7 +14,7 @@ class SampleBatchProbabilisticTeacher(SampleProbabilisticTeacher):
     def __init__(self, model: ProbabilisticModel, comparator: FiniteAutomataComparator, sample_size: float = None,
                  sequence_generator: SequenceGenerator = None, max_seq_length: int = 128, full_prefix_set = False, parallel_cache = False, max_query_elements = 1_000_000, batch_size = 10_000, cache_from_dataloader:DataLoader = None):
         super().__init__(model, comparator, sample_size, sequence_generator, max_seq_length, full_prefix_set, parallel_cache, max_query_elements, batch_size, cache_from_dataloader)
-        assert (hasattr(model, 'get_last_token_weights_batch'))
+        assert (hasattr(model, 'get_last_token_weights_batch') or supports_array_queries(model))
         if self._full_prefix_set:
             self._rand_words_generator = self._sequence_generator.generate_all_words()
             self.__rand_words = []
@@ -21,7 +22,7 @@ class SampleBatchProbabilisticTeacher(SampleProbabilisticTeacher):
     
     def last_token_weights_batch(self, sequences: list[Sequence], required_suffixes: list[Sequence]):
         self._last_token_weight_queries_count += len(sequences)* len(required_suffixes)          
-        return self._target_model.get_last_token_weights_batch(sequences, required_suffixes)
+        return last_token_weights_batch(self._target_model, sequences, required_suffixes)
  
 
     def generate_batch_words(self):
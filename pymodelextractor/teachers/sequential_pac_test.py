@@ -0,0 +1,127 @@
+from math import ceil, log
+from typing import Callable, Union
+
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.utilities.sequence_generator import SequenceGenerator
+from pymodelextractor.teachers.pac_sampling_engine import PACSamplingEngine
+
+_BOUND_ITERATIONS = 60
+
+
+class SequentialTestResult:
+    def __init__(self, counterexample: Union[Sequence, None], samples_spent: int, error_count: int,
+                 epsilon_bound: Union[float, None]):
+        self.counterexample = counterexample
+        self.samples_spent = samples_spent
+        self.error_count = error_count
+        self.epsilon_bound = epsilon_bound
+
+
+class SequentialPACTest:
+    """Wald's sequential probability ratio test for PAC equivalence queries, truncated at the fixed sample.
+
+    The i-th equivalence query tests H0: error = epsilon against H1: error = `alternative_epsilon`
+    (epsilon / 10 by default), accepting a hypothesis with error at least epsilon with probability
+    at most delta_i = delta / 2^(i + 1), the split of delta behind the fixed sample size
+    ceil((ln(2) * (i + 1) - ln(delta)) / epsilon), and rejecting one with error at most the
+    alternative with probability at most `beta`. Each word adds to the log likelihood ratio of H1
+    against H0 ln((1 - alternative) / (1 - epsilon)) if it agrees and ln(alternative / epsilon) if
+    it disagrees; the hypothesis is accepted once the ratio reaches ln((1 - beta) / delta_i) and
+    rejected, with the shortest disagreeing word drawn as counterexample, once it falls to
+    ln(beta / (1 - delta_i)).
+
+    The test never draws more words than the fixed sample. Reaching it undecided, the hypothesis is
+    accepted only if no word disagreed, which is the fixed sample guarantee, and rejected otherwise,
+    so the adaptive mode costs at most what the fixed one does and saves words on hypotheses that
+    are clearly wrong. Words are drawn in chunks of growing size, never larger than the number of
+    agreeing words still needed to accept, so acceptance is decided as soon as possible. The reported
+    epsilon bound is the smallest error rate ruled out with confidence delta_i by the words drawn,
+    which is at most epsilon.
+    """
+
+    def __init__(self, epsilon: float, delta: float, beta: float = None, alternative_epsilon: float = None,
+                 initial_chunk_size: int = 32):
+        assert 0 < epsilon < 1 and 0 < delta < 1
+        assert beta is None or 0 < beta < 1
+        assert alternative_epsilon is None or 0 < alternative_epsilon < epsilon
+        self._epsilon = epsilon
+        self._delta = delta
+        self._beta = delta if beta is None else beta
+        self._alternative_epsilon = epsilon / 10 if alternative_epsilon is None else alternative_epsilon
+        self._initial_chunk_size = initial_chunk_size
+
+    @property
+    def alternative_epsilon(self) -> float:
+        return self._alternative_epsilon
+
+    def confidence_for(self, equivalence_query_index: int) -> float:
+        return self._delta / 2 ** (equivalence_query_index + 1)
+
+    def fixed_sample_size(self, equivalence_query_index: int) -> int:
+        return ceil((log(2) * (equivalence_query_index + 1) - log(self._delta)) / self._epsilon)
+
+    def acceptance_threshold(self, equivalence_query_index: int) -> float:
+        return log((1 - self._beta) / self.confidence_for(equivalence_query_index))
+
+    def rejection_threshold(self, equivalence_query_index: int) -> float:
+        return log(self._beta / (1 - self.confidence_for(equivalence_query_index)))
+
+    def log_likelihood_ratio(self, samples: int, error_count: int, epsilon: float = None) -> float:
+        """Log likelihood ratio of the alternative error against error `epsilon` (by default the
+        tested one) after `samples` words with `error_count` disagreements."""
+        epsilon = self._epsilon if epsilon is None else epsilon
+        alternative = self._alternative_epsilon
+        return (samples - error_count) * log((1 - alternative) / (1 - epsilon)) + \
+            error_count * log(alternative / epsilon)
+
+    def acceptance_sample_size(self, equivalence_query_index: int, samples: int = 0, error_count: int = 0) -> int:
+        """Agreeing words still needed to accept after `samples` words with `error_count` disagreements,
+        counting acceptance at the fixed sample, which only takes place without disagreements."""
+        missing = self.acceptance_threshold(equivalence_query_index) - self.log_likelihood_ratio(samples, error_count)
+        size = max(1, ceil(missing / self.log_likelihood_ratio(1, 0)))
+        if error_count == 0:
+            size = min(size, self.fixed_sample_size(equivalence_query_index) - samples)
+        return size
+
+    def epsilon_bound(self, equivalence_query_index: int, samples: int, error_count: int = 0) -> Union[float, None]:
+        if error_count == 0:
+            return 1 - self.confidence_for(equivalence_query_index) ** (1 / samples)
+        threshold = self.acceptance_threshold(equivalence_query_index)
+        if self.log_likelihood_ratio(samples, error_count) < threshold:
+            return None
+        # Over [alternative, epsilon] the ratio is convex and starts at 0, so it crosses the threshold once
+        low, high = self._alternative_epsilon, self._epsilon
+        for _ in range(_BOUND_ITERATIONS):
+            middle = (low + high) / 2
+            if self.log_likelihood_ratio(samples, error_count, middle) >= threshold:
+                high = middle
+            else:
+                low = middle
+        return high
+
+    def run(self, equivalence_query_index: int, sequence_generator: SequenceGenerator,
+            disagreement: Callable[[Sequence], bool], sampling_engine: PACSamplingEngine) -> SequentialTestResult:
+        acceptance = self.acceptance_threshold(equivalence_query_index)
+        rejection = self.rejection_threshold(equivalence_query_index)
+        fixed_size = self.fixed_sample_size(equivalence_query_index)
+        chunk_size = self._initial_chunk_size
+        samples_spent = 0
+        error_count = 0
+        counterexample = None
+        while True:
+            ratio = self.log_likelihood_ratio(samples_spent, error_count)
+            if ratio >= acceptance or (samples_spent >= fixed_size and error_count == 0):
+                return SequentialTestResult(None, samples_spent, error_count,
+                                            self.epsilon_bound(equivalence_query_index, samples_spent, error_count))
+            if ratio <= rejection or samples_spent >= fixed_size:
+                return SequentialTestResult(counterexample, samples_spent, error_count, None)
+            size = min(chunk_size, fixed_size - samples_spent,
+                       self.acceptance_sample_size(equivalence_query_index, samples_spent, error_count))
+            chunk = sequence_generator.generate_words(size)
+            samples_spent += len(chunk)
+            evaluation = sampling_engine.evaluate(chunk, disagreement)
+            error_count += evaluation.error_count
+            if evaluation.counterexample is not None and \
+                    (counterexample is None or len(evaluation.counterexample) < len(counterexample)):
+                counterexample = evaluation.counterexample
+            chunk_size = min(2 * chunk_size, sampling_engine.chunk_size)
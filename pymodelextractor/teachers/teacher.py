@@ -30,6 +30,24 @@ class Teacher(ABC):
     def membership_query(self, sequence: Sequence) -> bool:
         raise NotImplementedError
 
+    def membership_queries_batch(self, sequences: list[Sequence]) -> list:
+        """Answers several membership queries at once, in the order they were given.
+
+        Teachers whose target can evaluate many sequences in a single call should
+        override this; by default queries are asked one at a time.
+        """
+        return [self.membership_query(sequence) for sequence in sequences]
+
+    @property
+    def equivalence_query_info(self) -> dict:
+        """Statistics about the equivalence queries answered so far, added by learners to `LearningResult.info`."""
+        return {}
+
+    @property
+    def query_cache_info(self) -> dict:
+        """Statistics of the caches answering queries, added by learners to `LearningResult.info`."""
+        return {}
+
     @abstractmethod
     def equivalence_query(self, automaton: FiniteAutomaton) -> Tuple[bool, Sequence]:
         """Checks whether the models are equivalent or not
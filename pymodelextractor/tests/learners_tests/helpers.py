@@ -0,0 +1,25 @@
+from pymodelextractor.teachers.automaton_teacher import DeterministicFiniteAutomatonTeacher
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
+
+
+class BatchCountingTeacher(DeterministicFiniteAutomatonTeacher):
+    """Automaton teacher counting the membership query batches it is asked."""
+
+    def __init__(self, automaton, comparison_strategy):
+        super().__init__(automaton, comparison_strategy)
+        self.batches = 0
+
+    def membership_queries_batch(self, sequences):
+        self.batches += 1
+        return super().membership_queries_batch(sequences)
+
+
+def words_up_to(alphabet: Alphabet, length: int) -> list[Sequence]:
+    """Every word over `alphabet` of at most `length` symbols, shortest first and sorted within each length."""
+    words = [Sequence()]
+    frontier = [Sequence()]
+    for _ in range(length):
+        frontier = [word + symbol for word in frontier for symbol in sorted(alphabet.symbols)]
+        words.extend(frontier)
+    return words
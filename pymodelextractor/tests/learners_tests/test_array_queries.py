@@ -0,0 +1,110 @@
+import random
+import unittest
+
+import numpy as np
+
+from pymodelextractor.learners.observation_tree_learners.pdfa_quantization_n_ary_tree_learner import \
+    PDFAQuantizationNAryTreeLearner
+from pymodelextractor.teachers.pac_batch_probabilistic_teacher import PACBatchProbabilisticTeacher
+from pymodelextractor.utils.array_queries import NextTokenWeightsBatch, last_token_weights_batch, \
+    supports_array_queries
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.model_comparators.wfa_partition_comparison_strategy import WFAPartitionComparator
+from pythautomata.utilities.probability_partitioner import QuantizationProbabilityPartitioner
+
+
+class _ArrayTarget:
+    """Target answering batches only through the array protocol, as a neural model would."""
+
+    def __init__(self, model):
+        self._model = model
+        self.array_calls = []
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def get_last_token_weights_batch(self, sequences, required_suffixes):
+        raise AssertionError('Batches should be asked as arrays')
+
+    def get_last_token_weights_array(self, queries, lengths, symbols):
+        self.array_calls.append((queries.shape, len(symbols)))
+        sequences = [Sequence(tuple(symbols[index] for index in row[:length])) for row, length in zip(queries, lengths)]
+        return np.array([self._model.get_last_token_weights(sequence, symbols) for sequence in sequences])
+
+
+class _ArrayOnlyTarget(_ArrayTarget):
+    """Target with no list batches at all."""
+
+    def __getattribute__(self, name):
+        if name == 'get_last_token_weights_batch':
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
+    def __getattr__(self, name):
+        if name == 'get_last_token_weights_batch':
+            raise AttributeError(name)
+        return super().__getattr__(name)
+
+
+class TestArrayQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.model = WeightedTomitasGrammars.get_automaton_3()
+        self.symbols = [self.model.terminal_symbol] + sorted(self.model.alphabet.symbols)
+        self.sequences = [Sequence()] + [Sequence((symbol,)) for symbol in sorted(self.model.alphabet.symbols)] + \
+            [Sequence(tuple(sorted(self.model.alphabet.symbols)))]
+
+    def test_array_answers_match_batch_answers(self):
+        target = _ArrayTarget(self.model)
+        self.assertTrue(supports_array_queries(target))
+        self.assertFalse(supports_array_queries(self.model))
+        suffixes = [self.model.terminal_symbol] + [Sequence((symbol,)) for symbol in self.symbols[1:]]
+        weights = last_token_weights_batch(target, self.sequences, suffixes)
+        self.assertIsInstance(weights, np.ndarray)
+        self.assertEqual(target.array_calls, [((len(self.sequences), 2), len(self.symbols))])
+        np.testing.assert_array_equal(weights, self.model.get_last_token_weights_batch(self.sequences, suffixes))
+        # Longer suffixes are not single symbols, so they are asked as a list batch.
+        self.assertEqual(last_token_weights_batch(self.model, self.sequences, [self.sequences[-1]]),
+                         self.model.get_last_token_weights_batch(self.sequences, [self.sequences[-1]]))
+
+    def test_array_only_targets_answer_any_suffix(self):
+        target = _ArrayOnlyTarget(self.model)
+        self.assertFalse(hasattr(target, 'get_last_token_weights_batch'))
+        symbols = sorted(self.model.alphabet.symbols)
+        suffixes = [self.model.terminal_symbol, self.sequences[-1], Sequence((symbols[1], symbols[1]))]
+        for sequences in (self.sequences, [Sequence((symbols[0],))]):
+            # Sequences using symbols missing from the suffixes need the general path too.
+            weights = last_token_weights_batch(target, sequences, suffixes)
+            np.testing.assert_allclose(weights, self.model.get_last_token_weights_batch(sequences, suffixes))
+        terminal = [self.model.terminal_symbol]
+        np.testing.assert_allclose(last_token_weights_batch(target, self.sequences, terminal),
+                                   self.model.get_last_token_weights_batch(self.sequences, terminal))
+
+    def test_dict_views_are_built_when_looked_up(self):
+        weights = np.array(self.model.get_last_token_weights_batch(self.sequences, self.symbols))
+        batch = NextTokenWeightsBatch(self.sequences, self.symbols, weights)
+        self.assertEqual(batch._views, {})
+        probabilities = batch[self.sequences[1]]
+        self.assertEqual(list(probabilities), self.symbols)
+        self.assertEqual(list(probabilities.values()), weights[1].tolist())
+        self.assertEqual(list(batch._views), [1])
+        self.assertIs(batch[self.sequences[1]], probabilities)
+        self.assertEqual(dict(batch), {sequence: batch.view(row) for row, sequence in enumerate(self.sequences)})
+        self.assertEqual(len(batch), len(self.sequences))
+
+    def test_learner_asks_array_batches(self):
+        partitioner = QuantizationProbabilityPartitioner(10)
+        comparator = WFAPartitionComparator(partitioner)
+        model = WeightedTomitasGrammars.get_automaton_7()
+        array_target = _ArrayTarget(model)
+        results = []
+        for target in (model, array_target):
+            random.seed(11)
+            teacher = PACBatchProbabilisticTeacher(target, 0.05, 0.01, comparator=comparator, max_seq_length=20)
+            learner = PDFAQuantizationNAryTreeLearner(partitioner, pre_cache_queries_for_building_hipothesis=True)
+            results.append(learner.learn(teacher))
+        self.assertTrue(comparator.are_equivalent(results[1].model, model))
+        self.assertEqual(results[1].info['last_token_weight_queries_count'],
+                         results[0].info['last_token_weight_queries_count'])
+        self.assertGreater(len(array_target.array_calls), 0)
@@ -0,0 +1,87 @@
+import unittest
+
+from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
+from pymodelextractor.learners.observation_tree_learners import observation_pack_learner
+from pymodelextractor.learners.observation_tree_learners.kearns_vazirani_learner import KearnsVaziraniLearner
+from pymodelextractor.learners.observation_tree_learners.pdfa_quantization_n_ary_tree_learner import \
+    PDFAQuantizationNAryTreeLearner
+from pymodelextractor.teachers.pdfa_teacher import PDFATeacher
+from pymodelextractor.tests.learners_tests.helpers import BatchCountingTeacher, words_up_to
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import \
+    HopcroftKarpComparisonStrategy as ComparisonStrategy
+from pythautomata.model_comparators.wfa_partition_comparison_strategy import WFAPartitionComparator
+from pythautomata.utilities.probability_partitioner import QuantizationProbabilityPartitioner
+
+
+class TestBatchedSift(unittest.TestCase):
+
+    def test_kearns_vazirani_sift_batch_matches_sift(self):
+        automaton = TomitasGrammars.get_automaton_4()
+        words = words_up_to(automaton.alphabet, 6)
+        for cache_in_tree in (False, True):
+            teacher = BatchCountingTeacher(automaton, ComparisonStrategy())
+            tree = KearnsVaziraniLearner().learn(teacher, cache_in_tree).info['observation_tree']
+            tree._mq_cache.clear()
+            tree._sift_cache.clear()
+
+            teacher.reset_statistics()
+            teacher.batches = 0
+            sifted = tree.sift_batch(words)
+            queries, batches = teacher.membership_queries_count, teacher.batches
+            self.assertLessEqual(batches, max(leaf.depth for leaf in tree.leaves.values()))
+
+            tree._mq_cache.clear()
+            tree._sift_cache.clear()
+            teacher.reset_statistics()
+            self.assertEqual(sifted, [tree.sift(word) for word in words])
+            self.assertEqual(teacher.membership_queries_count, queries)
+
+    def test_observation_pack_sift_batch_adds_leaves_like_sift(self):
+        automaton = TomitasGrammars.get_automaton_5()
+        words = words_up_to(automaton.alphabet, 5)
+
+        def new_tree():
+            teacher = BatchCountingTeacher(automaton, ComparisonStrategy())
+            root = observation_pack_learner.ClassificationNode(epsilon)
+            root.right = observation_pack_learner.ClassificationNode(epsilon, parent=root)
+            return observation_pack_learner.ClassificationTree(root, teacher), teacher
+
+        tree, teacher = new_tree()
+        expected = [(node.string, new_state_discovered, is_final)
+                    for node, new_state_discovered, is_final in (tree.sift(word) for word in words)]
+        tree, teacher = new_tree()
+        sifted = [(node.string, new_state_discovered, is_final)
+                  for node, new_state_discovered, is_final in tree.sift_batch(words)]
+        self.assertEqual(sifted, expected)
+        self.assertEqual(teacher.batches, 1)
+        self.assertEqual(teacher.membership_queries_count, len(words))
+
+    def test_learners_learn_with_fewer_round_trips(self):
+        automaton = TomitasGrammars.get_automaton_6()
+        for learner in (KearnsVaziraniLearner(), observation_pack_learner.ObservationPackLearner()):
+            teacher = BatchCountingTeacher(automaton, ComparisonStrategy())
+            result = learner.learn(teacher)
+            self.assertTrue(ComparisonStrategy().are_equivalent(result.model, automaton))
+            self.assertLess(teacher.batches, teacher.membership_queries_count)
+
+    def test_quantization_tree_prefetch_fills_the_cache(self):
+        partitioner = QuantizationProbabilityPartitioner(10)
+        model = WeightedTomitasGrammars.get_automaton_7()
+        teacher = PDFATeacher(model, WFAPartitionComparator(partitioner))
+        learner = PDFAQuantizationNAryTreeLearner(partitioner)
+        self.assertEqual(learner.learn(teacher).model, model)
+
+        tree = learner._tree
+        tree._next_token_probabilities_cache.clear()
+        tree._sift_cache.clear()
+        words = words_up_to(model.alphabet, 4)
+        teacher.reset()
+        tree.prefetch_sift_queries(words)
+        queries = teacher.last_token_weight_queries_count
+        self.assertGreater(queries, 0)
+
+        sifted = [tree.sift(word, update=False)[0] for word in words]
+        self.assertEqual(teacher.last_token_weight_queries_count, queries)
+        self.assertNotIn(tree.unknown_leaf, sifted)
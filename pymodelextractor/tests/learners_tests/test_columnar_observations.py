@@ -0,0 +1,109 @@
+import random
+import unittest
+
+from pymodelextractor.learners.observation_table_learners.columnar_observations import ColumnarObservations
+from pymodelextractor.learners.observation_table_learners.general_lstar_learner import GeneralLStarLearner
+from pymodelextractor.learners.observation_table_learners.lstar_learner import LStarLearner
+from pymodelextractor.learners.observation_table_learners.lstarcol_learner import LStarColLearner
+from pymodelextractor.learners.observation_table_learners.mm_lstar_learner import MMLStarLearner
+from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
+from pymodelextractor.learners.observation_table_learners.row_signature_index import RowSignatureIndex
+from pymodelextractor.learners.observation_table_learners.translators.mm_observation_table_translator import \
+    MMObservationTableTranslator
+from pymodelextractor.teachers.automaton_teacher import DeterministicFiniteAutomatonTeacher as AutomatonTeacher
+from pymodelextractor.teachers.general_teacher import GeneralTeacher
+from pymodelextractor.teachers.moore_machines_teacher import MooreMachineTeacher
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import \
+    HopcroftKarpComparisonStrategy as ComparisonStrategy
+from pythautomata.model_comparators.moore_machine_comparison_strategy import MooreMachineComparisonStrategy
+from pythautomata.utilities.automata_converter import AutomataConverter
+
+
+def _sequence(word):
+    return Sequence([SymbolStr(symbol) for symbol in word])
+
+
+class TestColumnarObservations(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(11)
+
+    def test_rows_behave_like_lists(self):
+        for boolean, values in ((True, [True, False]), (False, [SymbolStr('a'), SymbolStr('b'), None])):
+            store = ColumnarObservations(boolean=boolean, initial_capacity=8)
+            rows = {}
+            for i in range(100):
+                sequence = _sequence(format(i, 'b'))
+                rows[sequence] = [random.choice(values) for _ in range(random.randint(0, 3))]
+                store[sequence] = rows[sequence]
+            for _ in range(5):
+                for sequence in rows:
+                    value = random.choice(values)
+                    rows[sequence].append(value)
+                    store[sequence].append(value)
+            self.assertEqual(len(store), len(rows))
+            for sequence, row in rows.items():
+                self.assertEqual(store[sequence], row)
+                self.assertEqual(tuple(store[sequence]), tuple(row))
+                self.assertEqual(store[sequence][-1], row[-1])
+                self.assertEqual(store[sequence][1:3], row[1:3])
+            for sequence1 in list(rows)[:20]:
+                for sequence2 in rows:
+                    self.assertEqual(store[sequence1] == store[sequence2], rows[sequence1] == rows[sequence2])
+                    self.assertEqual(store[sequence1].digest == store[sequence2].digest,
+                                     rows[sequence1] == rows[sequence2])
+
+    def test_boolean_columns_are_bit_packed(self):
+        store = ColumnarObservations(boolean=True, initial_capacity=1024)
+        for i in range(1000):
+            store[_sequence(format(i, 'b'))] = [i % 2 == 0, i % 3 == 0, i % 5 == 0]
+        self.assertEqual(store.nbytes, 3 * 1024 // 8)
+        self.assertEqual(store[_sequence(format(30, 'b'))], [True, True, True])
+        self.assertEqual(store.column(1)[_sequence(format(4, 'b'))], False)
+        with self.assertRaises(ValueError):
+            store[epsilon] = [SymbolStr('a')]
+
+    def test_digest_collisions_do_not_merge_rows(self):
+        for boolean, row1, row2 in ((True, [True, False], [False, True]),
+                                    (False, [SymbolStr('a'), SymbolStr('b')], [SymbolStr('b'), SymbolStr('a')])):
+            store = ColumnarObservations(boolean=boolean)
+            sequence1, sequence2 = _sequence('0'), _sequence('1')
+            store[sequence1] = row1
+            store[sequence2] = row2
+            # Force the second row to share the digest of the first one.
+            store._hashes[store._row_ids[sequence2]] = store._hashes[store._row_ids[sequence1]]
+            self.assertEqual(store[sequence1].digest, store[sequence2].digest)
+            self.assertNotEqual(store[sequence1], store[sequence2])
+            index = RowSignatureIndex()
+            index.add(sequence1, store[sequence1])
+            index.add(sequence2, store[sequence2])
+            self.assertEqual(list(index.rows_sharing_signature()), [])
+            self.assertIn(store[sequence2], index)
+            self.assertEqual(index.rows_with_signature(store[sequence2].key), [sequence2])
+
+    def test_codes_widen_with_distinct_values(self):
+        store = ColumnarObservations(boolean=False)
+        for i in range(300):
+            store[_sequence(format(i, 'b'))] = [i, -i]
+        for i in range(300):
+            self.assertEqual(store[_sequence(format(i, 'b'))], [i, -i])
+
+    def test_compact_learners_learn_same_models(self):
+        for automaton in TomitasGrammars.get_all_automata():
+            for learner_class in (LStarLearner, LStarColLearner):
+                compact = learner_class(compact_observations=True).learn(
+                    AutomatonTeacher(automaton, ComparisonStrategy()))
+                default = learner_class().learn(AutomatonTeacher(automaton, ComparisonStrategy()))
+                assert ComparisonStrategy().are_equivalent(compact.model, automaton)
+                self.assertEqual(len(compact.model.states), len(default.model.states))
+                self.assertIsInstance(compact.info['observation_table'].observations, ColumnarObservations)
+
+            moore = AutomataConverter.convert_dfa_to_moore_machine(automaton)
+            result = MMLStarLearner(compact_observations=True).learn(MooreMachineTeacher(moore))
+            assert MooreMachineComparisonStrategy().are_equivalent(result.model, moore)
+            result = GeneralLStarLearner(MMObservationTableTranslator(), compact_observations=True).learn(
+                GeneralTeacher(moore, MooreMachineComparisonStrategy()))
+            assert MooreMachineComparisonStrategy().are_equivalent(result.model, moore)
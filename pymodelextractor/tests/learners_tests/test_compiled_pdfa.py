@@ -0,0 +1,76 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from pymodelextractor.utils.compiled_pdfa import CompiledPDFA
+from pymodelextractor.utils.batch_comparison import next_tokens_equivalent_output_batch
+from pymodelextractor.teachers.pac_batch_probabilistic_teacher import PACBatchProbabilisticTeacher
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pythautomata.model_comparators.wfa_quantization_comparison_strategy import WFAQuantizationComparator
+from pythautomata.model_comparators.wfa_partition_comparison_strategy import WFAPartitionComparator
+from pythautomata.utilities import nicaud_dfa_generator, pdfa_generator
+from pythautomata.utilities.probability_partitioner import QuantizationProbabilityPartitioner, \
+    QuantizationProbabilityPartitionerPlus, TopKProbabilityPartitioner
+from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
+
+binaryAlphabet = Alphabet(frozenset((SymbolStr('0'), SymbolStr('1'))))
+
+
+class TestCompiledPDFA(unittest.TestCase):
+
+    def setUp(self):
+        self.pdfas = [WeightedTomitasGrammars.get_automaton_3(), WeightedTomitasGrammars.get_automaton_7()]
+        for seed in range(3):
+            dfa = nicaud_dfa_generator.generate_dfa(alphabet=binaryAlphabet, nominal_size=15, seed=seed)
+            self.pdfas.append(pdfa_generator.pdfa_from_dfa(dfa))
+        self.sequences = UniformLengthSequenceGenerator(binaryAlphabet, 15, 5).generate_words(500)
+
+    def _suffixes_for(self, pdfa):
+        return [pdfa.terminal_symbol] + [Sequence((symbol,)) for symbol in sorted(pdfa.alphabet.symbols)]
+
+    def test_weights_match_automaton(self):
+        for pdfa in self.pdfas:
+            suffixes = self._suffixes_for(pdfa)
+            compiled = CompiledPDFA(pdfa, suffixes)
+            self.assertTrue(compiled.is_compiled)
+            expected = [pdfa.get_last_token_weights(sequence, suffixes) for sequence in self.sequences]
+            np.testing.assert_array_equal(compiled.last_token_weights_batch(self.sequences), np.array(expected))
+
+    def test_batch_comparison_matches_comparators(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            comparators = [(WFAToleranceComparator(0.05), None), (WFAQuantizationComparator(7), None)]
+        for partitioner in (QuantizationProbabilityPartitioner(10), QuantizationProbabilityPartitionerPlus(5),
+                            TopKProbabilityPartitioner(1)):
+            comparators += [(WFAPartitionComparator(partitioner), partitioner),
+                            (WFAPartitionComparator(partitioner), None)]
+        target, hypothesis = self.pdfas[2], self.pdfas[3]
+        suffixes = self._suffixes_for(target)
+        observations1 = np.array([target.get_last_token_weights(sequence, suffixes) for sequence in self.sequences])
+        observations2 = np.array([hypothesis.get_last_token_weights(sequence, suffixes) for sequence in self.sequences])
+        for comparator, partitioner in comparators:
+            expected = [bool(comparator.next_tokens_equivalent_output(list(obs1), list(obs2)))
+                        for obs1, obs2 in zip(observations1, observations2)]
+            mask = next_tokens_equivalent_output_batch(comparator, observations1, observations2, partitioner)
+            self.assertEqual(mask.tolist(), expected)
+
+    def test_equivalence_query_finds_first_counterexample(self):
+        target, hypothesis = self.pdfas[2], self.pdfas[3]
+        partitioner = QuantizationProbabilityPartitioner(10)
+        comparator = WFAPartitionComparator(partitioner)
+        teacher = PACBatchProbabilisticTeacher(target, 0.05, 0.01, comparator, max_seq_length=15,
+                                               compute_epsilon_star=False, partitioner=partitioner)
+        suffixes = self._suffixes_for(target)
+        teacher._equivalence_queries_count = 1
+        sample_size = teacher._calculate_sample_size()
+        teacher._equivalence_queries_count = 0
+        sample = sorted(UniformLengthSequenceGenerator(target.alphabet, 15).generate_words(sample_size), key=len)
+        expected = next(word for word in sample if not comparator.next_tokens_equivalent_output(
+            target.get_last_token_weights(word, suffixes), hypothesis.get_last_token_weights(word, suffixes)))
+        teacher._sequence_generator.reset_seed()
+        self.assertEqual(teacher.equivalence_query(hypothesis), (False, expected))
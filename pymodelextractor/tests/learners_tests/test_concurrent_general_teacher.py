@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+
+from pymodelextractor.teachers.general_teacher import GeneralTeacher
+from pymodelextractor.factories.lstar_factory import LStarFactory
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.model_comparators.dfa_comparison_strategy import DFAComparisonStrategy
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import \
+    HopcroftKarpComparisonStrategy as ComparisonStrategy
+from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
+
+
+class _SlowAutomaton:
+    def __init__(self, automaton, delay=0.001):
+        self._automaton = automaton
+        self._delay = delay
+        self._lock = threading.Lock()
+        self.calls = {}
+
+    def __getattr__(self, name):
+        return getattr(self._automaton, name)
+
+    def process_query(self, sequence):
+        with self._lock:
+            self.calls[sequence] = self.calls.get(sequence, 0) + 1
+        time.sleep(self._delay)
+        return self._automaton.process_query(sequence)
+
+
+class TestConcurrentGeneralTeacher(unittest.TestCase):
+
+    def setUp(self):
+        self.automaton = TomitasGrammars.get_automaton_6()
+
+    def test_concurrent_learning_matches_serial(self):
+        target = _SlowAutomaton(self.automaton)
+        teacher = GeneralTeacher(target, DFAComparisonStrategy(), max_workers=8)
+        result = LStarFactory.get_dfa_lstar_learner().learn(teacher)
+        teacher.close()
+        self.assertTrue(ComparisonStrategy().are_equivalent(result.model, self.automaton))
+        self.assertTrue(all(count == 1 for count in target.calls.values()))
+
+    def test_duplicate_in_flight_requests_are_merged(self):
+        target = _SlowAutomaton(self.automaton, delay=0.01)
+        teacher = GeneralTeacher(target, DFAComparisonStrategy(), max_workers=4)
+        sequences = UniformLengthSequenceGenerator(self.automaton.alphabet, 4, 0).generate_words(20)
+
+        answers = []
+        threads = [threading.Thread(target=lambda: answers.append(teacher.membership_queries_batch(sequences)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        teacher.close()
+
+        expected = [self.automaton.process_query(sequence) for sequence in sequences]
+        self.assertEqual(answers, [expected] * 4)
+        self.assertEqual(teacher.membership_queries_count, 4 * len(sequences))
+        self.assertEqual(set(target.calls), set(sequences))
+        self.assertTrue(all(count == 1 for count in target.calls.values()))
@@ -0,0 +1,117 @@
+import random
+import unittest
+
+from pymodelextractor.learners.observation_table_learners.general_observation_table import GeneralObservationTable
+from pymodelextractor.learners.observation_table_learners.general_lstar_learner import GeneralLStarLearner
+from pymodelextractor.learners.observation_table_learners.translators.fa_observation_table_translator import \
+    FAObservationTableTranslator
+from pymodelextractor.teachers.general_teacher import GeneralTeacher
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.model_comparators.dfa_comparison_strategy import DFAComparisonStrategy
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import HopcroftKarpComparisonStrategy
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+
+binaryAlphabet = Alphabet(frozenset((SymbolStr('0'), SymbolStr('1'))))
+epsilon = Sequence()
+
+
+class _CountingTable(GeneralObservationTable):
+    def __init__(self):
+        self.rebuilds = 0
+        super().__init__()
+
+    def _rebuild(self):
+        self.rebuilds += 1
+        super()._rebuild()
+
+
+class _CountingLearner(GeneralLStarLearner):
+    def _build_observation_table(self):
+        self._observation_table = _CountingTable()
+
+
+class TestIncrementalGeneralObservationTable(unittest.TestCase):
+
+    def _unclosed(self, table):
+        return [sequence for sequence in table.blue
+                if all(table[sequence] != table[red] for red in table.red)]
+
+    def _inconsistent(self, table):
+        for red1 in table.red:
+            for red2 in table.red:
+                if red1 != red2 and table[red1] == table[red2] and any(
+                        table[red1 + symbol] != table[red2 + symbol] for symbol in binaryAlphabet.symbols):
+                    return True
+        return False
+
+    def _check(self, table):
+        violation = table.is_closed()
+        unclosed = self._unclosed(table)
+        self.assertEqual(violation is None, len(unclosed) == 0)
+        if violation is not None:
+            self.assertIn(violation, unclosed)
+        self.assertEqual(table.find_inconsistency(binaryAlphabet) is not None, self._inconsistent(table))
+
+    def test_worklists_match_full_scans(self):
+        random.seed(11)
+        symbols = sorted(binaryAlphabet.symbols)
+        for _ in range(20):
+            table = GeneralObservationTable()
+            table.exp = [epsilon]
+            table[epsilon] = [random.random() < 0.5]
+            table.add_to_red(epsilon, table[epsilon])
+            for symbol in symbols:
+                table.add_to_blue(Sequence((symbol,)))
+                table[Sequence((symbol,))] = [random.random() < 0.5]
+            for step in range(12):
+                self._check(table)
+                if step % 4 == 3:
+                    sequences = list(table.observations)
+                    table.add_column(Sequence((random.choice(symbols),) * step),
+                                     sequences, [random.random() < 0.5 for _ in sequences])
+                else:
+                    sequence = random.choice(sorted(table.blue))
+                    table.move_from_blue_to_red(sequence)
+                    for symbol in symbols:
+                        table.add_to_blue(sequence + symbol)
+                        table[sequence + symbol] = [random.random() < 0.5 for _ in table.exp]
+            self._check(table)
+
+    def test_direct_changes_are_detected(self):
+        table = GeneralObservationTable()
+        table.exp = [epsilon]
+        table.red.add(epsilon)
+        table.blue.update([Sequence((symbol,)) for symbol in binaryAlphabet.symbols])
+        table.observations = {epsilon: [True], **{sequence: [False] for sequence in table.blue}}
+        self.assertIn(table.is_closed(), table.blue)
+        table.red = set(table.observations)
+        table.blue = set()
+        self.assertIsNone(table.is_closed())
+        table.blue.add(Sequence((SymbolStr('0'), SymbolStr('0'))))
+        table.observations[Sequence((SymbolStr('0'), SymbolStr('0')))] = [None]
+        table.invalidate()
+        self.assertEqual(table.is_closed(), Sequence((SymbolStr('0'), SymbolStr('0'))))
+        table.observations[Sequence((SymbolStr('0'), SymbolStr('0')))][0] = True
+        table.invalidate()
+        self.assertIsNone(table.is_closed())
+        self.assertEqual(table.redValues, {(True,), (False,)})
+
+    def test_missing_successor_rows_fail_loudly(self):
+        table = GeneralObservationTable()
+        table.exp = [epsilon]
+        for sequence in (epsilon, Sequence((SymbolStr('0'),))):
+            table[sequence] = [True]
+            table.add_to_red(sequence, table[sequence])
+        with self.assertRaises(KeyError):
+            table.find_inconsistency(binaryAlphabet)
+
+    def test_learning_only_rebuilds_the_empty_table(self):
+        for automaton in [TomitasGrammars.get_automaton_4(), TomitasGrammars.get_automaton_5(),
+                          TomitasGrammars.get_automaton_6()]:
+            learner = _CountingLearner(FAObservationTableTranslator())
+            result = learner.learn(GeneralTeacher(automaton, DFAComparisonStrategy()))
+            self.assertTrue(HopcroftKarpComparisonStrategy().are_equivalent(result.model, automaton))
+            # The learner assigns `exp` directly while the table is still empty.
+            self.assertEqual(result.info['observation_table'].rebuilds, 1)
@@ -0,0 +1,110 @@
+import heapq
+import random
+import unittest
+
+from pymodelextractor.learners.observation_table_learners.pdfa_observation_table import PDFAObservationTable, epsilon
+from pymodelextractor.utils.indexed_heap import IndexedHeap
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+
+binaryAlphabet = Alphabet(frozenset((SymbolStr('0'), SymbolStr('1'))))
+
+
+class _ScanningBlueQueue:
+    """The blue queue as a plain heap, filtered on removal and fully rescanned on every closedness check."""
+
+    def __init__(self, table):
+        self.table = table
+        self.queue = []
+        self.blue = set()
+
+    def add(self, weighted_sequence):
+        heapq.heappush(self.queue, weighted_sequence)
+        self.blue.add(weighted_sequence[1])
+
+    def remove(self, sequence):
+        self.blue.remove(sequence)
+        self.queue = [entry for entry in self.queue if entry[1] != sequence]
+        heapq.heapify(self.queue)
+
+    def violating(self):
+        skipped = []
+        violating = None
+        while self.queue and violating is None:
+            entry = heapq.heappop(self.queue)
+            if any(self.table.comparator.equivalent_output(self.table[entry[1]], self.table[red])
+                   for red in self.table.red):
+                skipped.append(entry)
+            else:
+                self.blue.remove(entry[1])
+                violating = entry[1]
+        for entry in skipped:
+            heapq.heappush(self.queue, entry)
+        return violating
+
+
+class TestIndexedHeap(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(17)
+
+    def test_pops_like_heapq_with_lazy_deletion(self):
+        heap = IndexedHeap()
+        reference = {}
+        for _ in range(2000):
+            operation = random.random()
+            key = random.randrange(50)
+            if operation < 0.5:
+                item = (random.randrange(20), key)
+                heap.push(key, item)
+                reference[key] = item
+            elif operation < 0.8:
+                self.assertEqual(heap.discard(key), key in reference)
+                reference.pop(key, None)
+            elif reference:
+                expected = min(reference.values())
+                self.assertEqual(heap.pop(), expected)
+                del reference[expected[1]]
+            self.assertEqual(len(heap), len(reference))
+            self.assertLessEqual(len(heap._heap), 2 * len(heap) + 32)
+        self.assertEqual(sorted(reference.values()), [heap.pop() for _ in range(len(heap))])
+        with self.assertRaises(IndexError):
+            heap.pop()
+
+    def test_pdfa_blue_queue_matches_scanning_queue(self):
+        for tolerance in (0, 0.1):
+            table = PDFAObservationTable(binaryAlphabet, WFAToleranceComparator(tolerance))
+            reference = _ScanningBlueQueue(table)
+            table.add_suffix(epsilon)
+            words = [Sequence([SymbolStr(symbol) for symbol in format(i, 'b')]) for i in range(1, 120)]
+            table.add_to_red(epsilon)
+            table[epsilon] = [0.5]
+
+            def random_row():
+                return [random.choice((0.0, 0.5, 1.0)) + random.choice((0, 0.05)) for _ in table.get_suffixes()]
+
+            for _ in range(600):
+                operation = random.random()
+                word = random.choice(words)
+                if operation < 0.35 and not table.contains_in_blue(word) and not table.contains_in_red(word):
+                    table[word] = random_row()
+                    entry = (random.random(), word)
+                    table.add_to_blue(entry)
+                    reference.add(entry)
+                elif operation < 0.45 and table.contains_in_blue(word):
+                    table.remove_from_blue(word)
+                    reference.remove(word)
+                elif operation < 0.55 and table.contains_observation(word):
+                    table[word] = random_row()
+                elif operation < 0.58:
+                    table.add_suffix(Sequence([SymbolStr('0')] * len(table.get_suffixes())))
+                    sequences = table.get_observed_sequences()
+                    table.extend_rows(sequences, [[random.choice((0.0, 1.0))] for _ in sequences])
+                else:
+                    violating = table.get_violating_closedness_sequence()
+                    self.assertEqual(violating, reference.violating())
+                    if violating is not None and random.random() < 0.5:
+                        table.add_to_red(violating)
+                self.assertEqual({entry[1] for entry in reference.queue}, reference.blue)
@@ -0,0 +1,49 @@
+import unittest
+
+from pymodelextractor.teachers.general_teacher import GeneralTeacher
+from pymodelextractor.teachers.automaton_teacher import DeterministicFiniteAutomatonTeacher
+from pymodelextractor.teachers.moore_machines_teacher import MooreMachineTeacher
+from pymodelextractor.teachers.pac_boolean_teacher import PACBooleanTeacher
+from pymodelextractor.learners.observation_table_learners.lstar_learner import LStarLearner
+from pymodelextractor.factories.lstar_factory import LStarFactory
+from pymodelextractor.tests.learners_tests.helpers import BatchCountingTeacher
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.model_comparators.dfa_comparison_strategy import DFAComparisonStrategy
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import \
+    HopcroftKarpComparisonStrategy as ComparisonStrategy
+from pythautomata.utilities.automata_converter import AutomataConverter
+from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
+
+
+class TestMembershipQueriesBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.automaton = TomitasGrammars.get_automaton_5()
+        self.sequences = UniformLengthSequenceGenerator(self.automaton.alphabet, 10, 0).generate_words(200)
+
+    def _assert_batch_matches_single_queries(self, teacher):
+        expected = [teacher.membership_query(sequence) for sequence in self.sequences]
+        teacher.reset_statistics()
+        self.assertEqual(teacher.membership_queries_batch(self.sequences), expected)
+        self.assertEqual(teacher.membership_queries_count, len(self.sequences))
+
+    def test_teachers_batch_answers(self):
+        moore = AutomataConverter().convert_dfa_to_moore_machine(self.automaton)
+        self._assert_batch_matches_single_queries(GeneralTeacher(self.automaton, DFAComparisonStrategy()))
+        self._assert_batch_matches_single_queries(
+            GeneralTeacher(self.automaton, DFAComparisonStrategy(), w_cache=False))
+        self._assert_batch_matches_single_queries(
+            DeterministicFiniteAutomatonTeacher(self.automaton, ComparisonStrategy()))
+        self._assert_batch_matches_single_queries(MooreMachineTeacher(moore))
+        self._assert_batch_matches_single_queries(PACBooleanTeacher(self.automaton, 0.05, 0.05))
+
+    def test_learners_fill_tables_in_batches(self):
+        teacher = BatchCountingTeacher(self.automaton, ComparisonStrategy())
+        result = LStarLearner().learn(teacher)
+        self.assertTrue(ComparisonStrategy().are_equivalent(result.model, self.automaton))
+        self.assertLess(teacher.batches, teacher.membership_queries_count)
+
+    def test_general_learner_with_batches(self):
+        teacher = GeneralTeacher(self.automaton, DFAComparisonStrategy())
+        result = LStarFactory.get_dfa_lstar_learner().learn(teacher)
+        self.assertTrue(ComparisonStrategy().are_equivalent(result.model, self.automaton))
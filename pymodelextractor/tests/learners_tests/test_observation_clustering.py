@@ -0,0 +1,70 @@
+import random
+import unittest
+import warnings
+
+import numpy as np
+from pymodelextractor.learners.observation_table_learners.pdfa_lstar_learner import PDFALStarLearner
+from pymodelextractor.learners.observation_table_learners.pdfa_lstarcol_learner import PDFALStarColLearner
+from pymodelextractor.learners.observation_table_learners.translators.observation_clustering import distances, \
+    equivalence_mask, first_true, quantized_partitions, squared_distance_sums, states_where
+from pymodelextractor.learners.observation_table_learners.translators.pdfa_lstar_quant_observation_table_translator \
+    import PDFALStarQuantObservationTableTranslation
+from pymodelextractor.learners.observation_table_learners.translators.pdfa_lstarcol_quant_observation_table_translator \
+    import PDFALStarColQuantObservationTableTranslator
+from pymodelextractor.teachers.pdfa_teacher import PDFATeacher
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.model_comparators.wfa_quantization_comparison_strategy import WFAQuantizationComparator
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pythautomata.utilities import pdfa_utils
+
+
+def _quantization_comparator(partitions):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        return WFAQuantizationComparator(partitions)
+
+
+class TestObservationClustering(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(29)
+
+    def test_quantized_partitions_match_pdfa_utils(self):
+        for partitions in range(1, 20):
+            limits = np.linspace(0, 1, partitions + 1)
+            values = list(limits) + [np.nextafter(limit, 2) for limit in limits[:-1]] + \
+                [np.nextafter(limit, -1) for limit in limits[1:]] + [random.random() for _ in range(200)]
+            expected = [pdfa_utils.get_quantized_interval_partition(value, partitions) for value in values]
+            self.assertEqual(quantized_partitions(np.array(values), partitions).tolist(), expected)
+
+    def test_equivalence_mask_matches_comparators(self):
+        for comparator in (WFAToleranceComparator(0.1), WFAToleranceComparator(0), _quantization_comparator(3),
+                           _quantization_comparator(8)):
+            rows = np.array([[random.choice((0.0, 0.25, 0.5)) + random.random() * 0.2 for _ in range(3)]
+                             for _ in range(100)])
+            for value in rows[:20]:
+                expected = [comparator.equivalent_output(value, row) for row in rows]
+                self.assertEqual(equivalence_mask(comparator, value, rows).tolist(), expected)
+            self.assertEqual(len(equivalence_mask(comparator, rows[0], rows[:0])), 0)
+
+    def test_distances_add_like_sum(self):
+        rows = np.array([[random.random() for _ in range(7)] for _ in range(50)])
+        value = rows[0] / 3
+        self.assertEqual(squared_distance_sums(value, rows).tolist(), [sum((value - row) ** 2) for row in rows])
+        self.assertEqual(distances(value, rows).tolist(), [np.sqrt(sum((value - row) ** 2)) for row in rows])
+
+    def test_states_where(self):
+        mask = np.array([True, False, True, True, False])
+        labels = np.array([0, 0, 1, 1, 2])
+        self.assertEqual(states_where(mask, labels, 4).tolist(), [False, True, False, True])
+        self.assertEqual(states_where(mask, labels, 4, criterion=any).tolist(), [True, True, False, False])
+        self.assertEqual(first_true(mask[3:]), 0)
+        self.assertIsNone(first_true(mask[4:]))
+
+    def test_quantization_translators_extract_models(self):
+        for model in (WeightedTomitasGrammars.get_automaton_1(), WeightedTomitasGrammars.get_automaton_5()):
+            comparator = _quantization_comparator(10)
+            for learner in (PDFALStarLearner(comparator, PDFALStarQuantObservationTableTranslation()),
+                            PDFALStarColLearner(comparator, PDFALStarColQuantObservationTableTranslator())):
+                result = learner.learn(PDFATeacher(model, comparator))
+                self.assertTrue(WFAToleranceComparator(0.1).are_equivalent(result.model, model))
@@ -0,0 +1,68 @@
+import random
+import unittest
+
+import numpy as np
+from pymodelextractor.learners.observation_table_learners.observation_matrix import ObservationMatrix
+from pymodelextractor.learners.observation_table_learners.pdfa_lstar_learner import PDFALStarLearner
+from pymodelextractor.learners.observation_table_learners.pdfa_lstarcol_learner import PDFALStarColLearner
+from pymodelextractor.learners.observation_table_learners.pdfa_observation_table import PDFAObservationTable
+from pymodelextractor.teachers.pdfa_teacher import PDFATeacher
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+
+
+def _sequence(i):
+    return Sequence([SymbolStr(symbol) for symbol in format(i, 'b')])
+
+
+class TestObservationMatrix(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(23)
+
+    def test_rows_match_lists(self):
+        matrix = ObservationMatrix(initial_rows=2, initial_columns=1)
+        rows = {}
+        for i in range(200):
+            rows[_sequence(i)] = [random.random() for _ in range(random.randint(0, 3))]
+            matrix[_sequence(i)] = rows[_sequence(i)]
+        for added in (1, 3):
+            sequences = random.sample(list(rows), 120)
+            values = [[random.random() for _ in range(added)] for _ in sequences]
+            matrix.extend_rows(sequences, values)
+            for sequence, row_values in zip(sequences, values):
+                rows[sequence].extend(row_values)
+        self.assertEqual(len(matrix), len(rows))
+        for sequence, row in rows.items():
+            self.assertEqual(matrix[sequence].tolist(), row)
+            self.assertEqual(matrix.width(sequence), len(row))
+
+        same_width = [sequence for sequence in rows if len(rows[sequence]) == 2]
+        matrix.extend_rows(same_width, np.ones((len(same_width), 2)))
+        self.assertEqual(matrix.rows(same_width).tolist(), [rows[sequence] + [1.0, 1.0] for sequence in same_width])
+        matrix.extend_rows(same_width, [[] for _ in same_width])
+        self.assertEqual(matrix.width(same_width[0]), 4)
+
+    def test_float32_storage(self):
+        matrix = ObservationMatrix(np.float32)
+        matrix[_sequence(1)] = [0.1, 0.2]
+        self.assertEqual(matrix[_sequence(1)].dtype, np.float32)
+        self.assertEqual(matrix.nbytes, ObservationMatrix(np.float64).nbytes // 2)
+
+    def test_table_rows_are_views(self):
+        table = PDFAObservationTable(WeightedTomitasGrammars.get_automaton_1().alphabet, WFAToleranceComparator(0.1))
+        table[_sequence(1)] = [0.5, 0.25]
+        table[_sequence(2)] = [0.5, 0.75]
+        table.extend_rows([_sequence(1), _sequence(2)], [[1.0], [0.0]])
+        self.assertEqual(table[_sequence(1)].tolist(), [0.5, 0.25, 1.0])
+        self.assertEqual(table.get_observation_matrix([_sequence(2), _sequence(1)]).tolist(),
+                         [[0.5, 0.75, 0.0], [0.5, 0.25, 1.0]])
+
+    def test_float32_learners_extract_models(self):
+        for model in (WeightedTomitasGrammars.get_automaton_1(), WeightedTomitasGrammars.get_automaton_4()):
+            for learner_class in (PDFALStarLearner, PDFALStarColLearner):
+                comparator = WFAToleranceComparator(0.1)
+                result = learner_class(comparator, observation_dtype=np.float32).learn(PDFATeacher(model, comparator))
+                self.assertTrue(comparator.are_equivalent(result.model, model))
@@ -0,0 +1,59 @@
+import unittest
+
+from pymodelextractor.teachers.pac_sample_pool import PACSamplePool
+from pymodelextractor.teachers.pac_boolean_teacher import PACBooleanTeacher
+from pymodelextractor.teachers.pac_probabilistic_teacher import PACProbabilisticTeacher
+from pymodelextractor.learners.observation_table_learners.lstar_learner import LStarLearner
+from pymodelextractor.learners.observation_table_learners.pdfa_lstar_learner import PDFALStarLearner
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
+
+
+class TestPACSamplePool(unittest.TestCase):
+
+    def setUp(self):
+        self.target = TomitasGrammars.get_automaton_3()
+        self.answered = []
+
+    def _answer(self, sequences):
+        self.answered.extend(sequences)
+        return [self.target.accepts(sequence) for sequence in sequences]
+
+    def test_pool_only_draws_missing_words(self):
+        pool = PACSamplePool()
+        generator = UniformLengthSequenceGenerator(self.target.alphabet, 20, 3)
+        first = list(pool.grow_to(300, generator, self._answer))
+        second = pool.grow_to(450, generator, self._answer)
+        self.assertEqual(len(second), 450)
+        self.assertEqual(second[:300], first)
+        self.assertEqual(len(self.answered), len(set(self.answered)))
+        self.assertEqual(set(self.answered), set(second))
+        self.assertEqual(len(pool.grow_to(450, generator, self._answer)), 450)
+        self.assertTrue(all(pool.answers[sequence] == self.target.accepts(sequence) for sequence in second))
+
+    def test_teacher_checks_hypothesis_against_whole_pool(self):
+        hypothesis = TomitasGrammars.get_automaton_4()
+        teacher = PACBooleanTeacher(self.target, 0.05, 0.01, max_seq_length=20, reuse_sample=True)
+        for _ in range(3):
+            equivalent, counterexample = teacher.equivalence_query(hypothesis)
+            pool = teacher._sample_pool.sequences
+            self.assertEqual(len(pool), teacher.last_sample_size)
+            errors = [sequence for sequence in sorted(pool, key=len)
+                      if self.target.accepts(sequence) != hypothesis.accepts(sequence)]
+            self.assertFalse(equivalent)
+            self.assertEqual(counterexample, errors[0])
+
+    def test_learning_with_reused_sample(self):
+        teacher = PACBooleanTeacher(self.target, 0.01, 0.01, max_seq_length=20, reuse_sample=True)
+        result = LStarLearner().learn(teacher)
+        self.assertEqual(len(result.model.states), len(self.target.states))
+        self.assertEqual(len(teacher._sample_pool), teacher.last_sample_size)
+
+    def test_probabilistic_learning_with_reused_sample(self):
+        target = WeightedTomitasGrammars.get_automaton_3()
+        comparator = WFAToleranceComparator(0.001)
+        teacher = PACProbabilisticTeacher(target, comparator, 0.05, 0.01, max_seq_length=20, reuse_sample=True)
+        result = PDFALStarLearner(comparator).learn(teacher)
+        self.assertEqual(len(result.model.weighted_states), len(target.weighted_states))
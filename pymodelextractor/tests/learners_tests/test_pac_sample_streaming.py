@@ -0,0 +1,90 @@
+import random
+import unittest
+
+from pymodelextractor.teachers.pac_sampling_engine import PACSamplingEngine, BooleanDisagreement, sample_chunks, \
+    uniform_length_sampler, uniform_word_length_sampler
+from pymodelextractor.teachers.pac_boolean_teacher import PACBooleanTeacher
+from pymodelextractor.teachers.pac_comparison_strategy import PACComparisonStrategy
+from pymodelextractor.teachers.pac_probabilistic_teacher import PACProbabilisticTeacher
+from pymodelextractor.learners.observation_table_learners.lstar_learner import LStarLearner
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
+from pythautomata.utilities.uniform_word_sequence_generator import UniformWordSequenceGenerator
+from pythautomata.utilities.guiding_wfa_sequence_generator import GuidingWDFASequenceGenerator
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+
+
+class TestPACSampleStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.target = TomitasGrammars.get_automaton_3()
+        self.hypothesis = TomitasGrammars.get_automaton_4()
+        self.disagreement = BooleanDisagreement(self.target, self.hypothesis)
+
+    def test_uniform_length_chunks_are_length_ordered(self):
+        generator = UniformLengthSequenceGenerator(self.target.alphabet, 30, 7)
+        chunks, length_ordered = sample_chunks(generator, 2_500, 300, uniform_length_sampler(30))
+        chunks = list(chunks)
+        self.assertTrue(length_ordered)
+        self.assertTrue(all(len(chunk) <= 300 for chunk in chunks))
+        words = [word for chunk in chunks for word in chunk]
+        self.assertEqual(len(words), 2_500)
+        self.assertEqual([len(word) for word in words], sorted(len(word) for word in words))
+        random.seed(7)
+        expected_lengths = sorted(random.randint(0, 30) for _ in range(2_500))
+        self.assertEqual([len(word) for word in words], expected_lengths)
+
+    def test_uniform_word_chunks_are_length_ordered(self):
+        generator = UniformWordSequenceGenerator(self.target.alphabet, 12, 7)
+        chunks, length_ordered = sample_chunks(generator, 1_000, 64,
+                                               uniform_word_length_sampler(len(self.target.alphabet), 12))
+        lengths = [len(word) for chunk in chunks for word in chunk]
+        self.assertTrue(length_ordered)
+        self.assertEqual(len(lengths), 1_000)
+        self.assertEqual(lengths, sorted(lengths))
+        random.seed(7)
+        self.assertEqual(lengths, sorted(generator._select_random_length() for _ in range(1_000)))
+
+    def test_generators_without_length_sampler_are_streamed_in_drawing_order(self):
+        generator = UniformLengthSequenceGenerator(self.target.alphabet, 30, 7)
+        chunks, length_ordered = sample_chunks(generator, 250, 100)
+        self.assertFalse(length_ordered)
+        words = [word for chunk in chunks for word in chunk]
+        random.seed(7)
+        self.assertEqual(words, generator.generate_words(250))
+
+    def test_guiding_generator_is_streamed_in_drawing_order(self):
+        guide = WeightedTomitasGrammars.get_automaton_3()
+        generator = GuidingWDFASequenceGenerator(guide, 20)
+        chunks, length_ordered = sample_chunks(generator, 250, 100)
+        self.assertFalse(length_ordered)
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+
+    def test_unordered_chunks_keep_shortest_counterexample(self):
+        sample = UniformLengthSequenceGenerator(self.target.alphabet, 30, 7).generate_words(3_000)
+        errors = [sequence for sequence in sorted(sample, key=len) if self.disagreement(sequence)]
+        chunks = [sample[i:i + 250] for i in range(0, len(sample), 250)]
+        for engine in [PACSamplingEngine(), PACSamplingEngine(processes=3, chunk_size=250)]:
+            evaluation = engine.evaluate_chunks(iter(chunks), self.disagreement, length_ordered=False)
+            self.assertEqual(evaluation.counterexample, errors[0])
+            self.assertEqual(evaluation.error_count, len(errors))
+            evaluation = engine.evaluate_chunks(iter(chunks), self.disagreement, stop_at_first=True,
+                                                length_ordered=False)
+            self.assertEqual(evaluation.counterexample, errors[0])
+
+    def test_learning_with_streamed_sample(self):
+        for engine in [PACSamplingEngine(chunk_size=100), PACSamplingEngine(processes=2, chunk_size=100)]:
+            teacher = PACBooleanTeacher(self.target, 0.01, 0.01, max_seq_length=20, sampling_engine=engine,
+                                        stream_sample=True, compute_epsilon_star=False)
+            result = LStarLearner().learn(teacher)
+            self.assertEqual(len(result.model.states), len(self.target.states))
+
+    def test_streaming_and_reusing_the_sample_are_exclusive(self):
+        with self.assertRaises(ValueError):
+            PACBooleanTeacher(self.target, 0.01, 0.01, stream_sample=True, reuse_sample=True)
+        with self.assertRaises(ValueError):
+            PACProbabilisticTeacher(WeightedTomitasGrammars.get_automaton_3(), WFAToleranceComparator(), 0.01, 0.01,
+                                    stream_sample=True, reuse_sample=True)
+        with self.assertRaises(ValueError):
+            PACComparisonStrategy(self.target.alphabet, 0.01, 0.01, stream_sample=True, reuse_sample=True)
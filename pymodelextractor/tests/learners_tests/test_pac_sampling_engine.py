@@ -0,0 +1,40 @@
+import unittest
+
+from pymodelextractor.teachers.pac_sampling_engine import PACSamplingEngine, BooleanDisagreement
+from pymodelextractor.teachers.pac_boolean_teacher import PACBooleanTeacher
+from pymodelextractor.learners.observation_table_learners.lstar_learner import LStarLearner
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
+
+
+class TestPACSamplingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.target = TomitasGrammars.get_automaton_3()
+        self.hypothesis = TomitasGrammars.get_automaton_4()
+        self.sample = UniformLengthSequenceGenerator(self.target.alphabet, 30, 7).generate_words(3_000)
+        self.disagreement = BooleanDisagreement(self.target, self.hypothesis)
+
+    def _serial_reference(self):
+        sample = sorted(self.sample, key=len)
+        errors = [sequence for sequence in sample if self.disagreement(sequence)]
+        return errors[0], len(errors)
+
+    def test_pool_matches_serial_loop(self):
+        counterexample, error_count = self._serial_reference()
+        for engine in [PACSamplingEngine(), PACSamplingEngine(processes=3, chunk_size=100)]:
+            evaluation = engine.evaluate(self.sample, self.disagreement)
+            self.assertEqual(evaluation.counterexample, counterexample)
+            self.assertEqual(evaluation.error_count, error_count)
+
+    def test_early_exit_keeps_shortest_counterexample(self):
+        counterexample, _ = self._serial_reference()
+        for engine in [PACSamplingEngine(), PACSamplingEngine(processes=3, chunk_size=100)]:
+            evaluation = engine.evaluate(self.sample, self.disagreement, stop_at_first=True)
+            self.assertEqual(evaluation.counterexample, counterexample)
+
+    def test_learning_with_pool(self):
+        teacher = PACBooleanTeacher(self.target, 0.01, 0.01, max_seq_length=20,
+                                    sampling_engine=PACSamplingEngine(processes=2, chunk_size=200))
+        result = LStarLearner().learn(teacher)
+        self.assertEqual(len(result.model.states), len(self.target.states))
@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
+from pymodelextractor.learners.observation_tree_learners.pdfa_quantization_n_ary_tree_learner import \
+    ClassificationNode, ClassificationTree, PDFAQuantizationNAryTreeLearner
+from pymodelextractor.teachers.pdfa_teacher import PDFATeacher
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.model_comparators.wfa_partition_comparison_strategy import WFAPartitionComparator
+from pythautomata.utilities.probability_partitioner import QuantizationProbabilityPartitioner, \
+    QuantizationProbabilityPartitionerPlus, TopKProbabilityPartitioner
+
+
+def _random_distribution(size):
+    weights = [random.choice((0, random.random(), random.random() ** 4)) for _ in range(size)]
+    weights[random.randrange(size)] += 0.01
+    total = sum(weights)
+    return tuple(weight / total for weight in weights)
+
+
+class TestPartitionBranchLookup(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(5)
+
+    def _scanning_lookup(self, partitioner, childs, probabilities):
+        # Branch lookup as done before children were indexed by partition.
+        if probabilities in childs:
+            return probabilities
+        for probs in childs:
+            if partitioner.are_in_same_partition(list(probs), list(probabilities)):
+                return probs
+        return None
+
+    def test_lookup_matches_scanning_children(self):
+        for partitioner in (QuantizationProbabilityPartitioner(3), QuantizationProbabilityPartitionerPlus(3),
+                            TopKProbabilityPartitioner(1)):
+            tree = ClassificationTree(ClassificationNode(epsilon), None, partitioner)
+            node = ClassificationNode(epsilon)
+            for _ in range(60):
+                probabilities = _random_distribution(3)
+                expected = self._scanning_lookup(partitioner, node.childs, probabilities)
+                self.assertEqual(tree._look_for_branch(node, probabilities), expected)
+                if expected is None or random.random() < 0.2:
+                    # Children may share a partition, e.g. when added by a leaf split.
+                    node.childs[probabilities] = ClassificationNode(epsilon, parent=node)
+            tree._look_for_branch(node, _random_distribution(3))
+            self.assertEqual(node.indexed_childs, len(node.childs))
+            self.assertLess(len(node.childs_by_partition), len(node.childs))
+
+    def test_learner_extracts_models(self):
+        partitioner = QuantizationProbabilityPartitioner(10)
+        for model in (WeightedTomitasGrammars.get_automaton_3(), WeightedTomitasGrammars.get_automaton_7()):
+            learner = PDFAQuantizationNAryTreeLearner(partitioner)
+            result = learner.learn(PDFATeacher(model, WFAPartitionComparator(partitioner)))
+            self.assertEqual(result.model, model)
@@ -0,0 +1,78 @@
+import unittest
+
+from pymodelextractor.utils.prefix_state_caching_model import PrefixStateCachingModel
+from pymodelextractor.teachers.pac_probabilistic_teacher import PACProbabilisticTeacher
+from pymodelextractor.learners.observation_table_learners.pdfa_lstar_learner import PDFALStarLearner
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
+
+
+class _SteppedPDFA:
+    """Exposes a PDFA through the step-by-step interface of a recurrent model."""
+
+    def __init__(self, pdfa):
+        self._pdfa = pdfa
+        self.steps = 0
+
+    @property
+    def name(self):
+        return self._pdfa.name
+
+    @property
+    def alphabet(self):
+        return self._pdfa.alphabet
+
+    @property
+    def terminal_symbol(self):
+        return self._pdfa.terminal_symbol
+
+    def initial_hidden_state(self):
+        return self._pdfa.get_first_state()
+
+    def next_hidden_state(self, state, symbol):
+        self.steps += 1
+        return state.transitions_list[symbol][0][0]
+
+    def next_token_weights(self, state):
+        weights = {symbol: transitions[0][1] for symbol, transitions in state.transitions_list.items()}
+        weights[self._pdfa.terminal_symbol] = state.final_weight
+        return weights
+
+
+class TestPrefixStateCachingModel(unittest.TestCase):
+
+    def setUp(self):
+        self.pdfa = WeightedTomitasGrammars.get_automaton_4()
+        self.suffixes = [self.pdfa.terminal_symbol] + [Sequence((symbol,)) for symbol in self.pdfa.alphabet.symbols]
+        self.sequences = UniformLengthSequenceGenerator(self.pdfa.alphabet, 12, 3).generate_words(300)
+
+    def test_answers_match_target(self):
+        model = PrefixStateCachingModel(_SteppedPDFA(self.pdfa))
+        expected = [self.pdfa.get_last_token_weights(sequence, self.suffixes) for sequence in self.sequences]
+        self.assertEqual(model.get_last_token_weights_batch(self.sequences, self.suffixes), expected)
+        for sequence in self.sequences[:20]:
+            self.assertAlmostEqual(model.sequence_weight(sequence), float(self.pdfa.sequence_weight(sequence)))
+
+    def test_shared_prefixes_are_computed_once(self):
+        target = _SteppedPDFA(self.pdfa)
+        model = PrefixStateCachingModel(target)
+        model.get_last_token_weights_batch(self.sequences, self.suffixes)
+        steps = target.steps
+        self.assertLess(steps, sum(len(sequence) + 1 for sequence in self.sequences))
+        model.get_last_token_weights_batch(self.sequences, self.suffixes)
+        self.assertEqual(target.steps, steps)
+
+    def test_cache_is_bounded(self):
+        model = PrefixStateCachingModel(_SteppedPDFA(self.pdfa), max_cached_states=50)
+        expected = [self.pdfa.get_last_token_weights(sequence, self.suffixes) for sequence in self.sequences]
+        for sequence, weights in zip(self.sequences, expected):
+            self.assertEqual(model.get_last_token_weights(sequence, self.suffixes), weights)
+            self.assertLessEqual(model.cached_states, 50)
+
+    def test_learning_through_adapter(self):
+        model = PrefixStateCachingModel(_SteppedPDFA(self.pdfa))
+        teacher = PACProbabilisticTeacher(model, WFAToleranceComparator(0.001), 0.05, 0.05, max_seq_length=10)
+        result = PDFALStarLearner(WFAToleranceComparator(0.001)).learn(teacher)
+        self.assertEqual(len(result.model.weighted_states), len(self.pdfa.weighted_states))
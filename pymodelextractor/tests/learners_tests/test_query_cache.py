@@ -0,0 +1,164 @@
+import unittest
+
+from pymodelextractor.factories.lstar_factory import LStarFactory
+from pymodelextractor.learners.observation_tree_learners.kearns_vazirani_learner import KearnsVaziraniLearner
+from pymodelextractor.learners.observation_tree_learners.observation_pack_learner import ObservationPackLearner
+from pymodelextractor.learners.observation_tree_learners.pdfa_quantization_n_ary_tree_learner import \
+    PDFAQuantizationNAryTreeLearner
+from pymodelextractor.teachers.automaton_teacher import DeterministicFiniteAutomatonTeacher
+from pymodelextractor.teachers.general_teacher import GeneralTeacher
+from pymodelextractor.teachers.pac_batch_probabilistic_teacher import PACBatchProbabilisticTeacher
+from pymodelextractor.teachers.pdfa_teacher import PDFATeacher
+from pymodelextractor.utils.query_cache import ARC, LRU, QueryCache
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.model_comparators.dfa_comparison_strategy import DFAComparisonStrategy
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import \
+    HopcroftKarpComparisonStrategy as ComparisonStrategy
+from pythautomata.model_comparators.wfa_partition_comparison_strategy import WFAPartitionComparator
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pythautomata.utilities.probability_partitioner import QuantizationProbabilityPartitioner
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = QueryCache(max_entries=3, policy=LRU)
+        for key in 'abc':
+            cache[key] = key.upper()
+        self.assertIn('a', cache)
+        cache['d'] = 'D'
+        self.assertEqual(list(cache), ['a', 'c', 'd'])
+        self.assertEqual(cache.statistics, {'hits': 1, 'misses': 0, 'evictions': 1, 'entries': 3, 'pinned': 0})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.misses, 1)
+
+    def test_holds_does_not_count_lookups(self):
+        cache = QueryCache(max_entries=2)
+        cache['a'] = 'A'
+        cache['b'] = 'B'
+        self.assertTrue(cache.holds('a'))
+        self.assertFalse(cache.holds('c'))
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+        # Checking 'a' did not refresh it, so it is still the first to go.
+        cache['c'] = 'C'
+        self.assertEqual(list(cache), ['b', 'c'])
+
+    def test_max_bytes_bounds_total_size(self):
+        cache = QueryCache(max_bytes=10, size_of=lambda key, value: len(value))
+        cache['a'] = 'xxxx'
+        cache['b'] = 'xxxx'
+        cache['c'] = 'xxxx'
+        self.assertEqual(list(cache), ['b', 'c'])
+        self.assertEqual(cache.statistics['bytes'], 8)
+        cache['b'] = 'x'
+        self.assertEqual(cache.statistics['bytes'], 5)
+
+    def test_pinned_entries_are_not_evicted(self):
+        cache = QueryCache(max_entries=2)
+        cache.pin(['a'])
+        for key in 'abcd':
+            cache[key] = key
+        self.assertEqual(set(cache), {'a', 'd'})
+        cache.pin(['d'])
+        # With every other entry pinned, a new entry is evicted right away.
+        cache['e'] = 'e'
+        self.assertEqual(set(cache), {'a', 'd'})
+        cache.unpin(['a', 'd'])
+        cache['f'] = 'f'
+        self.assertEqual(set(cache), {'d', 'f'})
+
+    def test_pinned_keys_leave_the_eviction_order(self):
+        cache = QueryCache(max_entries=3, policy=ARC)
+        for key in 'abc':
+            cache[key] = key
+        self.assertIn('a', cache)
+        cache.pin(['a', 'b', 'x'])
+        self.assertEqual(list(cache._recent), ['c'])
+        self.assertEqual(list(cache._frequent), [])
+        cache['x'] = 'x'
+        # Only c is in the eviction order, so it goes first without walking past the pinned keys.
+        self.assertEqual(set(cache), {'a', 'b', 'x'})
+        cache.unpin(['a', 'b'])
+        self.assertEqual(list(cache._recent), ['b'])
+        self.assertEqual(list(cache._frequent), ['a'])
+        cache.unpin(['x'])
+        self.assertEqual(list(cache._recent), ['b', 'x'])
+
+    def test_unbounded_caches_keep_no_eviction_order(self):
+        cache = QueryCache()
+        for key in 'abc':
+            cache[key] = key
+        self.assertIn('a', cache)
+        self.assertEqual(cache['b'], 'b')
+        self.assertEqual(cache.get('d', 'd'), 'd')
+        cache.pin(['a'])
+        cache.unpin(['a'])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(list(cache._recent), [])
+        self.assertEqual(list(cache), ['a', 'b', 'c'])
+
+    def test_arc_keeps_entries_seen_again(self):
+        cache = QueryCache(max_entries=3, policy=ARC)
+        for key in 'ab':
+            cache[key] = key
+        self.assertIn('a', cache)
+        # A scan of keys seen once does not push out the key seen twice.
+        for key in 'cdefg':
+            cache[key] = key
+        self.assertIn('a', cache)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.evictions, 4)
+
+    def test_arc_adapts_to_evicted_keys(self):
+        cache = QueryCache(max_entries=2, policy=ARC)
+        cache['a'] = 'a'
+        cache['b'] = 'b'
+        cache['c'] = 'c'
+        self.assertIn('a', cache._recent_ghosts)
+        cache['a'] = 'a'
+        self.assertGreater(cache._recent_target, 0)
+        self.assertIn('a', cache._frequent)
+        self.assertEqual(len(cache), 2)
+
+    def test_bounded_teacher_cache_answers_as_target(self):
+        automaton = TomitasGrammars.get_automaton_5()
+        teacher = GeneralTeacher(automaton, DFAComparisonStrategy(), cache=QueryCache(max_entries=4))
+        result = LStarFactory.get_dfa_lstar_learner().learn(teacher)
+        self.assertTrue(ComparisonStrategy().are_equivalent(result.model, automaton))
+        statistics = result.info['teacher_cache']
+        self.assertEqual(statistics['entries'], 4)
+        self.assertGreater(statistics['evictions'], 0)
+
+    def test_parallel_probabilistic_teacher_reports_cache_lookups(self):
+        model = WeightedTomitasGrammars.get_automaton_3()
+        teacher = PACBatchProbabilisticTeacher(model, 0.05, 0.01, comparator=WFAToleranceComparator(),
+                                               max_seq_length=10, parallel_cache=True,
+                                               max_query_elements=1, batch_size=1)
+        sequences = [Sequence(), Sequence((sorted(model.alphabet.symbols)[0],))]
+        teacher.next_token_probabilities_batch(sequences)
+        statistics = teacher.query_cache_info['teacher_cache']
+        self.assertEqual(statistics['hits'] + statistics['misses'], 2)
+        # The filler process may take the single entry first, so only the lookup itself is certain
+        teacher.next_token_probabilities(Sequence())
+        statistics = teacher.query_cache_info['teacher_cache']
+        self.assertEqual(statistics['hits'] + statistics['misses'], 3)
+        del teacher
+
+    def test_bounded_tree_caches_extract_models(self):
+        automaton = TomitasGrammars.get_automaton_6()
+        for learner in (KearnsVaziraniLearner(QueryCache(max_entries=3)),
+                        ObservationPackLearner(QueryCache(max_entries=3, policy=ARC))):
+            result = learner.learn(DeterministicFiniteAutomatonTeacher(automaton, ComparisonStrategy()))
+            self.assertTrue(ComparisonStrategy().are_equivalent(result.model, automaton))
+            self.assertGreater(result.info['tree_cache']['evictions'], 0)
+
+        partitioner = QuantizationProbabilityPartitioner(10)
+        model = WeightedTomitasGrammars.get_automaton_7()
+        learner = PDFAQuantizationNAryTreeLearner(partitioner, tree_cache=QueryCache(max_entries=5))
+        result = learner.learn(PDFATeacher(model, WFAPartitionComparator(partitioner)))
+        self.assertEqual(result.model, model)
+        statistics = result.info['tree_cache']
+        self.assertEqual(statistics['pinned'], len(result.info['observation_tree'].leaves))
+        self.assertGreater(statistics['hits'], 0)
@@ -0,0 +1,133 @@
+import random
+import unittest
+import warnings
+
+from pymodelextractor.learners.observation_table_learners.pdfa_observation_table import PDFAObservationTable, epsilon
+from pymodelextractor.learners.observation_table_learners.row_matching_index import PartitionKeyIndex, \
+    RowMatchingIndex, ToleranceGridIndex, row_matching_index_for
+from pymodelextractor.tests.learners_tests.helpers import words_up_to
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.wfa_comparison_strategy import WFAComparator
+from pythautomata.model_comparators.wfa_quantization_comparison_strategy import WFAQuantizationComparator
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+
+binaryAlphabet = Alphabet(frozenset((SymbolStr('0'), SymbolStr('1'))))
+
+
+class _ExactComparator(WFAComparator):
+    def equivalent_output(self, observation1, observation2) -> bool:
+        return list(observation1) == list(observation2)
+
+    def equivalent_values(self, value1, value2):
+        return value1 == value2
+
+    def next_tokens_equivalent_output(self, observation1, observation2) -> bool:
+        return self.equivalent_output(observation1, observation2)
+
+
+def _quantization_comparator(partitions):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        return WFAQuantizationComparator(partitions)
+
+
+class TestRowMatchingIndex(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(3)
+        self.red = words_up_to(binaryAlphabet, 3)
+        self.blue = [word + symbol for word in self.red for symbol in binaryAlphabet.symbols
+                     if word + symbol not in self.red]
+        self.comparators = [WFAToleranceComparator(0), WFAToleranceComparator(0.05), WFAToleranceComparator(0.2),
+                            _quantization_comparator(4), _ExactComparator()]
+
+    def _random_row(self, width):
+        return [min(1.0, random.choice((0.0, 0.25, 0.5, 0.75, 1.0)) + random.choice((0, 0, 0.01, 0.04)))
+                for _ in range(width)]
+
+    def _table(self, comparator, width):
+        table = PDFAObservationTable(binaryAlphabet, comparator)
+        for i in range(width):
+            table.add_suffix(Sequence([SymbolStr('0')] * i))
+        for sequence in self.red:
+            table.add_to_red(sequence)
+            table[sequence] = self._random_row(width)
+        for sequence in self.blue:
+            table.add_to_blue((random.random(), sequence))
+            table[sequence] = self._random_row(width)
+        return table
+
+    def _scan_inconsistency(self, table):
+        red_list = sorted(list(table.red))
+        for i in range(len(red_list)):
+            for j in range(i + 1, len(red_list)):
+                if table.comparator.equivalent_output(table[red_list[i]], table[red_list[j]]):
+                    inconsistency = table._PDFAObservationTable__inconsistency_between(red_list[i], red_list[j])
+                    if inconsistency is not None:
+                        return inconsistency
+        return None
+
+    def test_index_for_comparator(self):
+        self.assertIsInstance(row_matching_index_for(WFAToleranceComparator(0.1)), ToleranceGridIndex)
+        self.assertIsInstance(row_matching_index_for(_quantization_comparator(2)), PartitionKeyIndex)
+        self.assertIs(type(row_matching_index_for(_ExactComparator())), RowMatchingIndex)
+
+    def test_candidates_include_every_equivalent_row(self):
+        for comparator in self.comparators:
+            index = row_matching_index_for(comparator)
+            rows = {sequence: self._random_row(4) for sequence in self.red}
+            index.rebuild(rows)
+            for _ in range(200):
+                row = self._random_row(4)
+                candidates = set(index.candidates(row))
+                expected = {sequence for sequence, other in rows.items() if comparator.equivalent_output(row, other)}
+                self.assertTrue(expected <= candidates)
+            if type(index) is not RowMatchingIndex:
+                self.assertLess(len(set(index.candidates(rows[epsilon]))), len(rows))
+
+    def test_table_matches_scans(self):
+        for comparator in self.comparators:
+            for width in (1, 2, 3):
+                table = self._table(comparator, width)
+                self.assertEqual(table.find_inconsistency(), self._scan_inconsistency(table))
+                expected = {sequence for sequence in self.blue
+                            if not any(comparator.equivalent_output(table[sequence], table[red]) for red in table.red)}
+                violation = table.get_violating_closedness_sequence()
+                if violation is None:
+                    self.assertEqual(expected, set())
+                else:
+                    self.assertIn(violation, expected)
+
+    def test_index_follows_table_changes(self):
+        comparator = WFAToleranceComparator(0.05)
+        table = self._table(comparator, 2)
+        table.find_inconsistency()
+        sequences = table.get_observed_sequences()
+        table.extend_rows(sequences, [[random.random()] for _ in sequences])
+        table.add_suffix(Sequence([SymbolStr('1')]))
+        self.assertEqual(table.find_inconsistency(), self._scan_inconsistency(table))
+        table.red = set(self.red[:5])
+        self.assertEqual(set(table.red_index.candidates(table[epsilon])) - table.red, set())
+        table.add_to_red(self.blue[0])
+        table[self.blue[0]] = list(table[epsilon])
+        self.assertIn(self.blue[0], set(table.red_index.candidates(table[epsilon])))
+
+    def test_unobserved_red_rows_do_not_rebuild_the_index(self):
+        table = self._table(WFAToleranceComparator(0.05), 2)
+        red_index = table.red_index
+        rebuilds = []
+        rebuild = red_index.rebuild
+        red_index.rebuild = lambda rows: rebuilds.append(len(rows)) or rebuild(rows)
+        unobserved = Sequence([SymbolStr('1')] * 5)
+        table.add_to_red(unobserved)
+        for _ in range(3):
+            self.assertIs(table.red_index, red_index)
+        self.assertEqual(len(red_index), len(self.red))
+        table[unobserved] = list(table[epsilon])
+        self.assertIn(unobserved, set(table.red_index.candidates(table[epsilon])))
+        self.assertEqual(rebuilds, [])
+        table.add_suffix(Sequence([SymbolStr('1')]))
+        table.red_index
+        self.assertEqual(rebuilds, [len(self.red) + 1])
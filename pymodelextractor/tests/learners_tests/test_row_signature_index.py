@@ -0,0 +1,87 @@
+import random
+import unittest
+
+from pymodelextractor.learners.observation_table_learners.row_signature_index import RowSignatureIndex
+from pymodelextractor.learners.observation_table_learners.lstar_learner import LStarObservationTable
+from pymodelextractor.learners.observation_table_learners.general_observation_table import GeneralObservationTable
+from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
+from pymodelextractor.tests.learners_tests.helpers import words_up_to
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+
+binaryAlphabet = Alphabet(frozenset((SymbolStr('0'), SymbolStr('1'))))
+
+
+class TestRowSignatureIndex(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(5)
+        self.red = words_up_to(binaryAlphabet, 3)
+        self.blue = [word + symbol for word in self.red for symbol in binaryAlphabet.symbols
+                     if word + symbol not in self.red]
+
+    def _random_row(self, width):
+        return [random.random() < 0.3 for _ in range(width)]
+
+    def _brute_force_inconsistent(self, table):
+        for red1 in table.red:
+            for red2 in table.red:
+                if red1 != red2 and table.observations[red1] == table.observations[red2] and \
+                        table._inconsistency_between(red1, red2, binaryAlphabet) is not None:
+                    return True
+        return False
+
+    def test_index_groups_equal_rows(self):
+        index = RowSignatureIndex()
+        index.add(Sequence([SymbolStr('0')]), [True, False])
+        index.add(Sequence([SymbolStr('1')]), [True, False])
+        index.add(epsilon, [False, False])
+        self.assertIn([True, False], index)
+        self.assertNotIn([True, True], index)
+        self.assertEqual(list(index.rows_sharing_signature()),
+                         [[Sequence([SymbolStr('0')]), Sequence([SymbolStr('1')])]])
+        index.add(Sequence([SymbolStr('1')]), [True, True])
+        self.assertEqual(list(index.rows_sharing_signature()), [])
+        self.assertNotIn([False, True], index)
+
+    def test_lstar_table_matches_scans(self):
+        for _ in range(30):
+            table = LStarObservationTable(binaryAlphabet)
+            table.exp = [epsilon]
+            table.red.update(self.red)
+            for sequence in self.red + self.blue:
+                table[sequence] = self._random_row(1)
+            for width in range(2, 5):
+                for sequence in self.blue:
+                    self.assertEqual(table.same_row_exists_in_red(sequence),
+                                     any(table[sequence] == table[red] for red in table.red))
+                self.assertEqual(table.find_inconsistency() is not None, self._brute_force_inconsistent(table))
+                table.exp.append(Sequence([SymbolStr('0')] * width))
+                for sequence in table.observations:
+                    table[sequence].append(random.random() < 0.3)
+
+    def test_general_table_tracks_red_rows(self):
+        table = GeneralObservationTable()
+        table.exp = [epsilon]
+        for sequence in self.red[:3] + self.blue:
+            table[sequence] = self._random_row(1)
+        table.blue.update(self.blue)
+        for sequence in self.red[:3]:
+            table.add_to_red(sequence, table[sequence])
+        for sequence in self.red[3:]:
+            table[sequence] = self._random_row(1)
+            table.blue.add(sequence)
+            table.move_from_blue_to_red(sequence)
+        table.exp.append(Sequence([SymbolStr('1')]))
+        for sequence in table.observations:
+            table[sequence].append(random.random() < 0.5)
+        table.invalidate()
+        self.assertEqual(set(table.redValues), {tuple(table[sequence]) for sequence in table.red})
+        closedness_violation = table.is_closed()
+        expected = [sequence for sequence in table.blue
+                    if all(table[sequence] != table[red] for red in table.red)]
+        if closedness_violation is None:
+            self.assertEqual(expected, [])
+        else:
+            self.assertIn(closedness_violation, expected)
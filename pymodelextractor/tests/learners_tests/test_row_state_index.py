@@ -0,0 +1,110 @@
+import random
+import unittest
+
+from pymodelextractor.learners.observation_table_learners.lstar_learner import LStarObservationTable
+from pymodelextractor.learners.observation_table_learners.mm_observation_table import MMObservationTable
+from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
+from pymodelextractor.learners.observation_table_learners.translators.fa_observation_table_translator import \
+    FAObservationTableTranslator
+from pymodelextractor.learners.observation_table_learners.translators.mm_observation_table_translator import \
+    MMObservationTableTranslator
+from pymodelextractor.learners.observation_table_learners.translators.row_state_index import RowStateIndex
+from pymodelextractor.tests.learners_tests.helpers import words_up_to
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+
+binaryAlphabet = Alphabet(frozenset((SymbolStr('0'), SymbolStr('1'))))
+outputAlphabet = Alphabet(frozenset((SymbolStr('x'), SymbolStr('y'))))
+
+
+class TestRowStateIndex(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(11)
+        self.words = words_up_to(binaryAlphabet, 4)
+
+    def _table(self, table, values, red):
+        table.exp = [epsilon, Sequence([SymbolStr('0')])]
+        for word in self.words:
+            table[word] = [random.choice(values) for _ in table.exp]
+        table.red.update(red)
+        return table
+
+    def _add_to_red(self, table, output, word):
+        # Rows come from a fixed language, so the table stays consistent and its hypothesis is unique.
+        table.red.add(word)
+        for sequence in [word] + [word + symbol for symbol in binaryAlphabet.symbols]:
+            if sequence not in table.observations:
+                table[sequence] = [output(sequence + suffix) for suffix in table.exp]
+
+    def _scanning_targets(self, table, states):
+        # Target of every transition as found by comparing rows with the row of every state.
+        return {(sequence, symbol): next((state for state in states if table[state] == table[sequence + symbol]),
+                                         None)
+                for sequence in states for symbol in binaryAlphabet.symbols}
+
+    def _state_rows(self, table, model):
+        return {tuple(table[state.access_string]) for state in model.states}
+
+    def _transition_rows(self, table, model):
+        return {(tuple(table[state.access_string]), str(symbol), tuple(table[next_state.access_string]))
+                for state in model.states for symbol, next_states in state.transitions.items()
+                for next_state in next_states}
+
+    def test_state_for_matches_scanning(self):
+        for compact in (False, True):
+            table = self._table(LStarObservationTable(binaryAlphabet, compact), [True, False], self.words[:7])
+            index = RowStateIndex(table)
+            for sequence in [epsilon] + sorted(table.red):
+                if index.state_for(sequence) is None:
+                    index.add_state(sequence)
+            expected = self._scanning_targets(table, index.states)
+            for (sequence, symbol), state in expected.items():
+                position = index.state_for(sequence + symbol)
+                self.assertEqual(None if position is None else index.states[position], state)
+
+    def test_index_is_reused_only_while_rows_are(self):
+        table = self._table(LStarObservationTable(binaryAlphabet), [True, False], [epsilon])
+        index = RowStateIndex(table)
+        index.add_state(epsilon)
+        index.state_for(Sequence([SymbolStr('1')]))
+        self.assertIs(RowStateIndex.for_table(index, table), index)
+
+        table.red.add(self.words[3])
+        self.assertIs(RowStateIndex.for_table(index, table), index)
+        self.assertIsNot(RowStateIndex.for_table(index, LStarObservationTable(binaryAlphabet)), index)
+
+        table[Sequence([SymbolStr('1')])] = list(table[Sequence([SymbolStr('1')])])
+        self.assertIsNot(RowStateIndex.for_table(index, table), index)
+
+        index = RowStateIndex(table)
+        index.add_state(epsilon)
+        table[epsilon].append(True)
+        self.assertIsNot(RowStateIndex.for_table(index, table), index)
+
+    def test_incremental_translations_match_fresh_ones(self):
+        def ones_divisible_by_three(sequence):
+            return str(sequence).count('1') % 3 == 0
+
+        def ones_modulo_two(sequence):
+            return SymbolStr('xy'[str(sequence).count('1') % 2])
+
+        for table, translator, output in (
+                (LStarObservationTable(binaryAlphabet), FAObservationTableTranslator(), ones_divisible_by_three),
+                (LStarObservationTable(binaryAlphabet, True), FAObservationTableTranslator(), ones_divisible_by_three),
+                (MMObservationTable(), MMObservationTableTranslator(), ones_modulo_two)):
+            table.exp = [epsilon, Sequence([SymbolStr('1')])]
+            history = []
+            reused = 0
+            for word in self.words[:12]:
+                self._add_to_red(table, output, word)
+                reused += translator._state_index is RowStateIndex.for_table(translator._state_index, table)
+                model = translator.translate(table, binaryAlphabet, outputAlphabet)
+                fresh = type(translator)().translate(table, binaryAlphabet, outputAlphabet)
+                self.assertEqual(self._state_rows(table, model), self._state_rows(table, fresh))
+                self.assertEqual(self._transition_rows(table, model), self._transition_rows(table, fresh))
+                history.append((model, self._transition_rows(table, model)))
+            self.assertEqual(reused, 11)
+            for model, transitions in history:
+                self.assertEqual(self._transition_rows(table, model), transitions)
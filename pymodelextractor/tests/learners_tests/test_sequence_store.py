@@ -0,0 +1,76 @@
+import unittest
+
+from pymodelextractor.factories.lstar_factory import LStarFactory
+from pymodelextractor.learners.observation_tree_learners.kearns_vazirani_learner import KearnsVaziraniLearner
+from pymodelextractor.teachers.automaton_teacher import DeterministicFiniteAutomatonTeacher
+from pymodelextractor.teachers.general_teacher import GeneralTeacher
+from pymodelextractor.utils.sequence_store import SequenceStore
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.dfa_comparison_strategy import DFAComparisonStrategy
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import \
+    HopcroftKarpComparisonStrategy as ComparisonStrategy
+
+
+def _sequence(string):
+    return Sequence([SymbolStr(symbol) for symbol in string])
+
+
+class TestSequenceStore(unittest.TestCase):
+
+    def test_equal_sequences_share_id_and_object(self):
+        store = SequenceStore()
+        a, b = SymbolStr('a'), SymbolStr('b')
+        ab = store.extend(store.extend(store.epsilon, a), b)
+        self.assertEqual(store.intern(_sequence('ab')), ab)
+        self.assertEqual(store.extend(store.extend(store.epsilon, SymbolStr('a')), SymbolStr('b')), ab)
+        self.assertEqual(store.sequence(ab), _sequence('ab'))
+        self.assertIs(store.canonical(_sequence('ab')), store.sequence(ab))
+        self.assertEqual(store.length(ab), 2)
+        self.assertEqual(store.sequence(store.parent(ab)), _sequence('a'))
+        self.assertEqual(store.intern(Sequence()), store.epsilon)
+        self.assertEqual(len(store), 3)
+
+    def test_concatenation_matches_sequence_addition(self):
+        store = SequenceStore()
+        words = [_sequence(word) for word in ('', 'a', 'ba', 'abba', 'bab')]
+        for prefix in words:
+            for suffix in words:
+                self.assertEqual(store.concatenation(prefix, suffix), prefix + suffix)
+                self.assertIs(store.concatenation(prefix, suffix), store.canonical(prefix + suffix))
+            self.assertEqual(store.concatenation(prefix, SymbolStr('b')), prefix + SymbolStr('b'))
+        self.assertEqual(store.prefixes(_sequence('abba')), _sequence('abba').get_prefixes())
+        symbols = [SymbolStr('a'), SymbolStr('b')]
+        self.assertEqual(store.extensions(_sequence('ab'), symbols), [_sequence('aba'), _sequence('abb')])
+
+    def test_concatenations_are_memoized(self):
+        store = SequenceStore()
+        prefix, suffix = store.intern(_sequence('ab')), store.intern(_sequence('ba'))
+        size = len(store)
+        abba = store.concat(prefix, suffix)
+        self.assertEqual(len(store), size + 2)
+        self.assertEqual(store._concatenations[(prefix, suffix)], abba)
+        self.assertEqual(store.concat(prefix, suffix), abba)
+        self.assertEqual(len(store), size + 2)
+
+    def test_learners_intern_keys_but_not_queries(self):
+        automaton = TomitasGrammars.get_automaton_4()
+        teacher = GeneralTeacher(automaton, DFAComparisonStrategy())
+        result = LStarFactory.get_dfa_lstar_learner().learn(teacher)
+        self.assertTrue(ComparisonStrategy().are_equivalent(result.model, automaton))
+        table = result.info['observation_table']
+        store = table.sequences
+        size = len(store)
+        # Every key but the empty sequence the learner starts from is built by the store
+        self.assertTrue(all(store.canonical(sequence) is sequence for sequence in table.observations if sequence))
+        self.assertTrue(all(store.canonical(suffix) is suffix for suffix in table.exp if suffix))
+        self.assertEqual(len(store), size)
+        # Queries are not interned: the store only grows with the rows and columns
+        self.assertLess(len(store), len(teacher._cache))
+
+        learner = KearnsVaziraniLearner()
+        result = learner.learn(DeterministicFiniteAutomatonTeacher(automaton, ComparisonStrategy()))
+        self.assertTrue(ComparisonStrategy().are_equivalent(result.model, automaton))
+        tree = result.info['observation_tree']
+        self.assertTrue(all(tree.sequences.canonical(sequence) is sequence for sequence in tree._sift_cache))
@@ -0,0 +1,114 @@
+import random
+import unittest
+from math import ceil, log
+
+from pymodelextractor.teachers.sequential_pac_test import SequentialPACTest
+from pymodelextractor.teachers.pac_sampling_engine import PACSamplingEngine
+from pymodelextractor.teachers.pac_boolean_teacher import PACBooleanTeacher
+from pymodelextractor.teachers.pac_probabilistic_teacher import PACProbabilisticTeacher
+from pymodelextractor.learners.observation_table_learners.lstar_learner import LStarLearner
+from pymodelextractor.learners.observation_table_learners.pdfa_lstar_learner import PDFALStarLearner
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pythautomata.utilities.uniform_length_sequence_generator import UniformLengthSequenceGenerator
+
+
+class TestSequentialPACTest(unittest.TestCase):
+
+    def test_thresholds_follow_wald(self):
+        for epsilon, delta in [(0.05, 0.01), (0.01, 0.01), (0.2, 0.1)]:
+            test = SequentialPACTest(epsilon, delta)
+            self.assertEqual(test.alternative_epsilon, epsilon / 10)
+            for index in range(1, 10):
+                alpha = test.confidence_for(index)
+                self.assertAlmostEqual(test.acceptance_threshold(index), log((1 - delta) / alpha))
+                self.assertAlmostEqual(test.rejection_threshold(index), log(delta / (1 - alpha)))
+                self.assertAlmostEqual(test.log_likelihood_ratio(10, 2),
+                                       8 * log((1 - epsilon / 10) / (1 - epsilon)) + 2 * log(1 / 10))
+
+    def test_acceptance_never_needs_more_than_fixed_sample(self):
+        for epsilon, delta in [(0.05, 0.05), (0.05, 0.01), (0.01, 0.01), (0.2, 0.1)]:
+            test = SequentialPACTest(epsilon, delta)
+            teacher = PACBooleanTeacher(TomitasGrammars.get_automaton_1(), epsilon, delta)
+            for index in range(1, 10):
+                teacher.equivalence_queries_count = index
+                fixed_size = ceil((log(2) * (index + 1) - log(delta)) / epsilon)
+                self.assertEqual(test.fixed_sample_size(index), fixed_size)
+                self.assertEqual(teacher._calculate_sample_size(), fixed_size)
+                size = test.acceptance_sample_size(index)
+                self.assertLessEqual(size, fixed_size)
+                self.assertLessEqual((1 - epsilon) ** size, test.confidence_for(index))
+                self.assertLessEqual(test.epsilon_bound(index, size), epsilon)
+
+    def test_sample_is_capped_at_fixed_size(self):
+        test = SequentialPACTest(0.05, 0.01)
+        generator = UniformLengthSequenceGenerator(TomitasGrammars.get_automaton_1().alphabet, max_seq_length=10)
+        fixed_size = test.fixed_sample_size(1)
+        result = test.run(1, generator, lambda sequence: False, PACSamplingEngine())
+        self.assertIsNone(result.counterexample)
+        self.assertEqual(result.samples_spent, fixed_size)
+        self.assertEqual(result.epsilon_bound, test.epsilon_bound(1, fixed_size))
+        self.assertLessEqual(result.epsilon_bound, 0.05)
+        # A single disagreement is not enough to reject early, but the fixed sample guarantee needs none
+        disagreements = []
+        def disagree_once(sequence):
+            disagreements.append(sequence)
+            return len(disagreements) == 1
+        result = test.run(1, generator, disagree_once, PACSamplingEngine())
+        self.assertEqual(result.counterexample, disagreements[0])
+        self.assertEqual(result.samples_spent, fixed_size)
+        self.assertEqual(result.error_count, 1)
+        self.assertIsNone(result.epsilon_bound)
+        random.seed(3)
+        result = test.run(1, generator, lambda sequence: random.random() < 0.2, PACSamplingEngine())
+        self.assertIsNotNone(result.counterexample)
+        self.assertLess(result.samples_spent, fixed_size)
+        self.assertLessEqual(test.log_likelihood_ratio(result.samples_spent, result.error_count),
+                             test.rejection_threshold(1))
+
+    def test_adaptive_teacher_computes_epsilon_star(self):
+        target = TomitasGrammars.get_automaton_3()
+        teacher = PACBooleanTeacher(target, 0.01, 0.01, max_seq_length=20, adaptive=True)
+        teacher.equivalence_query(TomitasGrammars.get_automaton_4())
+        self.assertGreater(teacher.epsilon_star, 0)
+        self.assertEqual(teacher.last_sample_size, teacher.samples_spent)
+        teacher = PACBooleanTeacher(target, 0.01, 0.01, max_seq_length=20, adaptive=True,
+                                    compute_epsilon_star=False)
+        teacher.equivalence_query(TomitasGrammars.get_automaton_4())
+        self.assertEqual(teacher.epsilon_star, 0)
+
+    def test_wrong_hypothesis_is_rejected_early(self):
+        target = TomitasGrammars.get_automaton_3()
+        teacher = PACBooleanTeacher(target, 0.01, 0.01, max_seq_length=20, adaptive=True)
+        fixed = PACBooleanTeacher(target, 0.01, 0.01, max_seq_length=20)
+        equivalent, counterexample = teacher.equivalence_query(TomitasGrammars.get_automaton_4())
+        self.assertFalse(equivalent)
+        self.assertNotEqual(target.accepts(counterexample),
+                            TomitasGrammars.get_automaton_4().accepts(counterexample))
+        fixed.equivalence_query(TomitasGrammars.get_automaton_4())
+        self.assertLess(teacher.samples_spent, fixed.last_sample_size)
+        self.assertIsNone(teacher.epsilon_bound)
+
+    def test_learning_reports_samples_and_epsilon_bound(self):
+        target = TomitasGrammars.get_automaton_3()
+        teacher = PACBooleanTeacher(target, 0.01, 0.01, max_seq_length=20, adaptive=True)
+        result = LStarLearner().learn(teacher)
+        self.assertEqual(len(result.model.states), len(target.states))
+        self.assertEqual(result.info['pac_samples_spent'], teacher.samples_spent)
+        self.assertGreater(result.info['pac_epsilon_bound'], 0)
+        self.assertLessEqual(result.info['pac_epsilon_bound'], 0.01)
+
+    def test_probabilistic_learning_reports_samples_and_epsilon_bound(self):
+        target = WeightedTomitasGrammars.get_automaton_3()
+        comparator = WFAToleranceComparator(0.001)
+        teacher = PACProbabilisticTeacher(target, comparator, 0.05, 0.01, max_seq_length=20, adaptive=True)
+        result = PDFALStarLearner(comparator).learn(teacher)
+        self.assertEqual(len(result.model.weighted_states), len(target.weighted_states))
+        self.assertGreater(result.info['pac_samples_spent'], 0)
+        self.assertLessEqual(result.info['pac_epsilon_bound'], 0.05)
+
+    def test_fixed_sample_teachers_report_nothing(self):
+        result = LStarLearner().learn(PACBooleanTeacher(TomitasGrammars.get_automaton_3(), 0.05, 0.01,
+                                                        max_seq_length=20))
+        self.assertNotIn('pac_samples_spent', result.info)
@@ -0,0 +1,62 @@
+import time
+import unittest
+from multiprocessing import Process
+
+from pymodelextractor.utils.shared_memory_probability_cache import SharedMemoryProbabilityCache
+from pymodelextractor.teachers.pac_batch_probabilistic_teacher import PACBatchProbabilisticTeacher
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+
+
+def _write_from_child(cache, sequences):
+    cache.update((sequence, [0.25, 0.25, 0.5]) for sequence in sequences)
+
+
+class TestSharedMemoryProbabilityCache(unittest.TestCase):
+
+    def setUp(self):
+        self.symbols = [SymbolStr('$'), SymbolStr('0'), SymbolStr('1')]
+        self.sequences = [Sequence([SymbolStr(c) for c in format(i, 'b')]) for i in range(200)]
+
+    def test_entries_written_by_another_process_are_visible(self):
+        cache = SharedMemoryProbabilityCache(self.symbols, 1_000)
+        job = Process(target=_write_from_child, args=(cache, self.sequences))
+        job.start()
+        job.join()
+        self.assertEqual(len(cache), len(self.sequences))
+        for sequence in self.sequences:
+            self.assertIn(sequence, cache)
+            self.assertEqual(list(cache[sequence].values()), [0.25, 0.25, 0.5])
+        self.assertNotIn(Sequence([SymbolStr('2')]), cache)
+        self.assertIsNone(cache.get(Sequence([SymbolStr('2')])))
+        cache.close()
+
+    def test_capacity_is_respected(self):
+        cache = SharedMemoryProbabilityCache(self.symbols, 10)
+        cache.update((sequence, [1, 0, 0]) for sequence in self.sequences)
+        self.assertEqual(len(cache), 10)
+        self.assertTrue(all(sequence in cache for sequence in self.sequences[:10]))
+        cache.close()
+
+    def test_rows_outlive_the_segment(self):
+        cache = SharedMemoryProbabilityCache(self.symbols, 10)
+        cache[self.sequences[0]] = [0.5, 0.25, 0.25]
+        row = cache.row(self.sequences[0])
+        cache.close()
+        cache.close()
+        self.assertEqual(row.tolist(), [0.5, 0.25, 0.25])
+
+    def test_teacher_filler_populates_cache(self):
+        model = WeightedTomitasGrammars.get_automaton_3()
+        teacher = PACBatchProbabilisticTeacher(model, 0.05, 0.01, comparator=WFAToleranceComparator(),
+                                               max_seq_length=10, parallel_cache=True,
+                                               max_query_elements=500, batch_size=100)
+        expected = teacher.next_token_probabilities(Sequence())
+        deadline = time.time() + 30
+        while len(teacher._cache) < 500 and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(len(teacher._cache), 500)
+        self.assertEqual(teacher.next_token_probabilities(Sequence()), expected)
+        del teacher
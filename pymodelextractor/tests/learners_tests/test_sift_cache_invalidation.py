@@ -0,0 +1,79 @@
+import unittest
+
+from pymodelextractor.learners.observation_table_learners.observation_table import epsilon
+from pymodelextractor.learners.observation_tree_learners import kearns_vazirani_learner
+from pymodelextractor.learners.observation_tree_learners.pdfa_quantization_n_ary_tree_learner import \
+    PDFAQuantizationNAryTreeLearner
+from pymodelextractor.teachers.automaton_teacher import DeterministicFiniteAutomatonTeacher
+from pymodelextractor.teachers.pdfa_teacher import PDFATeacher
+from pymodelextractor.tests.learners_tests.helpers import words_up_to
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import \
+    HopcroftKarpComparisonStrategy as ComparisonStrategy
+from pythautomata.model_comparators.wfa_partition_comparison_strategy import WFAPartitionComparator
+from pythautomata.utilities.probability_partitioner import QuantizationProbabilityPartitioner
+
+
+def _sequence(string):
+    return Sequence([SymbolStr(symbol) for symbol in string])
+
+
+class TestSiftCacheInvalidation(unittest.TestCase):
+
+    def _kearns_vazirani_tree(self, automaton, cache_queries):
+        teacher = DeterministicFiniteAutomatonTeacher(automaton, ComparisonStrategy())
+        root = kearns_vazirani_learner.ClassificationNode(epsilon)
+        root.right = kearns_vazirani_learner.ClassificationNode(epsilon, parent=root)
+        root.left = kearns_vazirani_learner.ClassificationNode(_sequence('0'), parent=root)
+        return kearns_vazirani_learner.ClassificationTree(root, teacher, cache_queries)
+
+    def test_split_leaf_is_sifted_again_from_its_node(self):
+        automaton = TomitasGrammars.get_automaton_5()
+        words = words_up_to(automaton.alphabet, 5)
+        tree = self._kearns_vazirani_tree(automaton, True)
+        uncached_tree = self._kearns_vazirani_tree(automaton, False)
+
+        self.assertEqual(tree.sift_batch(words), uncached_tree.sift_batch(words))
+        sifted_into_epsilon = {word for word in words if tree._sift_cache[word] == epsilon}
+
+        for each_tree in (tree, uncached_tree):
+            each_tree.update_node(epsilon, _sequence('00'), _sequence('1'))
+        self.assertEqual(set(tree._sift_resume), sifted_into_epsilon)
+        self.assertTrue(all(node is tree.leaves[epsilon].parent for node in tree._sift_resume.values()))
+        self.assertNotIn(epsilon, tree._sifted_into)
+
+        asked = []
+        ask_membership_queries = tree._ask_membership_queries
+        tree._ask_membership_queries = lambda sequences: asked.extend(sequences) or ask_membership_queries(sequences)
+        self.assertEqual(tree.sift_batch(words), uncached_tree.sift_batch(words))
+        self.assertEqual(sorted(asked), sorted(word + _sequence('1') for word in sifted_into_epsilon))
+        self.assertEqual(tree._sift_resume, {})
+        self.assertEqual({word for word in words if tree._sift_cache[word] in (epsilon, _sequence('00'))},
+                         sifted_into_epsilon)
+
+    def test_kearns_vazirani_cache_matches_tree(self):
+        automaton = TomitasGrammars.get_automaton_6()
+        learner = kearns_vazirani_learner.KearnsVaziraniLearner()
+        tree = learner.learn(DeterministicFiniteAutomatonTeacher(automaton, ComparisonStrategy())).info[
+            'observation_tree']
+        self._assert_cache_matches_tree(tree, lambda sequence: tree.sift(sequence))
+
+    def test_quantization_tree_cache_matches_tree(self):
+        partitioner = QuantizationProbabilityPartitioner(10)
+        model = WeightedTomitasGrammars.get_automaton_7()
+        learner = PDFAQuantizationNAryTreeLearner(partitioner)
+        self.assertEqual(learner.learn(PDFATeacher(model, WFAPartitionComparator(partitioner))).model, model)
+        tree = learner._tree
+        self._assert_cache_matches_tree(tree, lambda sequence: tree.sift(sequence, update=False)[0])
+
+    def _assert_cache_matches_tree(self, tree, sift):
+        cached = dict(tree._sift_cache)
+        self.assertGreater(len(cached), 0)
+        for sequence, access_string in cached.items():
+            self.assertIn(sequence, tree._sifted_into[access_string])
+        tree._sift_cache.clear()
+        tree._sift_resume.clear()
+        self.assertEqual({sequence: sift(sequence) for sequence in cached}, cached)
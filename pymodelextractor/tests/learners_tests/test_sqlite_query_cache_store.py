@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from pymodelextractor.teachers.general_teacher import GeneralTeacher
+from pymodelextractor.factories.lstar_factory import LStarFactory
+from pymodelextractor.utils.sqlite_query_cache_store import SQLiteQueryCacheStore
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.automata_definitions.tomitas_grammars import TomitasGrammars
+from pythautomata.model_comparators.dfa_comparison_strategy import DFAComparisonStrategy
+from pythautomata.model_comparators.hopcroft_karp_comparison_strategy import \
+    HopcroftKarpComparisonStrategy as ComparisonStrategy
+
+
+class _CountingAutomaton:
+    def __init__(self, automaton):
+        self._automaton = automaton
+        self.processed = 0
+
+    def __getattr__(self, name):
+        return getattr(self._automaton, name)
+
+    def process_query(self, sequence):
+        self.processed += 1
+        return self._automaton.process_query(sequence)
+
+
+class TestSQLiteQueryCacheStore(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "queries.sqlite")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_second_run_is_served_from_disk(self):
+        automaton = TomitasGrammars.get_automaton_4()
+        learner = LStarFactory.get_dfa_lstar_learner()
+
+        target = _CountingAutomaton(automaton)
+        with SQLiteQueryCacheStore(self.path, fingerprint="tomita4") as store:
+            result = learner.learn(GeneralTeacher(target, DFAComparisonStrategy(), cache_store=store))
+        self.assertTrue(ComparisonStrategy().are_equivalent(result.model, automaton))
+        self.assertGreater(target.processed, 0)
+
+        target = _CountingAutomaton(automaton)
+        with SQLiteQueryCacheStore(self.path, fingerprint="tomita4") as store:
+            result = learner.learn(GeneralTeacher(target, DFAComparisonStrategy(), cache_store=store))
+        self.assertTrue(ComparisonStrategy().are_equivalent(result.model, automaton))
+        self.assertEqual(target.processed, 0)
+
+    def test_entries_are_scoped_by_fingerprint(self):
+        word = Sequence([SymbolStr('0'), SymbolStr('1')])
+        with SQLiteQueryCacheStore(self.path, fingerprint="a", batch_size=1) as store:
+            store[word] = True
+            self.assertTrue(store[word])
+        with SQLiteQueryCacheStore(self.path, fingerprint="a") as store:
+            self.assertIn(word, store)
+            self.assertEqual(len(store), 1)
+        with SQLiteQueryCacheStore(self.path, fingerprint="b") as store:
+            self.assertNotIn(word, store)
+            self.assertIsNone(store.get(word))
+
+    def test_failed_write_is_raised_by_flush(self):
+        word, other = Sequence([SymbolStr('0')]), Sequence([SymbolStr('1')])
+        store = SQLiteQueryCacheStore(self.path, fingerprint="a", batch_size=1)
+        store[word] = threading.Lock()
+        with self.assertRaises(TypeError):
+            store.flush()
+        # The failed answer is still served from memory and the writer keeps running.
+        self.assertIn(word, store)
+        store[other] = True
+        store.flush()
+        self.assertEqual(len(store), 1)
+        store.close()
+        with SQLiteQueryCacheStore(self.path, fingerprint="a") as store:
+            self.assertNotIn(word, store)
+            self.assertTrue(store[other])
+
+    def test_default_fingerprint_is_stable_for_named_targets(self):
+        first = SQLiteQueryCacheStore(self.path, target=TomitasGrammars.get_automaton_1())
+        second = SQLiteQueryCacheStore(self.path, target=TomitasGrammars.get_automaton_1())
+        self.assertEqual(first.fingerprint, second.fingerprint)
+        first.close()
+        second.close()
@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from pymodelextractor.learners.observation_tree_learners.bounded_pdfa_quantization_n_ary_tree_learner import \
+    BoundedPDFAQuantizationNAryTreeLearner
+from pymodelextractor.learners.observation_tree_learners.pdfa_quantization_n_ary_tree_learner import \
+    ClassificationTree, PDFAQuantizationNAryTreeLearner
+from pymodelextractor.learners.observation_tree_learners.tree_history import TreeHistory, TreeSnapshot
+from pymodelextractor.teachers.pdfa_teacher import PDFATeacher
+from pythautomata.automata_definitions.weighted_tomitas_grammars import WeightedTomitasGrammars
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.symbol import SymbolStr
+from pythautomata.model_comparators.wfa_partition_comparison_strategy import WFAPartitionComparator
+from pythautomata.utilities import pdfa_generator
+from pythautomata.utilities.nicaud_dfa_generator import generate_dfa
+from pythautomata.utilities.probability_partitioner import QuantizationProbabilityPartitioner
+
+
+def _structure(node):
+    return node.string, node.depth, dict(node.probabilities or {}), \
+        [(key, _structure(child)) for key, child in node.childs.items()]
+
+
+class _SteppingTree:
+    def __init__(self):
+        self.step = 0
+
+    def snapshot(self):
+        return self.step
+
+
+class TestTreeHistory(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(17)
+        self.partitioner = QuantizationProbabilityPartitioner(10)
+
+    def _learn_with_copies(self, learner, model):
+        # Copies taken whenever a snapshot is, as the learner used to keep them.
+        copies = []
+        snapshot = ClassificationTree.snapshot
+
+        def snapshot_and_copy(tree):
+            copies.append(_structure(tree.copy().root))
+            return snapshot(tree)
+
+        ClassificationTree.snapshot = snapshot_and_copy
+        try:
+            result = learner.learn(PDFATeacher(model, WFAPartitionComparator(self.partitioner)))
+        finally:
+            ClassificationTree.snapshot = snapshot
+        return result, copies
+
+    def test_snapshots_match_copies(self):
+        alphabet = Alphabet(frozenset(SymbolStr(symbol) for symbol in 'abc'))
+        models = [WeightedTomitasGrammars.get_automaton_7(),
+                  pdfa_generator.pdfa_from_dfa(generate_dfa(alphabet, 12))]
+        for model in models:
+            result, copies = self._learn_with_copies(PDFAQuantizationNAryTreeLearner(self.partitioner), model)
+            history = result.info['tree_history']
+            self.assertEqual(len(history), len(copies))
+            self.assertGreaterEqual(len(copies), 2)
+            self.assertTrue(all(isinstance(snapshot, TreeSnapshot) for snapshot in history))
+            self.assertEqual([_structure(snapshot.root) for snapshot in history], copies)
+            self.assertNotEqual(copies[0], copies[-1])
+            self.assertEqual(set(history[-1].leaves), set(result.info['observation_tree'].leaves))
+            self.assertIs(history[0]._next_token_probabilities_cache,
+                          result.info['observation_tree']._next_token_probabilities_cache)
+
+    def test_bounded_learner_keeps_snapshots(self):
+        model = WeightedTomitasGrammars.get_automaton_7()
+        learner = BoundedPDFAQuantizationNAryTreeLearner(self.partitioner, 100, 100, tree_history_keep_last=2)
+        result = learner.learn(PDFATeacher(model, WFAPartitionComparator(self.partitioner)))
+        history = result.info['tree_history']
+        self.assertEqual(len(history), 2)
+        self.assertLess(len(history[0].leaves), len(history[1].leaves))
+
+    def test_retention_policies(self):
+        for keep_last, every, expected in ((None, 1, list(range(1, 11))), (0, 1, []), (3, 1, [8, 9, 10]),
+                                           (None, 3, [1, 4, 7, 10]), (2, 4, [5, 9])):
+            history = TreeHistory(keep_last, every)
+            tree = _SteppingTree()
+            for step in range(1, 11):
+                tree.step = step
+                history.record(tree)
+            self.assertEqual(history, expected)
+        history = TreeHistory()
+        history.record(None)
+        self.assertEqual(history, [None])
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Optional, Union
+
+import numpy as np
+
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import Symbol
+
+from pymodelextractor.utils.compiled_pdfa import encode_sequences
+
+
+def supports_array_queries(model) -> bool:
+    """Whether `model` answers int-encoded query batches.
+
+    The optional array protocol is `get_last_token_weights_array(queries, lengths, symbols)`:
+    `queries` is a right padded int matrix whose entries index `symbols` (see
+    `encode_sequences`), `lengths` the length of each of its rows, and the answer a
+    2-D array with the weight of each symbol, in `symbols` order, after each query.
+    """
+    return hasattr(model, 'get_last_token_weights_array')
+
+
+def _suffix_symbols(required_suffixes: list) -> Optional[list[Symbol]]:
+    # The array protocol only asks for single symbols, given either as symbols or as sequences of length one
+    symbols = []
+    for suffix in required_suffixes:
+        if isinstance(suffix, Sequence):
+            if len(suffix) != 1:
+                return None
+            suffix = suffix[0]
+        symbols.append(suffix)
+    return symbols
+
+
+def last_token_weights_batch(model, sequences: list[Sequence], required_suffixes: list) -> Union[np.ndarray, list]:
+    """Weights of each of `required_suffixes` after each of `sequences`.
+
+    Asked through the array protocol, as a matrix with a row per sequence, when the target
+    supports it, every suffix is a single symbol and the sequences only use those symbols.
+    Otherwise asked through `get_last_token_weights_batch` and returned as the target returns
+    it, or, for targets that only answer arrays, through the array protocol one query per
+    distinct prefix, see `_last_token_weights_by_prefix`.
+    """
+    if not supports_array_queries(model):
+        return model.get_last_token_weights_batch(sequences, required_suffixes)
+    symbols = _suffix_symbols(required_suffixes)
+    if symbols is not None:
+        symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        try:
+            queries, lengths = encode_sequences(sequences, symbol_index)
+        except KeyError:
+            queries = None
+        if queries is not None:
+            return np.asarray(model.get_last_token_weights_array(queries, lengths, symbols))
+    if hasattr(model, 'get_last_token_weights_batch'):
+        return model.get_last_token_weights_batch(sequences, required_suffixes)
+    return _last_token_weights_by_prefix(model, sequences, required_suffixes)
+
+
+def _last_token_weights_by_prefix(model, sequences: list[Sequence], required_suffixes: list) -> np.ndarray:
+    # As get_last_token_weights does, the weight of a suffix is the weight of the last symbol of
+    # `sequence + suffix` after the rest of it, so each cell asks one symbol after one prefix.
+    prefixes = {}
+    cells = []
+    for sequence in sequences:
+        for suffix in required_suffixes:
+            word = sequence.value + (suffix.value if isinstance(suffix, Sequence) else (suffix,))
+            if len(word) == 0:
+                cells.append(None)
+            else:
+                cells.append((prefixes.setdefault(Sequence(word[:-1]), len(prefixes)), word[-1]))
+    weights = np.zeros(len(cells))
+    if len(prefixes) == 0:
+        return weights.reshape(len(sequences), len(required_suffixes))
+    symbols = list(dict.fromkeys([cell[1] for cell in cells if cell is not None] +
+                                 [symbol for prefix in prefixes for symbol in prefix.value]))
+    symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+    queries, lengths = encode_sequences(list(prefixes), symbol_index)
+    answers = np.asarray(model.get_last_token_weights_array(queries, lengths, symbols))
+    for i, cell in enumerate(cells):
+        if cell is not None:
+            weights[i] = answers[cell[0], symbol_index[cell[1]]]
+    return weights.reshape(len(sequences), len(required_suffixes))
+
+
+class NextTokenWeightsBatch(Mapping):
+    """Answers to a batch of next token queries, kept as the matrix they came in.
+
+    Maps each sequence to an `OrderedDict` of the weight of each symbol, as
+    `next_token_probabilities` does, but the dict of a sequence is only built the first
+    time it is looked up. `weights` holds a row per entry of `sequences` and a column per
+    symbol, for consumers that work on the matrix itself.
+    """
+
+    def __init__(self, sequences: list[Sequence], symbols: list[Symbol], weights: np.ndarray):
+        assert weights.shape == (len(sequences), len(symbols))
+        self.sequences = sequences
+        self.symbols = symbols
+        self.weights = weights
+        self._rows = None
+        self._views = {}
+
+    def view(self, row: int) -> OrderedDict:
+        view = self._views.get(row)
+        if view is None:
+            view = OrderedDict(zip(self.symbols, self.weights[row].tolist()))
+            self._views[row] = view
+        return view
+
+    def _rows_by_sequence(self) -> dict[Sequence, int]:
+        # Repeated sequences map to their last row, as a dict built from the rows would
+        if self._rows is None:
+            self._rows = {sequence: row for row, sequence in enumerate(self.sequences)}
+        return self._rows
+
+    def __getitem__(self, sequence: Sequence) -> OrderedDict:
+        return self.view(self._rows_by_sequence()[sequence])
+
+    def __iter__(self):
+        return iter(self._rows_by_sequence())
+
+    def __len__(self) -> int:
+        return len(self._rows_by_sequence())
+
+    def items(self):
+        return ((sequence, self.view(row)) for sequence, row in self._rows_by_sequence().items())
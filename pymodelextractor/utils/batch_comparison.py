@@ -0,0 +1,81 @@
+import numpy as np
+
+from pythautomata.model_comparators.wfa_tolerance_comparison_strategy import WFAToleranceComparator
+from pythautomata.model_comparators.wfa_quantization_comparison_strategy import WFAQuantizationComparator
+from pythautomata.model_comparators.wfa_partition_comparison_strategy import WFAPartitionComparator
+from pythautomata.utilities.probability_partitioner import ProbabilityPartitioner, \
+    QuantizationProbabilityPartitioner, QuantizationProbabilityPartitionerPlus
+
+
+def next_tokens_equivalent_output_batch(comparator, observations1: np.ndarray, observations2: np.ndarray,
+                                        partitioner: ProbabilityPartitioner = None) -> np.ndarray:
+    """Row-wise `comparator.next_tokens_equivalent_output` over two observation matrices.
+
+    Returns a boolean mask with one entry per row. Tolerance and quantization
+    comparisons are computed with array operations. For a `WFAPartitionComparator`,
+    `partitioner` is the partitioner it was built with: quantization partitioners
+    are then asked the interval of each distinct value and any other one the partition
+    of each distinct row, through `get_partition`. Any other comparator, or a partition
+    comparator given without its partitioner, is applied once per distinct pair of rows.
+    """
+    observations1 = np.asarray(observations1, dtype=np.float64)
+    observations2 = np.asarray(observations2, dtype=np.float64)
+    assert observations1.shape == observations2.shape
+    if len(observations1) == 0:
+        return np.ones(0, dtype=bool)
+    if type(comparator) is WFAToleranceComparator:
+        return np.all(np.abs(observations1 - observations2) <= comparator.tolerance, axis=1)
+    if type(comparator) is WFAQuantizationComparator:
+        return _same_intervals(observations1, observations2, comparator.partitions)
+    if type(comparator) is WFAPartitionComparator and partitioner is not None:
+        if type(partitioner) in (QuantizationProbabilityPartitioner, QuantizationProbabilityPartitionerPlus):
+            return _same_value_partitions(observations1, observations2, partitioner)
+        return _same_row_partitions(observations1, observations2, partitioner)
+    pairs, inverse = np.unique(np.concatenate([observations1, observations2], axis=1), axis=0, return_inverse=True)
+    width = observations1.shape[1]
+    equivalent = np.fromiter((comparator.next_tokens_equivalent_output(pair[:width], pair[width:])
+                              for pair in pairs.tolist()), dtype=bool, count=len(pairs))
+    return equivalent[inverse.reshape(-1)]
+
+
+def _same_value_partitions(observations1, observations2, partitioner) -> np.ndarray:
+    # Quantization partitioners map each value to its interval on its own
+    values, inverse = np.unique(np.concatenate([observations1, observations2]), return_inverse=True)
+    intervals = np.fromiter((partitioner.get_partition((value,))[0] for value in values.tolist()),
+                            dtype=np.int64, count=len(values))
+    intervals = intervals[inverse.reshape(-1)].reshape(2, *observations1.shape)
+    return np.all(intervals[0] == intervals[1], axis=1)
+
+
+def _same_row_partitions(observations1, observations2, partitioner) -> np.ndarray:
+    rows, inverse = np.unique(np.concatenate([observations1, observations2]), axis=0, return_inverse=True)
+    partitions = np.array([partitioner.get_partition(row) for row in rows.tolist()])
+    partitions = partitions[inverse.reshape(-1)]
+    return np.all(partitions[:len(observations1)] == partitions[len(observations1):], axis=1)
+
+
+def _same_intervals(observations1, observations2, partitions) -> np.ndarray:
+    return np.all(quantized_intervals(observations1, partitions) == quantized_intervals(observations2, partitions),
+                  axis=1)
+
+
+def quantized_intervals(values: np.ndarray, partitions: int) -> np.ndarray:
+    """Vectorized `pdfa_utils.get_quantized_interval_partition`.
+
+    Replays the same bisection over the same limits element-wise, so results match
+    the scalar version exactly, including its boundary handling.
+    """
+    assert np.all((values >= 0) & (values <= 1))
+    limits = np.linspace(0, 1, partitions + 1)
+    low = np.zeros(values.shape, dtype=np.int64)
+    count = np.full(values.shape, partitions, dtype=np.int64)
+    middle = np.full(values.shape, int((partitions + 1) / 2), dtype=np.int64)
+    while np.any(count > 1):
+        splitting = count > 1
+        half = count // 2
+        upper = splitting & (values >= limits[middle])
+        lower = splitting & ~upper
+        low = np.where(upper, low + half, low)
+        count = np.where(upper, count - half, np.where(lower, half, count))
+        middle = low + count // 2
+    return np.where(values == 1, partitions - 1, low)
@@ -0,0 +1,83 @@
+import numpy as np
+
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import Symbol
+from pythautomata.automata.wheighted_automaton_definition.weighted_automaton import WeightedAutomaton
+
+_MISSING = -1
+
+
+def encode_sequences(sequences: list[Sequence], symbol_index: dict[Symbol, int]) -> tuple[np.ndarray, np.ndarray]:
+    """Encodes sequences as a right padded int matrix of symbol indexes plus their lengths."""
+    lengths = np.fromiter((len(sequence) for sequence in sequences), dtype=np.int64, count=len(sequences))
+    width = int(lengths.max()) if len(sequences) > 0 else 0
+    matrix = np.zeros((len(sequences), width), dtype=np.int64)
+    for i, sequence in enumerate(sequences):
+        matrix[i, :lengths[i]] = [symbol_index[symbol] for symbol in sequence.value]
+    return matrix, lengths
+
+
+class CompiledPDFA:
+    """Array form of a deterministic weighted automaton for scoring many words at once.
+
+    `transitions[state, symbol]` holds the next state index and `weights[state, column]`
+    the weight of each required suffix (the terminal symbol or a single symbol) read
+    from that state. Words that reach a missing transition, and automata that are
+    not deterministic with a single initial state, are scored with
+    `get_last_token_weights`, so results always match the automaton's own.
+    """
+
+    def __init__(self, automaton: WeightedAutomaton, required_suffixes: list):
+        self._automaton = automaton
+        self._required_suffixes = required_suffixes
+        self._symbols = sorted(automaton.alphabet.symbols)
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self._symbols)}
+        states = list(automaton.weighted_states)
+        initial_states = [i for i, state in enumerate(states) if state.initial_weight > 0]
+        self.is_compiled = len(initial_states) == 1 and all(
+            len(transitions) == 1 for state in states for transitions in state.transitions_list.values())
+        if not self.is_compiled:
+            return
+        self._initial_state = initial_states[0]
+        state_index = {state: i for i, state in enumerate(states)}
+        self._transitions = np.full((len(states), len(self._symbols)), _MISSING, dtype=np.int64)
+        self._weights = np.full((len(states), len(required_suffixes)), np.nan)
+        for i, state in enumerate(states):
+            for symbol, [(next_state, _)] in state.transitions_list.items():
+                if symbol in self._symbol_index:
+                    self._transitions[i, self._symbol_index[symbol]] = state_index[next_state]
+            for column, suffix in enumerate(required_suffixes):
+                self._weights[i, column] = self._suffix_weight(state, suffix)
+
+    def _suffix_weight(self, state, suffix) -> float:
+        symbols = suffix.value if isinstance(suffix, Sequence) else (suffix,)
+        if len(symbols) != 1:
+            return np.nan
+        symbol = symbols[0]
+        if symbol == self._automaton.terminal_symbol:
+            return state.final_weight
+        transitions = state.transitions_list.get(symbol)
+        return np.nan if transitions is None else transitions[0][1]
+
+    def last_token_weights_batch(self, sequences: list[Sequence]) -> np.ndarray:
+        """Returns a (len(sequences), len(required_suffixes)) matrix of last token weights."""
+        if not self.is_compiled or len(sequences) == 0:
+            return self._fallback(sequences, np.arange(len(sequences)),
+                                  np.empty((len(sequences), len(self._required_suffixes))))
+        words, lengths = encode_sequences(sequences, self._symbol_index)
+        states = np.full(len(sequences), self._initial_state, dtype=np.int64)
+        valid = np.ones(len(sequences), dtype=bool)
+        for position in range(words.shape[1]):
+            active = valid & (lengths > position)
+            next_states = self._transitions[states[active], words[active, position]]
+            states[active] = next_states
+            valid[np.flatnonzero(active)[next_states == _MISSING]] = False
+        states[~valid] = 0
+        result = self._weights[states]
+        invalid = np.flatnonzero(~valid | np.isnan(result).any(axis=1))
+        return self._fallback(sequences, invalid, result)
+
+    def _fallback(self, sequences, rows, result) -> np.ndarray:
+        for row in rows:
+            result[row] = self._automaton.get_last_token_weights(sequences[row], self._required_suffixes)
+        return result
@@ -0,0 +1,68 @@
+import heapq
+from itertools import count
+from typing import Any, Hashable, Iterator
+
+
+class IndexedHeap:
+    """Min-heap of items addressable by key, with lazy deletion.
+
+    Each key holds at most one item. `discard` and re-pushing a key only forget the
+    live item; the stale copy stays in the heap and is skipped when it reaches the top,
+    and the heap is compacted once stale copies outnumber live items. Items are ordered
+    by their own comparison, so pushing `(priority, key)` tuples pops them in the same
+    order as a plain `heapq` list of those tuples.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._items = {}
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._items)
+
+    def get(self, key: Hashable, default=None) -> Any:
+        return self._items.get(key, default)
+
+    def items(self):
+        return self._items.items()
+
+    def push(self, key: Hashable, item: Any):
+        self._items[key] = item
+        heapq.heappush(self._heap, (item, next(self._counter), key))
+        self._compact_if_stale()
+
+    def discard(self, key: Hashable) -> bool:
+        if key not in self._items:
+            return False
+        del self._items[key]
+        self._compact_if_stale()
+        return True
+
+    def _compact_if_stale(self):
+        if len(self._heap) > 2 * len(self._items) + 32:
+            self._heap = [(item, next(self._counter), key) for key, item in self._items.items()]
+            heapq.heapify(self._heap)
+
+    def pop(self) -> Any:
+        key, item = self.pop_entry()
+        return item
+
+    def pop_entry(self) -> tuple[Hashable, Any]:
+        while self._heap:
+            item, _, key = heapq.heappop(self._heap)
+            if key in self._items and self._items[key] is item:
+                del self._items[key]
+                self._compact_if_stale()
+                return key, item
+        raise IndexError('pop from an empty IndexedHeap')
+
+    def clear(self):
+        self._heap = []
+        self._items = {}
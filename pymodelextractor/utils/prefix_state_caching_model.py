@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from math import log, prod
+
+from pythautomata.abstract.probabilistic_model import ProbabilisticModel
+from pythautomata.base_types.alphabet import Alphabet
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import Symbol
+
+
+class _PrefixNode:
+    __slots__ = ('parent', 'symbol', 'children', 'hidden_state', 'next_token_weights')
+
+    def __init__(self, parent: '_PrefixNode', symbol: Symbol, hidden_state):
+        self.parent = parent
+        self.symbol = symbol
+        self.children = {}
+        self.hidden_state = hidden_state
+        self.next_token_weights = None
+
+
+class PrefixStateCachingModel(ProbabilisticModel):
+    """Adapter for stateful targets (e.g. RNNs) that reuses the hidden state of cached prefixes.
+
+    The wrapped target must implement:
+        - initial_hidden_state()
+        - next_hidden_state(hidden_state, symbol)
+        - next_token_weights(hidden_state): mapping from every symbol, including the
+          terminal symbol, to its weight after the prefix that led to hidden_state.
+
+    Hidden states are kept in a prefix trie holding at most `max_cached_states`
+    states, evicted in least recently used order. A query only runs the target
+    from the longest prefix still cached, and batch queries are answered in
+    depth-first order so that sibling queries share their prefix.
+    """
+
+    def __init__(self, target, name: str = None, max_cached_states: int = 100_000):
+        assert max_cached_states > 0
+        self._target = target
+        self._name = name if name is not None else "PrefixStateCaching - " + str(getattr(target, 'name', ''))
+        self._max_cached_states = max_cached_states
+        self._root = _PrefixNode(None, None, target.initial_hidden_state())
+        self._lru: OrderedDict[_PrefixNode, None] = OrderedDict()
+        self.computed_states = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def terminal_symbol(self) -> Symbol:
+        return self._target.terminal_symbol
+
+    @property
+    def alphabet(self) -> Alphabet:
+        return self._target.alphabet
+
+    @property
+    def cached_states(self) -> int:
+        return len(self._lru)
+
+    def get_last_token_weights(self, sequence: Sequence, required_suffixes: list) -> list[float]:
+        return self.get_last_token_weights_batch([sequence], required_suffixes)[0]
+
+    def get_last_token_weights_batch(self, sequences: list[Sequence], required_suffixes: list) -> list[list[float]]:
+        queries = []
+        for i, sequence in enumerate(sequences):
+            for j, suffix in enumerate(required_suffixes):
+                value = (sequence + suffix).value
+                queries.append((value[:-1], value[-1], i, j))
+        queries.sort(key=lambda query: query[0])
+
+        results = [[0] * len(required_suffixes) for _ in sequences]
+        for prefix, symbol, i, j in queries:
+            results[i][j] = self._next_token_weights_after(prefix).get(symbol, 0)
+        return results
+
+    def last_token_probability(self, sequence: Sequence) -> float:
+        value = sequence.value
+        return self._next_token_weights_after(value[:-1]).get(value[-1], 0)
+
+    def sequence_weight(self, sequence: Sequence) -> float:
+        value = sequence.value
+        return prod(self._next_token_weights_after(value[:i]).get(value[i], 0) for i in range(len(value)))
+
+    def log_sequence_weight(self, sequence: Sequence) -> float:
+        value = sequence.value
+        return sum(log(self._next_token_weights_after(value[:i]).get(value[i], 0)) for i in range(len(value)))
+
+    def sequence_probability(self, sequence: Sequence) -> float:
+        return self.sequence_weight(sequence + self.terminal_symbol)
+
+    def log_sequence_probability(self, sequence: Sequence) -> float:
+        return self.log_sequence_weight(sequence + self.terminal_symbol)
+
+    def _next_token_weights_after(self, prefix: tuple) -> dict:
+        node = self._node_for(prefix)
+        if node.next_token_weights is None:
+            node.next_token_weights = self._target.next_token_weights(node.hidden_state)
+        return node.next_token_weights
+
+    def _node_for(self, prefix: tuple) -> _PrefixNode:
+        node, depth = self._longest_cached_prefix(prefix)
+        for symbol in prefix[depth:]:
+            hidden_state = self._target.next_hidden_state(node.hidden_state, symbol)
+            self.computed_states += 1
+            child = node.children.get(symbol)
+            if child is None:
+                child = _PrefixNode(node, symbol, hidden_state)
+                node.children[symbol] = child
+            else:
+                child.hidden_state = hidden_state
+            self._lru[child] = None
+            self._evict()
+            node = child
+        if node is not self._root:
+            self._lru.move_to_end(node)
+        return node
+
+    def _longest_cached_prefix(self, prefix: tuple) -> tuple[_PrefixNode, int]:
+        node = best = self._root
+        best_depth = 0
+        for depth, symbol in enumerate(prefix, 1):
+            node = node.children.get(symbol)
+            if node is None:
+                break
+            if node.hidden_state is not None:
+                best, best_depth = node, depth
+        if best is not self._root:
+            self._lru.move_to_end(best)
+        return best, best_depth
+
+    def _evict(self) -> None:
+        while len(self._lru) > self._max_cached_states:
+            node, _ = self._lru.popitem(last=False)
+            node.hidden_state = None
+            node.next_token_weights = None
+            while node is not self._root and node.hidden_state is None and len(node.children) == 0:
+                del node.parent.children[node.symbol]
+                node = node.parent
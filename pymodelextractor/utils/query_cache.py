@@ -0,0 +1,266 @@
+import sys
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional
+
+LRU = 'lru'
+ARC = 'arc'
+
+
+def approximate_size(key, value) -> int:
+    """Shallow size in bytes of a cache entry, as told by `sys.getsizeof`."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class QueryCache:
+    """In-memory cache of query answers, optionally bounded, that counts how it is used.
+
+    Caches behave like a dict. A lookup is `in` or `get`, and counts as a hit or a miss;
+    `[]` reads an entry already known to be there, and `holds` checks for an entry without
+    counting a lookup, for passes that only filter keys. When `max_entries` or `max_bytes` (as
+    measured by `size_of`) is exceeded, entries are evicted either by the least recently
+    used (`LRU`) policy or by the adaptive replacement (`ARC`) policy of Megiddo and
+    Modha, which splits entries between those seen once and those seen again and adapts
+    the share of each from the keys it recently evicted. Pinned keys are never evicted and
+    are kept out of the eviction order until unpinned, so evicting never walks past them; a
+    cache may stay over its bounds while everything left is pinned. Unbounded caches never
+    evict and keep no eviction order, so they only add the lookup count to a plain dict.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None, policy: str = LRU,
+                 size_of: Callable[[Hashable, object], int] = approximate_size):
+        assert policy in (LRU, ARC)
+        assert max_entries is None or max_entries > 0
+        assert max_bytes is None or max_bytes > 0
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._policy = policy
+        self._size_of = size_of
+        self._bounded = max_entries is not None or max_bytes is not None
+        self._entries = {}
+        self._sizes = {}
+        self._bytes = 0
+        # Pinned keys, each telling whether it was taken out of _frequent (ARC only) when pinned
+        self._pinned = {}
+        # Keys in least recently used first order: seen once, and seen again (ARC only)
+        self._recent = OrderedDict()
+        self._frequent = OrderedDict()
+        # ARC: keys recently evicted from _recent and _frequent, and target size of _recent
+        self._recent_ghosts = OrderedDict()
+        self._frequent_ghosts = OrderedDict()
+        self._recent_target = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def fresh(self) -> 'QueryCache':
+        """An empty cache with the same bounds and policy."""
+        return QueryCache(self._max_entries, self._max_bytes, self._policy, self._size_of)
+
+    @staticmethod
+    def like(template: Optional['QueryCache']) -> 'QueryCache':
+        """An empty cache bounded like `template`, or an unbounded one when it is None."""
+        return QueryCache() if template is None else template.fresh()
+
+    def copy(self) -> 'QueryCache':
+        new_cache = self.fresh()
+        new_cache._entries = dict(self._entries)
+        new_cache._sizes = dict(self._sizes)
+        new_cache._bytes = self._bytes
+        new_cache._pinned = dict(self._pinned)
+        new_cache._recent = self._recent.copy()
+        new_cache._frequent = self._frequent.copy()
+        new_cache._recent_ghosts = self._recent_ghosts.copy()
+        new_cache._frequent_ghosts = self._frequent_ghosts.copy()
+        new_cache._recent_target = self._recent_target
+        new_cache.hits, new_cache.misses, new_cache.evictions = self.hits, self.misses, self.evictions
+        return new_cache
+
+    @property
+    def statistics(self) -> dict:
+        statistics = {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                      'entries': len(self._entries), 'pinned': len(self._pinned)}
+        if self._max_bytes is not None:
+            statistics['bytes'] = self._bytes
+        return statistics
+
+    def pin(self, keys: Iterable[Hashable]) -> None:
+        """Keeps the entries of `keys`, present or added later, from being evicted."""
+        for key in keys:
+            if key in self._pinned:
+                continue
+            self._pinned[key] = key in self._frequent
+            self._frequent.pop(key, None)
+            self._recent.pop(key, None)
+            self._recent_ghosts.pop(key, None)
+            self._frequent_ghosts.pop(key, None)
+
+    def unpin(self, keys: Iterable[Hashable]) -> None:
+        for key in keys:
+            if key not in self._pinned:
+                continue
+            was_frequent = self._pinned.pop(key)
+            if self._bounded and key in self._entries:
+                (self._frequent if was_frequent else self._recent)[key] = None
+        self._evict_while_over_bounds()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def keys(self):
+        return self._entries.keys()
+
+    def values(self):
+        return self._entries.values()
+
+    def items(self):
+        return self._entries.items()
+
+    def __contains__(self, key: Hashable) -> bool:
+        if key in self._entries:
+            self.hits += 1
+            if self._bounded:
+                self._touch(key)
+            return True
+        self.misses += 1
+        return False
+
+    def holds(self, key: Hashable) -> bool:
+        """Whether `key` has an entry, without counting a lookup or refreshing the entry."""
+        return key in self._entries
+
+    def get(self, key: Hashable, default=None):
+        if key in self._entries:
+            self.hits += 1
+            if self._bounded:
+                self._touch(key)
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def __getitem__(self, key: Hashable):
+        value = self._entries[key]
+        if self._bounded:
+            self._touch(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value) -> None:
+        if not self._bounded:
+            self._entries[key] = value
+            return
+        if key in self._entries:
+            self._forget_size(key)
+            self._touch(key)
+        elif key in self._pinned:
+            # Pinned keys stay out of the eviction order until unpinned
+            pass
+        elif self._policy == ARC and (key in self._recent_ghosts or key in self._frequent_ghosts):
+            self._adapt_to_ghost(key)
+            self._frequent[key] = None
+        else:
+            self._recent[key] = None
+        self._entries[key] = value
+        if self._max_bytes is not None:
+            size = self._size_of(key, value)
+            self._sizes[key] = size
+            self._bytes += size
+        self._evict_while_over_bounds()
+
+    def update(self, entries) -> None:
+        for key, value in (entries.items() if hasattr(entries, 'items') else entries):
+            self[key] = value
+
+    def pop(self, key: Hashable, *default):
+        if key not in self._entries:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        self._forget_size(key)
+        self._recent.pop(key, None)
+        self._frequent.pop(key, None)
+        return self._entries.pop(key)
+
+    def __delitem__(self, key: Hashable) -> None:
+        self.pop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sizes.clear()
+        self._bytes = 0
+        self._recent.clear()
+        self._frequent.clear()
+        self._recent_ghosts.clear()
+        self._frequent_ghosts.clear()
+        self._recent_target = 0.0
+
+    def _touch(self, key: Hashable) -> None:
+        if key in self._pinned:
+            return
+        if self._policy == LRU:
+            self._recent.move_to_end(key)
+        elif key in self._recent:
+            del self._recent[key]
+            self._frequent[key] = None
+        else:
+            self._frequent.move_to_end(key)
+
+    def _forget_size(self, key: Hashable) -> None:
+        if self._max_bytes is not None:
+            self._bytes -= self._sizes.pop(key)
+
+    def _over_bounds(self) -> bool:
+        return (self._max_entries is not None and len(self._entries) > self._max_entries) or \
+            (self._max_bytes is not None and self._bytes > self._max_bytes)
+
+    def _evict_while_over_bounds(self) -> None:
+        while self._over_bounds():
+            if not self._evict_one():
+                return
+
+    def _evict_one(self) -> bool:
+        if self._policy == LRU:
+            return self._evict_from(self._recent, None)
+        prefer_recent = len(self._recent) > 0 and (len(self._recent) > self._recent_target or len(self._frequent) == 0)
+        first, second = (self._recent, self._frequent) if prefer_recent else (self._frequent, self._recent)
+        evicted = self._evict_from(first, self._ghosts_of(first)) or \
+            self._evict_from(second, self._ghosts_of(second))
+        self._trim_ghosts()
+        return evicted
+
+    def _evict_from(self, order: OrderedDict, ghosts: Optional[OrderedDict]) -> bool:
+        if not order:
+            return False
+        key, _ = order.popitem(last=False)
+        self._forget_size(key)
+        del self._entries[key]
+        if ghosts is not None:
+            ghosts[key] = None
+        self.evictions += 1
+        return True
+
+    def _ghosts_of(self, order: OrderedDict) -> OrderedDict:
+        return self._recent_ghosts if order is self._recent else self._frequent_ghosts
+
+    def _adapt_to_ghost(self, key: Hashable) -> None:
+        # A miss on a key evicted from _recent asks for a larger _recent, and the other way around.
+        capacity = self._capacity()
+        if key in self._recent_ghosts:
+            step = max(1.0, len(self._frequent_ghosts) / len(self._recent_ghosts))
+            self._recent_target = min(capacity, self._recent_target + step)
+            del self._recent_ghosts[key]
+        else:
+            step = max(1.0, len(self._recent_ghosts) / len(self._frequent_ghosts))
+            self._recent_target = max(0.0, self._recent_target - step)
+            del self._frequent_ghosts[key]
+
+    def _capacity(self) -> int:
+        return self._max_entries if self._max_entries is not None else max(1, len(self._entries))
+
+    def _trim_ghosts(self) -> None:
+        capacity = self._capacity()
+        while len(self._recent_ghosts) + len(self._frequent_ghosts) > capacity:
+            ghosts = self._recent_ghosts if len(self._recent_ghosts) >= len(self._frequent_ghosts) \
+                else self._frequent_ghosts
+            ghosts.popitem(last=False)
@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+
+from pythautomata.base_types.sequence import Sequence
+
+
+class QueryCacheStore(ABC):
+    """Storage for membership query answers that can outlive the teacher using it.
+
+    Stores behave like a dict keyed by Sequence: `in` and `[]` serve hits,
+    assignment records new answers.
+    """
+
+    @abstractmethod
+    def __contains__(self, sequence: Sequence) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def __getitem__(self, sequence: Sequence):
+        raise NotImplementedError
+
+    @abstractmethod
+    def __setitem__(self, sequence: Sequence, result) -> None:
+        raise NotImplementedError
+
+    def get(self, sequence: Sequence, default=None):
+        try:
+            return self[sequence]
+        except KeyError:
+            return default
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
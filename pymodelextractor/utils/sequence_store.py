@@ -0,0 +1,104 @@
+from typing import Iterable, Union
+
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import Symbol
+
+
+class SequenceStore:
+    """Hash-consed prefix trie of sequences.
+
+    Every distinct sequence gets an integer id, the id of a sequence extended by a symbol is
+    found in O(1) from the children of its trie node, and concatenations of two ids are
+    memoized. Each id also has a single canonical `Sequence`, built once from its parent's
+    and never rebuilt: tables and caches keyed on canonical sequences hash each of them once
+    and find them by identity instead of comparing them symbol by symbol. Stores only grow,
+    so ids and canonical sequences stay valid and a store can be shared.
+
+    Ids are only used inside the store. Observation tables and classification trees each
+    own a store and keep canonical `Sequence` keys, since their rows, columns and leaves are
+    read as sequences by translators, teachers and users. Stores never release anything, so
+    only those keys are interned: rows, columns, access strings, transitions and counterexample
+    prefixes, which grow with the table or tree. The queries built from them, which teachers
+    and bounded query caches may hold or drop, are plain `Sequence` concatenations and are
+    hashed as usual.
+    """
+    epsilon = 0
+
+    def __init__(self):
+        self._parents = [None]
+        self._children = [{}]
+        self._lengths = [0]
+        self._sequences = [Sequence()]
+        # Canonical sequences are kept alive by the store, so their object ids are stable
+        self._ids_by_object = {id(self._sequences[0]): 0}
+        self._concatenations = {}
+
+    def __len__(self) -> int:
+        return len(self._sequences)
+
+    def extend(self, sequence_id: int, symbol: Symbol) -> int:
+        children = self._children[sequence_id]
+        child_id = children.get(symbol)
+        if child_id is None:
+            child_id = len(self._sequences)
+            children[symbol] = child_id
+            self._parents.append(sequence_id)
+            self._children.append({})
+            self._lengths.append(self._lengths[sequence_id] + 1)
+            sequence = Sequence(self._sequences[sequence_id].value + (symbol,))
+            self._sequences.append(sequence)
+            self._ids_by_object[id(sequence)] = child_id
+        return child_id
+
+    def intern(self, sequence: Sequence) -> int:
+        """Id of `sequence`, found by identity when it is canonical and by walking the trie otherwise."""
+        sequence_id = self._ids_by_object.get(id(sequence))
+        if sequence_id is not None and self._sequences[sequence_id] is sequence:
+            return sequence_id
+        sequence_id = self.epsilon
+        for symbol in sequence.value:
+            sequence_id = self.extend(sequence_id, symbol)
+        return sequence_id
+
+    def concat(self, prefix_id: int, suffix_id: int) -> int:
+        key = (prefix_id, suffix_id)
+        sequence_id = self._concatenations.get(key)
+        if sequence_id is None:
+            sequence_id = prefix_id
+            for symbol in self._sequences[suffix_id].value:
+                sequence_id = self.extend(sequence_id, symbol)
+            self._concatenations[key] = sequence_id
+        return sequence_id
+
+    def sequence(self, sequence_id: int) -> Sequence:
+        return self._sequences[sequence_id]
+
+    def length(self, sequence_id: int) -> int:
+        return self._lengths[sequence_id]
+
+    def parent(self, sequence_id: int) -> Union[int, None]:
+        return self._parents[sequence_id]
+
+    def canonical(self, sequence: Sequence) -> Sequence:
+        return self._sequences[self.intern(sequence)]
+
+    def concatenation(self, prefix: Sequence, suffix: Union[Sequence, Symbol]) -> Sequence:
+        """Canonical `prefix + suffix`, where `suffix` is a sequence or a single symbol."""
+        prefix_id = self.intern(prefix)
+        if isinstance(suffix, Sequence):
+            return self._sequences[self.concat(prefix_id, self.intern(suffix))]
+        return self._sequences[self.extend(prefix_id, suffix)]
+
+    def extensions(self, sequence: Sequence, symbols: Iterable[Symbol]) -> list[Sequence]:
+        """Canonical `sequence + symbol` for each of `symbols`."""
+        sequence_id = self.intern(sequence)
+        return [self._sequences[self.extend(sequence_id, symbol)] for symbol in symbols]
+
+    def prefixes(self, sequence: Sequence) -> list[Sequence]:
+        """Canonical non-empty prefixes of `sequence`, shortest first, as `Sequence.get_prefixes`."""
+        prefixes = []
+        sequence_id = self.epsilon
+        for symbol in sequence.value:
+            sequence_id = self.extend(sequence_id, symbol)
+            prefixes.append(self._sequences[sequence_id])
+        return prefixes
@@ -0,0 +1,145 @@
+import hashlib
+from collections import OrderedDict
+from multiprocessing import Lock, shared_memory
+
+import numpy as np
+
+from pythautomata.base_types.sequence import Sequence
+from pythautomata.base_types.symbol import Symbol
+
+_EMPTY = -1
+
+
+class SharedMemoryProbabilityCache:
+    """Next token probabilities cache shared between processes without a manager.
+
+    Rows live in a numpy matrix backed by `multiprocessing.shared_memory`, and an
+    open addressing hash index maps the 128 bit digest of a sequence to its row.
+    Readers and writers serialize on a process shared lock, since nothing orders
+    the writes of one process as seen from another, and readers get copies of the
+    rows, so nothing they keep refers to the segment once it is closed. Entries
+    beyond `capacity` are silently dropped. Lookups through `row`, `get` and `[]` are
+    counted as hits or misses by each process, for its own lookups only.
+    """
+
+    def __init__(self, symbols: list[Symbol], capacity: int):
+        self._symbols = list(symbols)
+        self._capacity = capacity
+        self._slots = 1 << max(1, (2 * capacity - 1).bit_length())
+        index_bytes = self._slots * 3 * 8
+        matrix_bytes = capacity * len(self._symbols) * 8
+        self._memory = shared_memory.SharedMemory(create=True, size=index_bytes + matrix_bytes + 8)
+        self._owner = True
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self._attach()
+        self._index[:, 2] = _EMPTY
+        self._size[0] = 0
+
+    def _attach(self):
+        buffer = self._memory.buf
+        self._index = np.ndarray((self._slots, 3), dtype=np.int64, buffer=buffer)
+        offset = self._index.nbytes
+        self._matrix = np.ndarray((self._capacity, len(self._symbols)), dtype=np.float64,
+                                  buffer=buffer, offset=offset)
+        self._size = np.ndarray((1,), dtype=np.int64, buffer=buffer, offset=offset + self._matrix.nbytes)
+
+    def __getstate__(self):
+        return {'symbols': self._symbols, 'capacity': self._capacity, 'slots': self._slots,
+                'name': self._memory.name, 'lock': self._lock}
+
+    def __setstate__(self, state):
+        self._symbols = state['symbols']
+        self._capacity = state['capacity']
+        self._slots = state['slots']
+        self._memory = shared_memory.SharedMemory(name=state['name'])
+        self._owner = False
+        self._lock = state['lock']
+        self.hits = 0
+        self.misses = 0
+        self._attach()
+
+    @property
+    def symbols(self) -> list[Symbol]:
+        return self._symbols
+
+    @property
+    def statistics(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self), 'capacity': self._capacity}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._size[0])
+
+    @staticmethod
+    def _digest(sequence: Sequence) -> tuple[int, int]:
+        key = '\x1f'.join(str(symbol) for symbol in sequence.value).encode('utf-8')
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little', signed=True), int.from_bytes(digest[8:], 'little', signed=True)
+
+    def _find_slot(self, high: int, low: int) -> tuple[int, bool]:
+        slot = low & (self._slots - 1)
+        while True:
+            entry = self._index[slot]
+            if entry[2] == _EMPTY:
+                return slot, False
+            if entry[0] == high and entry[1] == low:
+                return slot, True
+            slot = (slot + 1) & (self._slots - 1)
+
+    def row(self, sequence: Sequence):
+        """Returns a copy of the cached probabilities, or None on a miss."""
+        high, low = self._digest(sequence)
+        with self._lock:
+            slot, found = self._find_slot(high, low)
+            if not found:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._matrix[self._index[slot, 2]].copy()
+
+    def __contains__(self, sequence: Sequence) -> bool:
+        high, low = self._digest(sequence)
+        with self._lock:
+            return self._find_slot(high, low)[1]
+
+    def __getitem__(self, sequence: Sequence) -> OrderedDict[Symbol, float]:
+        row = self.row(sequence)
+        if row is None:
+            raise KeyError(sequence)
+        return OrderedDict(zip(self._symbols, row.tolist()))
+
+    def get(self, sequence: Sequence, default=None):
+        row = self.row(sequence)
+        return default if row is None else OrderedDict(zip(self._symbols, row.tolist()))
+
+    def __setitem__(self, sequence: Sequence, probabilities) -> None:
+        self.update({sequence: probabilities})
+
+    def update(self, entries) -> None:
+        items = entries.items() if hasattr(entries, 'items') else entries
+        with self._lock:
+            for sequence, probabilities in items:
+                if isinstance(probabilities, dict):
+                    probabilities = [probabilities[symbol] for symbol in self._symbols]
+                high, low = self._digest(sequence)
+                slot, found = self._find_slot(high, low)
+                if found:
+                    continue
+                row = int(self._size[0])
+                if row >= self._capacity:
+                    return
+                self._matrix[row] = probabilities
+                self._index[slot, 0] = high
+                self._index[slot, 1] = low
+                self._index[slot, 2] = row
+                self._size[0] = row + 1
+
+    def close(self) -> None:
+        if self._index is None:
+            return
+        self._index = self._matrix = self._size = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import pickle
+import queue
+import sqlite3
+import threading
+from typing import Union
+
+from pythautomata.abstract.boolean_model import BooleanModel
+from pythautomata.abstract.model import Model
+from pythautomata.base_types.sequence import Sequence
+
+from pymodelextractor.utils.query_cache_store import QueryCacheStore
+
+
+def model_fingerprint(model: Union[BooleanModel, Model]) -> str:
+    """Default fingerprint of a target: its type, name and alphabet.
+
+    Targets whose name does not identify their weights (e.g. an RNN wrapper
+    reused for several checkpoints) should be given an explicit fingerprint.
+    """
+    alphabet = getattr(model, 'alphabet', None) or getattr(model, '_alphabet', None)
+    symbols = sorted(str(symbol) for symbol in alphabet.symbols) if alphabet is not None else []
+    description = json.dumps([type(model).__module__ + '.' + type(model).__qualname__,
+                              str(getattr(model, 'name', '')), symbols])
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+
+class SQLiteQueryCacheStore(QueryCacheStore):
+    """Membership query cache persisted in a SQLite file.
+
+    Lookups go to disk one key at a time, so the cache never needs to fit in
+    memory. New answers are queued and written by a background thread in
+    batches of `batch_size`; queued answers are served before they reach disk.
+    A batch that fails to be written stays in memory and its error is raised by
+    the next `flush` or `close`. Several targets can share one file since every row is scoped by the
+    target fingerprint.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, target: Union[BooleanModel, Model] = None,
+                 fingerprint: str = None, batch_size: int = 1000,
+                 flush_interval: float = 1.0):
+        assert target is not None or fingerprint is not None, \
+            "Either a target model or a fingerprint is required"
+        self.path = path
+        self.fingerprint = fingerprint if fingerprint is not None else model_fingerprint(target)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._write_error = None
+        self._read_lock = threading.Lock()
+        self._connection = self._connect()
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            "fingerprint TEXT NOT NULL, sequence TEXT NOT NULL, result BLOB NOT NULL, "
+            "PRIMARY KEY (fingerprint, sequence))")
+        self._connection.commit()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @staticmethod
+    def _key(sequence: Sequence) -> str:
+        return json.dumps([str(symbol) for symbol in sequence.value])
+
+    def __contains__(self, sequence: Sequence) -> bool:
+        try:
+            self[sequence]
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, sequence: Sequence):
+        key = self._key(sequence)
+        with self._pending_lock:
+            if key in self._pending:
+                return self._pending[key]
+        with self._read_lock:
+            row = self._connection.execute(
+                "SELECT result FROM queries WHERE fingerprint = ? AND sequence = ?",
+                (self.fingerprint, key)).fetchone()
+        if row is None:
+            raise KeyError(sequence)
+        return pickle.loads(row[0])
+
+    def __setitem__(self, sequence: Sequence, result) -> None:
+        assert not self._closed, "Cannot write to a closed cache store"
+        key = self._key(sequence)
+        with self._pending_lock:
+            self._pending[key] = result
+        self._queue.put((key, result))
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._read_lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM queries WHERE fingerprint = ?", (self.fingerprint,)).fetchone()[0]
+
+    def flush(self) -> None:
+        self._queue.join()
+        self._raise_write_error()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._writer.join()
+        self._connection.close()
+        self._raise_write_error()
+
+    def _raise_write_error(self) -> None:
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        stop = False
+        while not stop:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+            while True:
+                if item is self._STOP:
+                    stop = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(connection, batch)
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: list) -> None:
+        # Every item is marked done even if the batch fails, so that `flush` never blocks on a dead writer
+        try:
+            rows = [(self.fingerprint, key, pickle.dumps(result)) for key, result in batch]
+            connection.executemany(
+                "INSERT OR REPLACE INTO queries (fingerprint, sequence, result) VALUES (?, ?, ?)", rows)
+            connection.commit()
+        except Exception as error:
+            connection.rollback()
+            # Failed answers stay pending, so they are still served until the store is closed
+            if self._write_error is None:
+                self._write_error = error
+        else:
+            with self._pending_lock:
+                for key, result in batch:
+                    if self._pending.get(key) is result:
+                        del self._pending[key]
+        finally:
+            for _ in batch:
+                self._queue.task_done()